@@ -5,6 +5,7 @@ Django settings for config project (Render + Cloudinary).
 # --- Arranque de settings.py (orden correcto) ---
 from pathlib import Path
 import os
+import tempfile
 from dotenv import load_dotenv  # <-- importar primero
 from django.core.exceptions import ImproperlyConfigured
 
@@ -114,7 +115,10 @@ INSTALLED_APPS = [
 # -----------------------------
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    # WhiteNoise + los snapshots JSON del contenido público (tourism/snapshots.py)
+    "tourism.snapshots.SnapshotWhiteNoiseMiddleware",
+    # brotli / gzip para el JSON de la API (ver tourism/compression.py).
+    "tourism.compression.CompressionMiddleware",
 
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -125,6 +129,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # Junta las entradas de bitácora de la request en un solo INSERT.
+    "tourism.activity.ActivityLogBufferMiddleware",
 ]
 
 # -----------------------------
@@ -160,6 +166,68 @@ DATABASES = {
     )
 }
 
+# -----------------------------
+# Caché
+# -----------------------------
+# Compartido entre los workers de gunicorn: Redis si hay REDIS_URL; si no,
+# un caché en disco local (sirve en una sola instancia sin servicios extra).
+# Las versiones de contenido de tourism/caching.py viven aquí, así que un
+# caché por proceso (LocMem) dejaría a los otros workers sin enterarse de
+# las invalidaciones.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ.get(
+                "CACHE_DIR", os.path.join(tempfile.gettempdir(), "jardin-cache")
+            ),
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    }
+
+# Segundos que vive una respuesta pública cacheada. Las escrituras de los
+# editores (y el Django Admin) la invalidan antes; el TTL solo cubre cambios
+# hechos por fuera (shell, QuerySet.update() sin bump_version()).
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_TIMEOUT", str(60 * 10)))
+
+# Compresión de la API (tourism/compression.py). Los cuerpos comprimidos se
+# guardan en CACHES (clave: hash del cuerpo) por RESPONSE_CACHE_TIMEOUT.
+COMPRESSION_PATHS = ("/api/",)
+COMPRESSION_CONTENT_TYPES = ("application/json",)
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", "5"))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get("COMPRESSION_GZIP_LEVEL", "6"))
+
+# Snapshots estáticos del contenido público (tourism/snapshots.py): se
+# regeneran tras cada escritura y se sirven desde SNAPSHOT_URL sin pasar por
+# las vistas. SNAPSHOT_SITE_URL es el origen con el que se arman las URLs
+# absolutas dentro del JSON (el que vería un visitante).
+SNAPSHOTS_ENABLED = os.environ.get("SNAPSHOTS_ENABLED", "True") == "True"
+SNAPSHOT_ROOT = os.environ.get("SNAPSHOT_ROOT", str(BASE_DIR / "snapshots"))
+SNAPSHOT_URL = os.environ.get("SNAPSHOT_URL", "/snapshots/")
+SNAPSHOT_SITE_URL = os.environ.get(
+    "SNAPSHOT_SITE_URL",
+    "http://127.0.0.1:8000" if DEBUG
+    else "https://" + next((h for h in ALLOWED_HOSTS if not h.startswith((".", "*"))), "localhost"),
+)
+SNAPSHOT_ENDPOINTS = {
+    "places": "/api/places/",
+    "events": "/api/events/",
+    "posts": "/api/posts/",
+    "gallery": "/api/gallery/",
+    "contact": "/api/contact/",
+    "site-settings": "/api/site-settings/",
+}
+SNAPSHOT_ASYNC = os.environ.get("SNAPSHOT_ASYNC", "True") == "True"
+SNAPSHOT_DELAY = float(os.environ.get("SNAPSHOT_DELAY", "2"))
+
 # -----------------------------
 # Auth
 # -----------------------------
@@ -193,6 +261,23 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 DEFAULT_FILE_STORAGE = "cloudinary_storage.storage.MediaCloudinaryStorage"
 
 MEDIA_URL = "/media/"
+# Lo usan LocalMediaStorage y tourism.uploads.LocalClient.
+MEDIA_ROOT = os.environ.get("MEDIA_ROOT", str(BASE_DIR / "media"))
+
+# Storage de los campos de archivo de tourism (ver tourism/storage.py):
+# Cloudinary, o tourism.storage.LocalMediaStorage para alojar los archivos
+# en MEDIA_ROOT. Con el local, las miniaturas (?w=/&h=) se generan con un
+# pool de MEDIA_THUMB_WORKERS procesos (0 = en la misma request) y se
+# guardan en MEDIA_CACHE_DIR hasta MEDIA_CACHE_MAX_BYTES.
+MEDIA_STORAGE = os.environ.get("MEDIA_STORAGE", "cloudinary_storage.storage.MediaCloudinaryStorage")
+MEDIA_STORAGE_IS_LOCAL = MEDIA_STORAGE == "tourism.storage.LocalMediaStorage"
+MEDIA_CACHE_DIR = os.environ.get(
+    "MEDIA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "jardin-media-cache")
+)
+MEDIA_CACHE_MAX_BYTES = int(os.environ.get("MEDIA_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+MEDIA_THUMB_WORKERS = int(os.environ.get("MEDIA_THUMB_WORKERS", "2"))
+MEDIA_THUMB_TIMEOUT = int(os.environ.get("MEDIA_THUMB_TIMEOUT", "30"))
+MEDIA_MAX_AGE = int(os.environ.get("MEDIA_MAX_AGE", str(7 * 24 * 60 * 60)))
 
 CLOUDINARY_STORAGE = {
     "CLOUD_NAME": os.environ.get("CLOUDINARY_CLOUD_NAME"),
@@ -218,16 +303,79 @@ cloudinary.config(
     secure=True,
 )
 
+# -----------------------------
+# Subidas en segundo plano
+# -----------------------------
+# Los archivos que llegan a la API se guardan primero en disco local
+# (UPLOAD_SPOOL_DIR) y un pool de hilos del propio worker los sube al
+# almacenamiento (ver tourism/uploads.py). UPLOAD_STORAGE_CLIENT elige a
+# dónde: Cloudinary en producción o tourism.uploads.LocalClient (copia en
+# MEDIA_ROOT) para desarrollo y pruebas. UPLOAD_RUN_INLINE=True procesa
+# cada subida dentro de la misma request, sin hilos.
+UPLOAD_SPOOL_DIR = os.environ.get(
+    "UPLOAD_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "jardin-uploads")
+)
+UPLOAD_STORAGE_CLIENT = os.environ.get(
+    "UPLOAD_STORAGE_CLIENT",
+    "tourism.uploads.LocalClient" if MEDIA_STORAGE_IS_LOCAL else "tourism.uploads.CloudinaryClient",
+)
+UPLOAD_WORKERS = int(os.environ.get("UPLOAD_WORKERS", "2"))
+UPLOAD_MAX_ATTEMPTS = int(os.environ.get("UPLOAD_MAX_ATTEMPTS", "3"))
+UPLOAD_RUN_INLINE = os.environ.get("UPLOAD_RUN_INLINE", "False") == "True"
+
+# Variantes de imagen en la API (tourism/images.py): anchos para srcset,
+# lado de la miniatura cuadrada y quién arma las URLs (Cloudinary, o
+# tourism.images.LocalTransformer para desarrollo y pruebas).
+IMAGE_URL_TRANSFORMER = os.environ.get(
+    "IMAGE_URL_TRANSFORMER",
+    "tourism.images.LocalTransformer" if MEDIA_STORAGE_IS_LOCAL else "tourism.images.CloudinaryTransformer",
+)
+IMAGE_VARIANT_WIDTHS = [
+    int(width) for width in os.environ.get("IMAGE_VARIANT_WIDTHS", "320,640,960,1280,1920").split(",")
+]
+IMAGE_THUMB_SIZE = int(os.environ.get("IMAGE_THUMB_SIZE", "200"))
+
+# Subidas reanudables por partes (tourism/chunked.py): dónde se arman los
+# archivos, tamaño máximo total y por parte, y cuántas horas vive una
+# subida sin terminar antes de que purge_chunked_uploads la borre.
+CHUNKED_UPLOAD_DIR = os.environ.get(
+    "CHUNKED_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "jardin-chunks")
+)
+CHUNKED_UPLOAD_MAX_SIZE = int(os.environ.get("CHUNKED_UPLOAD_MAX_SIZE", str(50 * 1024 * 1024)))
+CHUNKED_UPLOAD_MAX_CHUNK = int(os.environ.get("CHUNKED_UPLOAD_MAX_CHUNK", str(8 * 1024 * 1024)))
+CHUNKED_UPLOAD_EXPIRE_HOURS = int(os.environ.get("CHUNKED_UPLOAD_EXPIRE_HOURS", "24"))
+
+# Importación masiva (tourism/importer.py): filas validadas y escritas por
+# lote, y tamaño máximo del archivo que acepta /api/import/<tipo>/.
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "500"))
+IMPORT_MAX_SIZE = int(os.environ.get("IMPORT_MAX_SIZE", str(10 * 1024 * 1024)))
+
 # -----------------------------
 # DRF
 # -----------------------------
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        # TokenAuthentication con caché de usuario + perfil (rol) por token.
+        "users.authentication.CachedTokenAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
+    # JSON con orjson, con vuelta al de DRF si no está instalado (ver
+    # tourism/fastjson.py).
+    "DEFAULT_RENDERER_CLASSES": (
+        "tourism.fastjson.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "tourism.fastjson.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
+    # Paginación por cursor opt-in (ver tourism/pagination.py y la sección
+    # "Paginación" más abajo).
+    "DEFAULT_PAGINATION_CLASS": "tourism.pagination.KeysetPagination",
+    "PAGE_SIZE": int(os.environ.get("API_PAGE_SIZE", "20")),
     # Desactivamos Throttling para evitar el bloqueo 400 por IP compartida en proxy
     # "DEFAULT_THROTTLE_CLASSES": (
     #     "rest_framework.throttling.AnonRateThrottle",
@@ -235,6 +383,36 @@ REST_FRAMEWORK = {
     # ),
 }
 
+# Segundos que un token autenticado (usuario + perfil) queda en memoria del
+# worker; los cambios de usuario/rol lo invalidan antes (users/authentication.py).
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get("AUTH_TOKEN_CACHE_TTL", "60"))
+
+# Con True, la bitácora agrupada de cada request se escribe desde un hilo
+# aparte y la respuesta no la espera (ver tourism/activity.py).
+ACTIVITY_LOG_ASYNC = os.environ.get("ACTIVITY_LOG_ASYNC", "False") == "True"
+
+# Retención de la bitácora (tourism/retention.py): las entradas con más de
+# ACTIVITY_LOG_RETENTION_DAYS días se mueven a archivos .jsonl.gz mensuales
+# en ACTIVITY_ARCHIVE_DIR y se borran de la tabla. ACTIVITY_ARCHIVE_DIR
+# tiene que estar en un disco persistente; por eso el archivado automático
+# (cada ACTIVITY_ARCHIVE_EVERY_HOURS horas, desde el worker) viene apagado
+# y también se puede correr con `manage.py archive_activity_log`.
+ACTIVITY_LOG_RETENTION_DAYS = int(os.environ.get("ACTIVITY_LOG_RETENTION_DAYS", "180"))
+ACTIVITY_ARCHIVE_DIR = os.environ.get("ACTIVITY_ARCHIVE_DIR", str(BASE_DIR / "archive" / "activity"))
+ACTIVITY_ARCHIVE_BATCH_SIZE = int(os.environ.get("ACTIVITY_ARCHIVE_BATCH_SIZE", "1000"))
+ACTIVITY_ARCHIVE_EVERY_HOURS = int(os.environ.get("ACTIVITY_ARCHIVE_EVERY_HOURS", "0"))
+
+# -----------------------------
+# Paginación
+# -----------------------------
+# Tamaño de página por defecto y máximo que un cliente puede pedir con
+# ?page_size=. Con API_PAGINATION_OPT_IN=True (por defecto) los listados
+# solo se paginan si el cliente manda ?cursor= o ?page_size=, así los
+# clientes que esperan la lista completa siguen funcionando igual.
+API_PAGE_SIZE = REST_FRAMEWORK["PAGE_SIZE"]
+API_MAX_PAGE_SIZE = int(os.environ.get("API_MAX_PAGE_SIZE", "100"))
+API_PAGINATION_OPT_IN = os.environ.get("API_PAGINATION_OPT_IN", "True") == "True"
+
 # -----------------------------
 # Seguridad extra en prod
 # -----------------------------
@@ -19,7 +19,8 @@ from django.urls import path, include
 
 # ⬇️ añade estos imports
 from django.conf import settings
-from django.conf.urls.static import static
+
+from tourism.storage import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -27,6 +28,7 @@ urlpatterns = [
     path('api/', include('tourism.urls')),
 ]
 
-# ⬇️ sirve /media/ en desarrollo (DEBUG=True)
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# ⬇️ sirve /media/ (con rangos y miniaturas) si los archivos están en
+# MEDIA_ROOT, o en desarrollo (DEBUG=True)
+if settings.DEBUG or settings.MEDIA_STORAGE_IS_LOCAL:
+    urlpatterns += [path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", serve_media, name="media")]
@@ -9,6 +9,10 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 # Asegúrate de que las apps de Django estén listas antes de intentar importar modelos.
 application = get_wsgi_application()
 
+# Archivado periódico de la bitácora (apagado salvo ACTIVITY_ARCHIVE_EVERY_HOURS).
+from tourism.retention import start_scheduler
+start_scheduler()
+
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ImproperlyConfigured
 
@@ -0,0 +1,127 @@
+# tourism/activity.py
+"""
+Escritura agrupada de la bitácora (ActivityLog).
+
+Antes ActivityLog.log() hacía un INSERT propio dentro de cada create/
+update/delete, así que toda operación del panel duplicaba sus escrituras
+(y su latencia). Ahora:
+
+- ActivityLog.log() arma la entrada y la registra con
+  transaction.on_commit(): si la transacción del cambio se revierte, la
+  entrada se descarta (nunca se registra algo que no pasó); si se
+  confirma, entra al buffer de la request.
+- ActivityLogBufferMiddleware abre el buffer al empezar la request y lo
+  vacía con un solo bulk_create en un `finally`: aunque la vista termine
+  en error después de haber guardado, las entradas de lo que sí se
+  confirmó se escriben igual.
+- Fuera de una request (shell, comandos, hilos de tourism/uploads.py) no
+  hay buffer y la entrada se guarda directo al confirmarse.
+
+Con ACTIVITY_LOG_ASYNC=True el bulk_create lo hace un hilo aparte y la
+respuesta no lo espera. Es opcional porque un proceso que muere de golpe
+(OOM, SIGKILL) pierde lo que estaba en cola; al salir normalmente se
+vacía la cola (atexit).
+"""
+import atexit
+import contextvars
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+
+log = logging.getLogger(__name__)
+
+_buffer = contextvars.ContextVar("activity_log_buffer", default=None)
+
+
+def record(*entries):
+    """Programa la escritura de `entries` (ActivityLog sin guardar)."""
+    if not entries:
+        return
+
+    def add():
+        buffer = _buffer.get()
+        if buffer is None:
+            type(entries[0]).objects.bulk_create(entries)
+        else:
+            buffer.extend(entries)
+
+    transaction.on_commit(add)
+
+
+def start_buffer():
+    return _buffer.set([])
+
+
+def flush(token):
+    entries = _buffer.get()
+    _buffer.reset(token)
+    if not entries:
+        return
+    if settings.ACTIVITY_LOG_ASYNC:
+        _get_flusher().put(entries)
+    else:
+        _write(entries)
+
+
+def _write(entries):
+    try:
+        type(entries[0]).objects.bulk_create(entries)
+    except Exception:
+        # El cambio ya está confirmado; que falle la bitácora no debe
+        # convertir la respuesta en un 500. Queda al menos en los logs.
+        log.exception(
+            "No se pudo guardar la bitácora: %s",
+            [(e.action, e.model_name, e.object_id) for e in entries],
+        )
+
+
+class _Flusher:
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="activity-log", daemon=True)
+        self.thread.start()
+        atexit.register(self.drain)
+
+    def put(self, entries):
+        self.queue.put(entries)
+
+    def _run(self):
+        while True:
+            entries = self.queue.get()
+            try:
+                _write(entries)
+            finally:
+                connection.close()
+                self.queue.task_done()
+
+    def drain(self):
+        self.queue.join()
+
+
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def _get_flusher():
+    global _flusher
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = _Flusher()
+        return _flusher
+
+
+class ActivityLogBufferMiddleware:
+    """Una sola escritura de bitácora por request (ver arriba)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = start_buffer()
+        try:
+            return self.get_response(request)
+        finally:
+            flush(token)
@@ -1,4 +1,27 @@
 from django.contrib import admin
+from .caching import bump_version
 from .models import Place, Media, Event, Post, Review, ContactInfo, GalleryItem, SiteSettings
-admin.site.register([Place, Media, Event, Post, Review, ContactInfo, GalleryItem])
-admin.site.register(SiteSettings)
+
+
+class VersionedAdmin(admin.ModelAdmin):
+    """
+    Los cambios hechos desde el Django Admin también suben la versión del
+    modelo (tourism/caching.py): de ella salen el caché de respuestas, los
+    ETag de tourism/conditional.py y los snapshots estáticos.
+    """
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        bump_version(type(obj).__name__)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_version(type(obj).__name__)
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        bump_version(queryset.model.__name__)
+
+
+admin.site.register([Place, Media, Event, Post, Review, ContactInfo, GalleryItem], VersionedAdmin)
+admin.site.register(SiteSettings, VersionedAdmin)
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class TourismConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tourism'
+
+    def ready(self):
+        from . import signals  # noqa
+        from django.db.models.signals import post_migrate
+        post_migrate.connect(signals.ensure_search_index, sender=self)
@@ -0,0 +1,144 @@
+# tourism/caching.py
+"""
+Caché de respuestas para las lecturas públicas (lugares, eventos, posts,
+galería, contactos, información del sitio).
+
+En vez de borrar claves una por una cuando algo cambia, cada modelo tiene
+un número de versión en el caché compartido y la clave de cada respuesta
+incluye las versiones de los modelos de los que depende. Cualquier
+escritura de un editor (ActivityLoggingMixin, create/update de la galería,
+reseñas nuevas) llama a bump_version() y todas las respuestas viejas
+quedan huérfanas de golpe; expiran solas por TTL.
+
+Las versiones son el timestamp (en milisegundos) de la última escritura,
+no un contador que arranca en 1: si el caché se vacía nunca se reutiliza un
+número de versión viejo, y tourism/conditional.py puede usarlas además
+como fecha de última modificación.
+
+bump_version() es también el aviso de "cambió el contenido" para los
+snapshots estáticos (tourism/snapshots.py).
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import get_language_from_request
+from rest_framework.response import Response
+
+from .snapshots import schedule_publish
+
+VERSION_KEY = "content-version:{}"
+HITS_KEY = "response-cache:hits"
+MISSES_KEY = "response-cache:misses"
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def get_versions(model_names):
+    """Versión actual de cada modelo (inicializándola si no existe)."""
+    keys = {VERSION_KEY.format(name): name for name in model_names}
+    found = cache.get_many(list(keys))
+    missing = {key: _now_ms() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return {keys[key]: found[key] for key in keys}
+
+
+def bump_version(*model_names):
+    """
+    Invalida todas las respuestas que dependen de estos modelos. Si hay una
+    transacción abierta, espera al commit para no invalidar (y luego volver
+    a cachear datos viejos) antes de que el cambio sea visible.
+    """
+    def bump():
+        for name in model_names:
+            key = VERSION_KEY.format(name)
+            # +1 por si hubo dos escrituras dentro del mismo milisegundo
+            version = max(cache.get(key, 0) + 1, _now_ms())
+            cache.set(key, version, timeout=None)
+        schedule_publish(model_names)
+
+    transaction.on_commit(bump)
+
+
+def cached_fragment(name, model_names, build, timeout=None):
+    """
+    Cachea el resultado (ya serializado) de `build()` bajo las versiones de
+    `model_names`, igual que las respuestas completas. Sirve para endpoints
+    que combinan varias secciones (p. ej. /api/home/), donde cada sección
+    se invalida por su cuenta.
+    """
+    versions = get_versions(model_names)
+    key = "fragment:{}:{}".format(
+        name, ",".join(f"{model}:{versions[model]}" for model in sorted(versions))
+    )
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, timeout=settings.RESPONSE_CACHE_TIMEOUT if timeout is None else timeout)
+    return data
+
+
+def _count(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def response_cache_stats():
+    counts = cache.get_many([HITS_KEY, MISSES_KEY])
+    return {"hits": counts.get(HITS_KEY, 0), "misses": counts.get(MISSES_KEY, 0)}
+
+
+def response_cache_key(request, model_names):
+    versions = get_versions(model_names)
+    raw = "|".join([
+        request.get_host(),
+        request.path,
+        "&".join(sorted(f"{k}={v}" for k in request.GET for v in request.GET.getlist(k))),
+        get_language_from_request(request) or "",
+        ",".join(f"{name}:{versions[name]}" for name in sorted(versions)),
+    ])
+    return "response:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class CachedResponseMixin:
+    """
+    Cachea list/retrieve para visitantes anónimos. `cache_models` lista los
+    nombres de los modelos cuya versión invalida la respuesta (p. ej. un
+    lugar depende de Place, Media y Review por el rating). Un acierto no
+    toca el ORM ni los serializers: devuelve el `response.data` ya
+    serializado. Los usuarios autenticados siempre van directo a la base de
+    datos (el staff ve contenido inactivo y necesita ver sus cambios al
+    instante).
+    """
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not self.cache_models or request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+
+        key = response_cache_key(request, self.cache_models)
+        data = cache.get(key)
+        if data is not None:
+            _count(HITS_KEY)
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        _count(MISSES_KEY)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout=settings.RESPONSE_CACHE_TIMEOUT)
+        response["X-Cache"] = "MISS"
+        return response
@@ -0,0 +1,200 @@
+# tourism/chunked.py
+"""
+Subidas reanudables por partes, para videos grandes desde conexiones
+móviles inestables.
+
+Antes una reseña o un item de la galería con video mandaba hasta 50 MB en
+un solo POST multipart: si la conexión se cortaba al 90 %, había que
+empezar de cero, y el cuerpo completo pasaba por el MultiPartParser de
+Django en una sola request. El protocolo ahora es:
+
+1. POST /api/chunked-uploads/ {filename, total_size}  -> id, offset 0
+2. PUT  /api/chunked-uploads/<id>/?offset=N  (cuerpo: bytes crudos)
+   Cada parte se escribe directo al archivo en disco, en bloques de 64 KB:
+   la memoria no depende del tamaño del archivo. Si N no coincide con lo
+   recibido, responde 409 con el offset real; tras un corte, el cliente
+   hace GET /api/chunked-uploads/<id>/ y sigue desde `offset`.
+3. POST /api/chunked-uploads/<id>/complete/ {sha256}
+   Verifica tamaño y SHA-256. Si no coincide, la subida vuelve a 0.
+4. La reseña / el item de la galería se crea con `upload_id` en vez del
+   archivo; la subida se reclama en la misma transacción que guarda el
+   registro (ver take()) y desde ahí sigue el camino normal de
+   tourism/uploads.py.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files import File
+from django.utils import timezone
+from rest_framework.exceptions import APIException, ValidationError
+
+from .models import ChunkedUpload, IMAGE_EXTENSIONS, VIDEO_EXTENSIONS
+
+BLOCK_SIZE = 64 * 1024
+
+
+class OffsetMismatch(APIException):
+    status_code = 409
+    default_code = "offset_mismatch"
+
+    def __init__(self, offset):
+        super().__init__({"detail": "El offset no coincide con lo ya recibido."})
+        # Sin pasar por ErrorDetail, para que el cliente reciba un número.
+        self.detail["offset"] = offset
+
+
+class AssembledFile(File):
+    """
+    El archivo ya armado en disco. Expone temporary_file_path() como los
+    TemporaryUploadedFile de Django, así el spool de tourism/uploads.py lo
+    mueve en vez de copiarlo.
+    """
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def start(filename, total_size, user=None):
+    extension = os.path.splitext(filename)[1].lstrip(".").lower()
+    if extension not in IMAGE_EXTENSIONS + VIDEO_EXTENSIONS:
+        raise ValidationError({"filename": "Solo se permiten imágenes o videos."})
+    if not 0 < total_size <= settings.CHUNKED_UPLOAD_MAX_SIZE:
+        raise ValidationError({
+            "total_size": "El archivo supera el máximo permitido "
+                          f"({settings.CHUNKED_UPLOAD_MAX_SIZE // (1024 * 1024)}MB)."
+        })
+
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    upload = ChunkedUpload(
+        filename=os.path.basename(filename)[:255],
+        total_size=total_size,
+        created_by=user if getattr(user, "is_authenticated", False) else None,
+    )
+    upload.path = os.path.join(settings.CHUNKED_UPLOAD_DIR, f"{upload.pk}.part")
+    open(upload.path, "wb").close()
+    upload.save()
+    return upload
+
+
+def append(upload, offset, stream, length):
+    """
+    Escribe `length` bytes de `stream` en la posición `offset`. No toma
+    locks: escribir en una posición fija es idempotente (reenviar una
+    parte la sobrescribe igual) y el offset solo avanza con un UPDATE
+    condicional, así que de dos PUT simultáneos con el mismo offset uno
+    recibe 409. Si la conexión se corta a mitad de la parte, se guarda lo
+    que llegó y el cliente sigue desde ahí.
+    """
+    if upload.status != ChunkedUpload.STATUS_UPLOADING:
+        raise ValidationError({"detail": "La subida ya está cerrada."})
+    if offset != upload.offset:
+        raise OffsetMismatch(upload.offset)
+    if length > settings.CHUNKED_UPLOAD_MAX_CHUNK:
+        raise ValidationError({
+            "detail": f"Cada parte puede tener como máximo {settings.CHUNKED_UPLOAD_MAX_CHUNK} bytes."
+        })
+    if offset + length > upload.total_size:
+        raise ValidationError({"detail": "La parte excede el tamaño declarado del archivo."})
+
+    written = 0
+    with open(upload.path, "r+b") as fh:
+        fh.seek(offset)
+        try:
+            while written < length:
+                block = stream.read(min(BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                fh.write(block)
+                written += len(block)
+        except OSError:
+            pass  # conexión cortada: se conserva lo recibido
+
+    moved = ChunkedUpload.objects.filter(pk=upload.pk, offset=offset).update(
+        offset=offset + written, updated_at=timezone.now()
+    )
+    upload.refresh_from_db()
+    if not moved:
+        raise OffsetMismatch(upload.offset)
+    return upload
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def complete(upload, sha256):
+    if upload.status != ChunkedUpload.STATUS_UPLOADING:
+        raise ValidationError({"detail": "La subida ya está cerrada."})
+    if upload.offset != upload.total_size:
+        raise ValidationError({
+            "detail": f"Faltan datos: se recibieron {upload.offset} de {upload.total_size} bytes."
+        })
+    sha256 = (sha256 or "").strip().lower()
+    if not sha256:
+        raise ValidationError({"sha256": "Este campo es requerido."})
+
+    if _sha256(upload.path) != sha256:
+        # El archivo armado no sirve; se vuelve a empezar.
+        open(upload.path, "wb").close()
+        ChunkedUpload.objects.filter(pk=upload.pk).update(offset=0, updated_at=timezone.now())
+        raise ValidationError({"sha256": "El checksum no coincide; vuelve a subir el archivo."})
+
+    upload.status = ChunkedUpload.STATUS_COMPLETE
+    upload.sha256 = sha256
+    upload.completed_at = timezone.now()
+    upload.save()
+    return upload
+
+
+def take(upload_id, validate=None):
+    """
+    Devuelve el archivo de una subida completa y la marca como adjuntada
+    (se puede usar una sola vez). `validate(file)` corre antes de marcarla,
+    para que un archivo rechazado pueda adjuntarse a otra cosa.
+
+    Antes la marca se confirmaba apenas se tomaba el archivo: si después
+    fallaba el guardado de la reseña o del item, la subida quedaba
+    "adjuntada" a nada y no se podía volver a usar. Ahora debe llamarse
+    dentro del transaction.atomic() que guarda el registro: la fila se
+    bloquea con select_for_update y se marca en esa misma transacción, así
+    que un rollback la deja otra vez disponible, y una segunda request con
+    el mismo id espera el bloqueo y después ya no la encuentra completa.
+    """
+    try:
+        upload = ChunkedUpload.objects.select_for_update().filter(
+            pk=upload_id, status=ChunkedUpload.STATUS_COMPLETE
+        ).first()
+    except DjangoValidationError:
+        upload = None
+    if upload is None:
+        raise ValidationError({"upload_id": "La subida no existe, no está completa o ya se usó."})
+
+    file_obj = AssembledFile(open(upload.path, "rb"), name=upload.filename)
+    try:
+        if validate is not None:
+            validate(file_obj)
+        upload.status = ChunkedUpload.STATUS_ATTACHED
+        upload.save(update_fields=["status", "updated_at"])
+    except Exception:
+        file_obj.close()
+        raise
+    return file_obj
+
+
+def purge(older_than):
+    """Borra las subidas sin actividad desde `older_than` y sus archivos."""
+    stale = ChunkedUpload.objects.filter(updated_at__lt=older_than)
+    for path in stale.values_list("path", flat=True):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    count, _ = stale.delete()
+    return count
+
@@ -0,0 +1,136 @@
+# tourism/compression.py
+"""
+Compresión (brotli / gzip) de las respuestas JSON de la API.
+
+WhiteNoise comprime solo los estáticos; el JSON de /api/places/,
+/api/reviews/ o /api/site-settings/ (con los textos en dos idiomas) salía
+sin comprimir, y en una conexión móvil lenta eso es la mayor parte de la
+espera. CompressionMiddleware ahora:
+
+- elige brotli si el cliente lo acepta (y el paquete `brotli` está
+  instalado), si no gzip, según Accept-Encoding con sus q=;
+- solo comprime respuestas de COMPRESSION_PATHS con un Content-Type de
+  COMPRESSION_CONTENT_TYPES y de al menos COMPRESSION_MIN_SIZE bytes (en
+  las chicas los encabezados pesan más que lo ahorrado). El HTML de la
+  API navegable queda fuera a propósito: lleva el token CSRF y
+  comprimirlo junto con texto del usuario lo expone a BREACH;
+- respeta Cache-Control: no-transform, las respuestas en streaming
+  (archivos de tourism/storage.py) y las que ya traen Content-Encoding.
+
+El cuerpo ya comprimido se guarda en el caché con clave hash del cuerpo +
+tipo + codificación + nivel: un acierto de CachedResponseMixin devuelve
+los mismos bytes, así que no se vuelve a comprimir en cada request, tenga
+o no ETag (/api/reviews/ y /api/contact/ no lo tienen). Calcular un SHA-1
+del JSON es mucho más barato que comprimirlo. Si hay ETag pasa a débil
+(W/"..."), como hace GZipMiddleware de Django: los bytes cambian pero la
+representación es la misma, y el If-None-Match del cliente sigue dando 304.
+"""
+import gzip
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+CACHE_KEY = "compressed:{}"
+
+_cc_no_transform = re.compile(r"(^|,)\s*no-transform\s*(,|$)")
+
+
+def accepted_encodings(header):
+    """{codificación: q} de un Accept-Encoding; "*" cuenta para las no nombradas."""
+    accepted = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header):
+    """"br", "gzip" o None, prefiriendo brotli a igual q."""
+    accepted = accepted_encodings(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in ("br", "gzip") if brotli is not None else ("gzip",):
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(content, encoding):
+    if encoding == "br":
+        return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    # mtime=0: los mismos bytes dan el mismo gzip (y se pueden cachear).
+    return gzip.compress(content, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _level(encoding):
+    return settings.COMPRESSION_BROTLI_QUALITY if encoding == "br" else settings.COMPRESSION_GZIP_LEVEL
+
+
+def _compressible(request, response):
+    if response.streaming or response.has_header("Content-Encoding"):
+        return False
+    if not request.path.startswith(tuple(settings.COMPRESSION_PATHS)):
+        return False
+    content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+    if content_type not in settings.COMPRESSION_CONTENT_TYPES:
+        return False
+    if _cc_no_transform.search(response.get("Cache-Control", "")):
+        return False
+    return len(response.content) >= settings.COMPRESSION_MIN_SIZE
+
+
+class CompressionMiddleware:
+    """Va justo después de WhiteNoiseMiddleware (ver settings.MIDDLEWARE)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not _compressible(request, response):
+            return response
+
+        # Comprima o no, la respuesta depende de Accept-Encoding.
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING"))
+        if encoding is None:
+            return response
+
+        content = response.content
+        key = CACHE_KEY.format(hashlib.sha1("|".join([
+            hashlib.sha1(content).hexdigest(), response["Content-Type"], encoding, str(_level(encoding)),
+        ]).encode("utf-8")).hexdigest())
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = compress(content, encoding)
+            cache.set(key, compressed, timeout=settings.RESPONSE_CACHE_TIMEOUT)
+
+        if len(compressed) >= len(content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        etag = response.get("ETag")
+        if etag and not etag.startswith("W/"):
+            response["ETag"] = "W/" + etag
+        return response
@@ -0,0 +1,64 @@
+# tourism/conditional.py
+"""
+GET condicional (ETag / Last-Modified / 304) para los listados y detalles
+de contenido.
+
+El ETag no sale de hashear el JSON ya renderizado (eso obliga a correr el
+serializer igual) ni de consultar la tabla: sale de las versiones de
+tourism/caching.py de los modelos de `cache_models` (cualquier escritura
+por la API, el importador, las subidas o el Django Admin las sube), más
+la ruta con su query string, el idioma y el usuario. Así un 304 o un
+acierto del caché de respuestas no tocan la base de datos. Un
+MAX(updated_at)/COUNT(*) sobre el mismo queryset costaría una consulta
+más en cada listado, y con ?search= repetiría la búsqueda entera.
+
+Si el cliente manda If-None-Match / If-Modified-Since y coinciden, se
+responde 304 sin pasar por el caché de respuestas ni por el serializer.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language_from_request
+
+from .caching import get_versions
+
+
+class ConditionalGetMixin:
+    """
+    Agrega ETag y Last-Modified a list/retrieve y responde 304 cuando el
+    cliente ya tiene la versión actual. Usa `cache_models` (el mismo
+    atributo de CachedResponseMixin) para las dependencias.
+    """
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        versions = get_versions(self.cache_models) if self.cache_models else {}
+        last_modified = max(versions.values()) // 1000 if versions else None
+
+        etag = quote_etag(hashlib.sha1("|".join([
+            request.get_full_path(),
+            get_language_from_request(request) or "",
+            str(getattr(request.user, "pk", None) or ""),
+            ",".join(f"{name}:{versions[name]}" for name in sorted(versions)),
+        ]).encode("utf-8")).hexdigest())
+
+        not_modified = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified,
+        )
+        response = not_modified or handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified:
+                response["Last-Modified"] = http_date(last_modified)
+            # El navegador puede guardar la respuesta, pero debe revalidarla
+            # (barato: 304) antes de reusarla.
+            patch_cache_control(response, no_cache=True)
+            patch_vary_headers(response, ("Authorization", "Accept-Language"))
+        return response
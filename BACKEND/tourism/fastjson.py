@@ -0,0 +1,98 @@
+# tourism/fastjson.py
+"""
+Renderer y parser JSON de la API con orjson.
+
+Antes toda respuesta pasaba por el JSONRenderer de DRF (json.dumps de la
+librería estándar con su JSONEncoder en Python): con listados de cientos de
+lugares o reseñas, armar el JSON se llevaba una parte visible del CPU de
+cada request en una instancia chica. orjson hace lo mismo en C, varias
+veces más rápido, y devuelve bytes listos para la respuesta.
+
+La salida es la misma que la de DRF:
+
+- datetime / date / time en ISO 8601 (UTC con "Z", como DRF); UUID como
+  texto; Decimal (Place.lat/lng fuera de un DecimalField) como número;
+  timedelta en segundos; textos perezosos de traducción; querysets y
+  generadores como listas (ver _default());
+- compacto y UTF-8 (COMPACT_JSON / UNICODE_JSON), con U+2028/U+2029
+  escapados igual que DRF.
+
+Si orjson no está instalado, o el dato tiene algo que orjson no acepta
+(un entero de más de 64 bits) o se pide una sangría distinta de 2, se usa
+el renderer/parser de DRF sin que el cliente note la diferencia.
+Se configuran en REST_FRAMEWORK (DEFAULT_RENDERER_CLASSES /
+DEFAULT_PARSER_CLASSES); `manage.py benchmark_json` compara ambos.
+"""
+import datetime
+import decimal
+
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def _default(obj):
+    """Lo que orjson no serializa solo; mismo criterio que el encoder de DRF."""
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "__getitem__") and hasattr(obj, "keys"):
+        return dict(obj)
+    if hasattr(obj, "__iter__"):
+        return list(obj)
+    raise TypeError(f"{type(obj).__name__} no es serializable a JSON")
+
+
+def dumps(data):
+    """JSON compacto en bytes (con orjson si está disponible)."""
+    if orjson is None:
+        return JSONRenderer().render(data)
+    return orjson.dumps(data, default=_default, option=OPTIONS)
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent not in (None, 0, 2):
+            return super().render(data, accepted_media_type, renderer_context)
+        option = OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            ret = orjson.dumps(data, default=_default, option=option)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Igual que DRF: válidos en JSON pero no en JavaScript.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", "utf-8").lower().replace("_", "-")
+        if orjson is None or encoding not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,141 @@
+# tourism/geo.py
+"""
+Consultas geográficas sin PostGIS: "lugares cerca de" y filtro por
+rectángulo (bbox).
+
+Cada Place guarda su geohash (tourism.models.Place.geohash, indexado). Un
+geohash de precisión p es una celda de una grilla regular de lat/lng, y
+todos los puntos dentro de la celda comparten el prefijo, así que "qué
+lugares caen en estas celdas" es un rango sobre un índice normal. Se
+filtra grueso por celdas y después se calcula la distancia exacta
+(haversine) solo sobre esos candidatos.
+"""
+import math
+
+from django.db import connection
+from django.db.models import Q
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+PRECISION = 9          # ~4.8 m x 4.8 m, lo que se guarda en Place.geohash
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+MAX_BBOX_CELLS = 24
+
+
+def encode(lat, lng, precision=PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    bits, bit_count, even, result = 0, 0, True, []
+    while len(result) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            result.append(BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(result)
+
+
+def cell_size(precision):
+    """(alto, ancho) en grados de una celda de esa precisión."""
+    lng_bits = math.ceil(5 * precision / 2)
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def _cells(south, west, north, east, precision):
+    """Geohashes de todas las celdas que tocan el rectángulo."""
+    height, width = cell_size(precision)
+    rows = range(math.floor((south + 90) / height), math.floor((north + 90) / height) + 1)
+    cols = range(math.floor((west + 180) / width), math.floor((east + 180) / width) + 1)
+    cells = set()
+    for row in rows:
+        lat = -90 + (row + 0.5) * height
+        if not -90 < lat < 90:
+            continue
+        for col in cols:
+            lng = -180 + ((col + 0.5) * width) % 360
+            cells.add(encode(lat, lng, precision))
+    return cells
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def cells_near(lat, lng, radius_km):
+    """
+    Celdas que cubren un círculo: la precisión más fina cuya celda mide al
+    menos `radius_km` por lado, y las 3x3 celdas alrededor del centro.
+    """
+    km_per_degree_lng = KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01)
+    precision = 1
+    for candidate in range(PRECISION, 0, -1):
+        height, width = cell_size(candidate)
+        if height * KM_PER_DEGREE_LAT >= radius_km and width * km_per_degree_lng >= radius_km:
+            precision = candidate
+            break
+    height, width = cell_size(precision)
+    return _cells(lat - height, lng - width, lat + height, lng + width, precision)
+
+
+def cells_in_bbox(south, west, north, east):
+    """Celdas (como mucho MAX_BBOX_CELLS) que cubren el rectángulo."""
+    for precision in range(PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        count = (math.floor((north + 90) / height) - math.floor((south + 90) / height) + 1) * (
+            math.floor((east + 180) / width) - math.floor((west + 180) / width) + 1
+        )
+        if count <= MAX_BBOX_CELLS:
+            return _cells(south, west, north, east, precision)
+    return {""}
+
+
+def geohash_q(cells):
+    """
+    Q que selecciona los lugares cuyo geohash empieza con alguna de las
+    celdas. En PostgreSQL, LIKE 'prefijo%' usa el índice varchar_pattern_ops;
+    en SQLite se usa un rango (el LIKE de SQLite no distingue mayúsculas y
+    no aprovecha el índice).
+    """
+    condition = Q()
+    for cell in cells:
+        if connection.vendor == "postgresql":
+            condition |= Q(geohash__startswith=cell)
+        else:
+            condition |= Q(geohash__gte=cell, geohash__lt=cell + "{")
+    return condition
+
+
+def nearby(queryset, lat, lng, radius_km, limit):
+    """
+    Lugares de `queryset` a menos de `radius_km` de (lat, lng), del más
+    cercano al más lejano. Cada uno lleva `distance_km`.
+    """
+    candidates = queryset.filter(geohash_q(cells_near(lat, lng, radius_km)))
+    results = []
+    for place in candidates:
+        distance = haversine_km(lat, lng, float(place.lat), float(place.lng))
+        if distance <= radius_km:
+            place.distance_km = round(distance, 3)
+            results.append(place)
+    results.sort(key=lambda place: place.distance_km)
+    return results[:limit]
+
+
+def in_bbox(queryset, south, west, north, east):
+    return queryset.filter(
+        geohash_q(cells_in_bbox(south, west, north, east)),
+        lat__gte=south, lat__lte=north, lng__gte=west, lng__lte=east,
+    )
@@ -0,0 +1,165 @@
+# tourism/images.py
+"""
+Variantes de imagen (anchos para srcset, formato/calidad automáticos y
+miniatura cuadrada) para los serializers.
+
+Antes la API devolvía solo la URL del original de Cloudinary y un celular
+bajaba fotos de varios MB para una tarjeta de 300 px (PlaceCard,
+HeroCarousel). Ahora cada imagen trae además:
+
+    "image_variants": {
+        "src": "<original>",
+        "srcset": "<url 320> 320w, <url 640> 640w, …",
+        "widths": {"320": "<url>", "640": "<url>", …},
+        "thumb": "<url cuadrada de IMAGE_THUMB_SIZE px>"
+    }
+
+Las URLs las arma un transformador según dónde está guardado el archivo
+(IMAGE_URL_TRANSFORMER):
+
+- CloudinaryTransformer: inserta la transformación en la URL de entrega
+  (w_640,c_limit,f_auto,q_auto); Cloudinary genera y cachea cada variante
+  en su CDN la primera vez que se pide. De un video saca un fotograma como
+  miniatura.
+- LocalTransformer: para archivos en MEDIA_ROOT (LocalMediaStorage);
+  agrega ?w=640 (o ?w=…&h=…) a la URL, que tourism.storage.serve_media()
+  resuelve generando la variante. Los videos quedan sin variantes.
+
+Una URL de otro origen se devuelve sin variantes. El cálculo es puro (no
+consulta a nadie) y se memoriza por URL en el proceso: una misma imagen
+no se vuelve a transformar en cada request.
+"""
+import functools
+import os
+import re
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.db.models.fields.files import FieldFile
+from django.utils.module_loading import import_string
+from rest_framework import serializers
+
+from .models import IMAGE_EXTENSIONS
+
+
+class CloudinaryTransformer:
+    URL_RE = re.compile(r"^(?P<base>https?://res\.cloudinary\.com/[^/]+/(?P<kind>image|video)/upload/)(?P<rest>.+)$")
+
+    def variants(self, url, widths, thumb_size):
+        match = self.URL_RE.match(url)
+        if match is None:
+            return None
+        base, kind, rest = match.group("base", "kind", "rest")
+        if kind == "video":
+            # Solo miniatura: un fotograma del inicio, como imagen.
+            poster = re.sub(r"\.\w+$", ".jpg", rest)
+            return {"thumb": f"{base}so_0,c_fill,g_auto,w_{thumb_size},h_{thumb_size},f_auto,q_auto/{poster}"}
+        return {
+            "widths": {str(width): f"{base}w_{width},c_limit,f_auto,q_auto/{rest}" for width in widths},
+            "thumb": f"{base}c_fill,g_auto,w_{thumb_size},h_{thumb_size},f_auto,q_auto/{rest}",
+        }
+
+
+class LocalTransformer:
+    def variants(self, url, widths, thumb_size):
+        extension = os.path.splitext(urlsplit(url).path)[1].lstrip(".").lower()
+        if extension not in IMAGE_EXTENSIONS:
+            return None
+        separator = "&" if "?" in url else "?"
+        return {
+            "widths": {str(width): f"{url}{separator}{urlencode({'w': width})}" for width in widths},
+            "thumb": f"{url}{separator}{urlencode({'w': thumb_size, 'h': thumb_size})}",
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def _load_transformer(path):
+    return import_string(path)()
+
+
+def get_transformer():
+    return _load_transformer(settings.IMAGE_URL_TRANSFORMER)
+
+
+@functools.lru_cache(maxsize=4096)
+def _variants(transformer_path, url, widths, thumb_size):
+    result = _load_transformer(transformer_path).variants(url, widths, thumb_size)
+    if result is None:
+        return None
+    widths_map = result.get("widths", {})
+    return {
+        "src": url,
+        "srcset": ", ".join(f"{variant} {width}w" for width, variant in widths_map.items()),
+        "widths": widths_map,
+        "thumb": result.get("thumb"),
+    }
+
+
+def variants(url):
+    """Variantes de `url` (dict de arriba), o None si no hay URL."""
+    if not url:
+        return None
+    data = _variants(
+        settings.IMAGE_URL_TRANSFORMER, url,
+        tuple(settings.IMAGE_VARIANT_WIDTHS), settings.IMAGE_THUMB_SIZE,
+    )
+    return data or {"src": url, "srcset": "", "widths": {}, "thumb": None}
+
+
+@functools.lru_cache(maxsize=4096)
+def _storage_url(storage, name):
+    # Armar la URL de Cloudinary (cloudinary.utils.cloudinary_url) es lo más
+    # caro de serializar una foto, y para un mismo nombre siempre da lo mismo.
+    return storage.url(name)
+
+
+def file_url(value, request=None):
+    """URL de un FieldFile (o de un string ya armado)."""
+    if not value:
+        return None
+    url = value if isinstance(value, str) else _storage_url(value.storage, value.name)
+    if request is not None and url.startswith("/"):
+        url = request.build_absolute_uri(url)
+    return url
+
+
+def stored_file(model_field, value):
+    """
+    Un nombre de archivo suelto (p. ej. anotado con un Subquery) como
+    FieldFile del storage de `model_field`, para poder pedirle la URL.
+    """
+    if model_field is None or not isinstance(value, str) or not value:
+        return value
+    return FieldFile(None, model_field, value)
+
+
+class StoredImageField(serializers.ImageField):
+    """
+    URL de una imagen, como ImageField pero pasando por file_url() (URL
+    memorizada). Con `model_field`, `source` puede ser un nombre anotado en
+    el queryset (ver stored_file()).
+    """
+
+    def __init__(self, model_field=None, **kwargs):
+        self.model_field = model_field
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return file_url(stored_file(self.model_field, value), self.context.get("request"))
+
+
+class ImageVariantsField(serializers.Field):
+    """
+    Campo de solo lectura con las variantes del archivo en `source`. Con
+    `model_field`, `source` puede ser un nombre anotado (ver stored_file()).
+    """
+
+    def __init__(self, model_field=None, **kwargs):
+        self.model_field = model_field
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        value = stored_file(self.model_field, value)
+        return variants(file_url(value, self.context.get("request")))
@@ -0,0 +1,360 @@
+# tourism/importer.py
+"""
+Importación masiva de lugares, contactos y eventos desde CSV o JSON.
+
+Antes cargar el catálogo de un operador turístico (decenas de lugares,
+contactos y eventos) era un formulario por fila: un viaje completo por el
+ViewSet y una entrada de bitácora por cada una. Ahora se sube un archivo
+(POST /api/import/<places|contacts|events>/ o `manage.py import_catalog`):
+
+- El archivo se lee como stream: CSV (con encabezados) o JSON Lines, fila
+  por fila; un JSON con una lista se carga entero (los límites del upload
+  lo acotan).
+- Las filas se validan por lotes de IMPORT_BATCH_SIZE con los mismos
+  serializers de la API (un serializer por lote, no uno por fila), sin el
+  UniqueValidator de la clave: una clave repetida es una actualización,
+  no un error.
+- Cada lote se resuelve con una consulta por las claves existentes, un
+  bulk_create() de las nuevas y un upsert de las que cambian. Clave: `slug` en lugares, nombre +
+  categoría en contactos, título + fecha de inicio en eventos. Si la
+  misma clave aparece dos veces en el archivo, gana la última fila.
+- Todo corre en una transacción, con una sola entrada de bitácora de
+  resumen (acción "import") y un solo bump de versión del caché.
+
+Las filas con errores no se importan y se informan con su número (la
+primera fila de datos es la 1, sin contar el encabezado del CSV). En un
+CSV, las celdas vacías no pisan el valor que ya tenía el registro, y las
+listas (key_features) van como JSON o separadas por "|".
+"""
+import abc
+import codecs
+import csv
+import json
+import os
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.validators import UniqueValidator
+
+from . import activity, geo
+from .caching import bump_version
+from .models import ActivityLog, ContactInfo, Event, Place
+from .serializers import ContactInfoSerializer, EventSerializer, PlaceSerializer
+
+MAX_REPORTED_ERRORS = 200
+
+
+class ImportFormatError(ValueError):
+    """El archivo no se puede leer como CSV/JSON."""
+
+
+@dataclass
+class ImportResult:
+    kind: str
+    total: int = 0
+    created: int = 0
+    updated: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+    dry_run: bool = False
+
+    def add_error(self, row, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": errors})
+
+    def as_dict(self):
+        return {
+            "kind": self.kind, "total": self.total, "created": self.created,
+            "updated": self.updated, "error_count": self.error_count,
+            "errors": self.errors, "dry_run": self.dry_run,
+        }
+
+    def __str__(self):
+        return (
+            f"{self.total} filas: {self.created} creadas, {self.updated} actualizadas, "
+            f"{self.error_count} con errores"
+        )
+
+
+# ----------------------------------------------------------------------
+# Lectura
+# ----------------------------------------------------------------------
+
+def read_rows(file_obj, name):
+    """Filas (dicts) del archivo, según su extensión: .csv, .json o .jsonl/.ndjson."""
+    extension = os.path.splitext(name or "")[1].lower()
+    if extension == ".csv":
+        return _csv_rows(file_obj)
+    if extension in (".jsonl", ".ndjson"):
+        return _jsonl_rows(file_obj)
+    if extension == ".json":
+        return _json_rows(file_obj)
+    raise ImportFormatError("Formato no soportado; usa .csv, .json o .jsonl.")
+
+
+def _lines(file_obj):
+    return codecs.iterdecode(file_obj, "utf-8-sig")
+
+
+def _csv_rows(file_obj):
+    reader = csv.DictReader(_lines(file_obj))
+    for row in reader:
+        # Celdas vacías = "sin dato" (no pisan lo existente); columnas extra, fuera.
+        yield {key.strip(): value.strip() for key, value in row.items() if key and value not in (None, "")}
+
+
+def _jsonl_rows(file_obj):
+    for number, line in enumerate(_lines(file_obj), start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                raise ImportFormatError(f"Línea {number}: JSON inválido.")
+
+
+def _json_rows(file_obj):
+    try:
+        data = json.loads(b"".join(file_obj.chunks() if hasattr(file_obj, "chunks") else [file_obj.read()]))
+    except ValueError:
+        raise ImportFormatError("JSON inválido.")
+    if not isinstance(data, list):
+        raise ImportFormatError("El JSON debe ser una lista de objetos.")
+    return iter(data)
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ----------------------------------------------------------------------
+# Importadores
+# ----------------------------------------------------------------------
+
+class Importer(abc.ABC):
+    """
+    Un tipo de registro importable. Cada subclase dice cómo buscar en la
+    base las claves de un lote (existing()); el resto tiene un default.
+    """
+    model = None
+    serializer_class = None
+    key_fields = ()
+    list_fields = ()
+
+    def __init__(self, user=None):
+        self.user = user if getattr(user, "is_authenticated", False) else None
+
+    def prepare(self, rows):
+        """Ajustes previos a la validación; devuelve {índice: errores}."""
+        errors = {}
+        for index, row in enumerate(rows):
+            for name in self.list_fields:
+                value = row.get(name)
+                if not isinstance(value, str):
+                    continue
+                if not value.startswith("["):
+                    row[name] = [item.strip() for item in value.split("|") if item.strip()]
+                    continue
+                try:
+                    row[name] = json.loads(value)
+                except ValueError:
+                    errors[index] = {name: ["JSON inválido."]}
+        return errors
+
+    def serializer(self):
+        serializer = self.serializer_class(many=True)
+        for name in self.key_fields:
+            key_field = serializer.child.fields.get(name)
+            if key_field is not None:
+                key_field.validators = [v for v in key_field.validators if not isinstance(v, UniqueValidator)]
+        return serializer
+
+    def key(self, data):
+        return tuple(data.get(name) for name in self.key_fields)
+
+    @abc.abstractmethod
+    def existing(self, keys):
+        """{clave: instancia} de las claves que ya están en la base (una consulta)."""
+
+    def build(self, data, extra):
+        return self.model(**data, **extra)
+
+    def finalize(self, instance):
+        """Lo que haría save() y bulk_create()/bulk_update() se saltan."""
+
+
+class PlaceImporter(Importer):
+    model = Place
+    serializer_class = PlaceSerializer
+    key_fields = ("slug",)
+    list_fields = ("key_features",)
+
+    def existing(self, keys):
+        return {(place.slug,): place for place in Place.objects.filter(slug__in=[key[0] for key in keys])}
+
+    def build(self, data, extra):
+        return Place(created_by=self.user, **data, **extra)
+
+    def finalize(self, instance):
+        if instance.lat is not None and instance.lng is not None:
+            instance.geohash = geo.encode(float(instance.lat), float(instance.lng))
+        else:
+            instance.geohash = ""
+
+
+class ContactImporter(Importer):
+    model = ContactInfo
+    serializer_class = ContactInfoSerializer
+    key_fields = ("name", "category")
+
+    def existing(self, keys):
+        found = ContactInfo.objects.filter(name__in={name for name, _ in keys})
+        return {(contact.name, contact.category): contact for contact in found if (contact.name, contact.category) in keys}
+
+
+class EventImporter(Importer):
+    model = Event
+    serializer_class = EventSerializer
+    key_fields = ("title", "start_date")
+
+    def prepare(self, rows):
+        # `place` puede ser el slug o el id del lugar. Se resuelve acá, con
+        # una consulta por lote, en vez de dejar que el serializer busque
+        # el lugar fila por fila.
+        errors = super().prepare(rows)
+        references = {str(row["place"]) for row in rows if row.get("place") not in (None, "")}
+        places = {}
+        if references:
+            ids = [int(ref) for ref in references if ref.isdigit()]
+            for pk, slug in Place.objects.filter(slug__in=references).values_list("pk", "slug"):
+                places[slug] = pk
+            for pk in Place.objects.filter(pk__in=ids).values_list("pk", flat=True):
+                places[str(pk)] = pk
+        for index, row in enumerate(rows):
+            reference = row.pop("place", None)
+            if reference in (None, ""):
+                continue
+            if str(reference) not in places:
+                errors[index] = {"place": [f"No existe el lugar {reference!r}."]}
+            else:
+                row["_place_id"] = places[str(reference)]
+        return errors
+
+    def serializer(self):
+        serializer = super().serializer()
+        serializer.child.fields.pop("image", None)
+        return serializer
+
+    def existing(self, keys):
+        found = Event.objects.filter(title__in={title for title, _ in keys})
+        return {(event.title, event.start_date): event for event in found if (event.title, event.start_date) in keys}
+
+
+IMPORTERS = {
+    "places": PlaceImporter,
+    "contacts": ContactImporter,
+    "events": EventImporter,
+}
+
+
+# ----------------------------------------------------------------------
+# Ejecución
+# ----------------------------------------------------------------------
+
+def run_import(kind, rows, *, user=None, dry_run=False, batch_size=None, source=""):
+    importer = IMPORTERS[kind](user=user)
+    result = ImportResult(kind=kind, dry_run=dry_run)
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+
+    with transaction.atomic():
+        offset = 0
+        for batch in _batches(rows, batch_size):
+            _import_batch(importer, batch, offset, result, dry_run)
+            offset += len(batch)
+        result.total = offset
+
+        if not dry_run and (result.created or result.updated):
+            activity.record(ActivityLog(
+                actor=importer.user,
+                action=ActivityLog.ACTION_IMPORT,
+                model_name=importer.model.__name__,
+                object_repr=f"{source or kind}: {result}"[:255],
+            ))
+            bump_version(importer.model.__name__)
+    return result
+
+
+def _import_batch(importer, batch, offset, result, dry_run):
+    rows = [row if isinstance(row, dict) else {} for row in batch]
+    errors = importer.prepare(rows)
+    # Un serializer (y sus campos) por lote; cada fila pasa por la misma
+    # validación que en la API.
+    child = importer.serializer().child
+
+    valid = {}
+    for index, row in enumerate(rows):
+        row_error = errors.get(index)
+        if not isinstance(batch[index], dict):
+            row_error = {"detail": ["Cada fila debe ser un objeto."]}
+        if not row_error:
+            try:
+                data = dict(child.run_validation({k: v for k, v in row.items() if k != "_place_id"}))
+            except ValidationError as exc:
+                row_error = exc.detail
+        if row_error:
+            result.add_error(offset + index + 1, row_error)
+            continue
+        extra = {"place_id": row["_place_id"]} if "_place_id" in row else {}
+        valid[importer.key(data)] = (data, extra)
+
+    if not valid:
+        return
+    found = importer.existing(set(valid))
+    if dry_run:
+        result.updated += len(found)
+        result.created += len(valid) - len(found)
+        return
+
+    to_create, to_update, fields = [], [], set()
+    for key, (data, extra) in valid.items():
+        instance = found.get(key)
+        if instance is None:
+            instance = importer.build(data, extra)
+            importer.finalize(instance)
+            to_create.append(instance)
+            continue
+        for name, value in {**data, **extra}.items():
+            setattr(instance, name, value)
+        fields.update(data, extra)
+        importer.finalize(instance)
+        to_update.append(instance)
+
+    if to_create:
+        importer.model.objects.bulk_create(to_create)
+    if to_update:
+        model_fields = {f.name for f in importer.model._meta.concrete_fields}
+        fields.update(name for name in ("geohash", "updated_at") if name in model_fields)
+        # Upsert por id (INSERT … ON CONFLICT DO UPDATE, como en
+        # ratings.refresh_places()) en vez de bulk_update(): una sola
+        # sentencia por lote, sin el CASE WHEN por fila y columna que hace
+        # a bulk_update() lento con miles de filas. Las instancias vienen de
+        # la base, así que las columnas que el archivo no trae conservan su
+        # valor; auto_now llena updated_at.
+        importer.model.objects.bulk_create(
+            to_update,
+            update_conflicts=True,
+            unique_fields=[importer.model._meta.pk.name],
+            update_fields=sorted(fields),
+        )
+    result.created += len(to_create)
+    result.updated += len(to_update)
+
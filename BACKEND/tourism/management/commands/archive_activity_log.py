@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tourism.retention import ArchiveLocked, archive, cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve las entradas viejas de la bitácora a archivos .jsonl.gz "
+        "mensuales y las borra de la tabla."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.ACTIVITY_LOG_RETENTION_DAYS,
+            help="Archiva las entradas con más de N días.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.ACTIVITY_ARCHIVE_BATCH_SIZE,
+            help="Filas por lote (cada lote se escribe y se borra por separado).",
+        )
+
+    def handle(self, *args, days, batch_size, **options):
+        try:
+            moved = archive(cutoff(days), batch_size=batch_size)
+        except ArchiveLocked:
+            raise CommandError("Ya hay otro archivado de la bitácora en curso.")
+        for month, count in sorted(moved.items()):
+            self.stdout.write(f"{month:%Y-%m}: {count} entradas archivadas.")
+        self.stdout.write(f"{sum(moved.values())} entradas archivadas en total.")
@@ -0,0 +1,108 @@
+import io
+import json
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from tourism import fastjson
+from tourism.fastjson import FastJSONParser, FastJSONRenderer
+from tourism.models import Media, Place, Review, SiteSettings
+from tourism.serializers import (
+    PlaceListSerializer, PlaceSerializer, ReviewSerializer, SiteSettingsSerializer, place_cards,
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el JSONRenderer/JSONParser de DRF con los de "
+        "tourism/fastjson.py (orjson) sobre respuestas reales: listados de "
+        "lugares y reseñas y la configuración del sitio. Los datos se crean "
+        "dentro de una transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, rows, repeat, **options):
+        if fastjson.orjson is None:
+            self.stdout.write("orjson no está instalado: FastJSONRenderer usa el renderer de DRF.")
+        try:
+            with transaction.atomic():
+                payloads = self._payloads(rows)
+                raise Rollback
+        except Rollback:
+            pass
+
+        slow, fast = JSONRenderer(), FastJSONRenderer()
+        slow_parser, fast_parser = JSONParser(), FastJSONParser()
+        self.stdout.write(f"{'':26} {'KB':>8} {'DRF ms':>9} {'orjson ms':>10} {'x':>6}")
+        for label, data in payloads:
+            body = slow.render(data)
+            same = json.loads(body) == json.loads(fast.render(data))
+            self._row(f"render {label}", len(body), repeat, lambda: slow.render(data), lambda: fast.render(data), same)
+            self._row(
+                f"parse  {label}", len(body), repeat,
+                lambda: slow_parser.parse(io.BytesIO(body)), lambda: fast_parser.parse(io.BytesIO(body)), True,
+            )
+
+        # Tipos que los serializers no convierten a texto solos.
+        sample = {
+            "lat": Decimal("-17.812345"), "at": timezone.now(), "day": timezone.localdate(),
+            "id": uuid.uuid4(), "label": gettext_lazy("Lugar"), "ids": (n for n in range(3)),
+        }
+        expected = json.loads(slow.render(dict(sample, ids=[0, 1, 2])))
+        got = json.loads(fast.render(sample))
+        self.stdout.write(f"tipos especiales iguales a DRF: {'sí' if expected == got else f'NO ({got})'}")
+
+    def _row(self, label, size, repeat, slow, fast, same):
+        slow_ms, fast_ms = self._time(slow, repeat), self._time(fast, repeat)
+        self.stdout.write(
+            f"{label:26} {size / 1024:8.1f} {slow_ms:9.2f} {fast_ms:10.2f} {slow_ms / fast_ms:6.1f}"
+            + ("" if same else "  ¡SALIDA DISTINTA!")
+        )
+
+    def _time(self, func, repeat):
+        func()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - start) * 1000 / repeat
+
+    def _payloads(self, rows):
+        text = "Cascada de 30 metros con poza para nadar; llevar repelente y agua. " * 6
+        Place.objects.bulk_create(
+            [Place(name=f"Bench {i}", slug=f"bench-{i}", description=text, lat=-17.8 - i / 1e4,
+                   lng=-63.1, key_features=["Mirador", "Baños"]) for i in range(rows)],
+            batch_size=2000,
+        )
+        places = Place.objects.filter(slug__startswith="bench-")
+        pks = list(places.values_list("pk", flat=True))
+        Media.objects.bulk_create(
+            [Media(place_id=pk, image=f"places/bench-{pk}-{n}.jpg", caption="Vista") for pk in pks for n in range(3)],
+            batch_size=2000,
+        )
+        Review.objects.bulk_create(
+            [Review(place_id=pks[i % len(pks)], rating=1 + i % 5, comment=text[:240], author_name=f"Visitante {i}")
+             for i in range(rows)],
+            batch_size=2000,
+        )
+        return [
+            ("lugares (detalle)", PlaceSerializer(
+                places.select_related("rating_stats").prefetch_related("media"), many=True).data),
+            ("lugares (tarjetas)", PlaceListSerializer(
+                place_cards(places).select_related("rating_stats"), many=True).data),
+            ("reseñas", ReviewSerializer(Review.objects.filter(place_id__in=pks), many=True).data),
+            ("configuración", SiteSettingsSerializer(SiteSettings()).data),
+        ]
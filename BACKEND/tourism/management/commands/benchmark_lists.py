@@ -0,0 +1,90 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from tourism.models import Media, Place, Post
+from tourism.serializers import (
+    PlaceListSerializer, PlaceSerializer, PostListSerializer, PostSerializer, place_cards, post_cards,
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el listado de lugares y noticias con el serializer completo "
+        "(el de antes) y con el de tarjetas: bytes del JSON, consultas y "
+        "tiempo, con N filas sintéticas. Todo corre dentro de una transacción "
+        "que se revierte al final: no deja datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--places", type=int, default=1000)
+        parser.add_argument("--posts", type=int, default=1000)
+        parser.add_argument("--photos", type=int, default=4, help="Fotos por lugar.")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, places, posts, photos, repeat, **options):
+        try:
+            with transaction.atomic():
+                self._seed(places, posts, photos)
+                self._compare("lugares", repeat, [
+                    ("completo", PlaceSerializer, lambda: Place.objects.filter(slug__startswith="bench-")
+                        .select_related("rating_stats").prefetch_related("media").order_by("-created_at")),
+                    ("tarjetas", PlaceListSerializer, lambda: place_cards(Place.objects.filter(slug__startswith="bench-"))
+                        .select_related("rating_stats").order_by("-created_at")),
+                ])
+                self._compare("noticias", repeat, [
+                    ("completo", PostSerializer, lambda: Post.objects.filter(title__startswith="Bench ")
+                        .order_by("-created_at")),
+                    ("tarjetas", PostListSerializer, lambda: post_cards(Post.objects.filter(title__startswith="Bench "))
+                        .order_by("-created_at")),
+                ])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _seed(self, places, posts, photos):
+        start = time.perf_counter()
+        # Textos del largo de una descripción / noticia real.
+        paragraph = "El sendero baja entre helechos hasta la poza, con agua fría todo el año. " * 12
+        Place.objects.bulk_create(
+            [Place(name=f"Bench {i}", slug=f"bench-{i}", description=paragraph * 2,
+                   lat=-17.8, lng=-63.1, key_features=["Mirador", "Baños"]) for i in range(places)],
+            batch_size=2000,
+        )
+        Media.objects.bulk_create(
+            [Media(place_id=pk, image=f"places/bench-{pk}-{n}.jpg", caption="Vista")
+             for pk in Place.objects.filter(slug__startswith="bench-").values_list("pk", flat=True)
+             for n in range(photos)],
+            batch_size=2000,
+        )
+        Post.objects.bulk_create(
+            [Post(title=f"Bench {i}", body=paragraph * 8, cover=f"posts/bench-{i}.jpg") for i in range(posts)],
+            batch_size=2000,
+        )
+        self.stdout.write(
+            f"{places} lugares ({photos} fotos c/u) y {posts} noticias insertados "
+            f"en {time.perf_counter() - start:.1f}s"
+        )
+
+    def _compare(self, label, repeat, variants):
+        self.stdout.write(f"{label}:")
+        for name, serializer_class, queryset in variants:
+            timings = []
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    payload = JSONRenderer().render(serializer_class(queryset(), many=True).data)
+                    timings.append(time.perf_counter() - start)
+            rows = len(json.loads(payload))
+            self.stdout.write(
+                f"  {name:9} {rows:6} filas {len(payload) / 1024:10.1f} KB "
+                f"{len(queries):4} consultas {min(timings) * 1000:9.1f} ms"
+            )
@@ -0,0 +1,77 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tourism import geo
+from tourism.models import Place
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide /api/places/nearby/ (prefiltro por geohash + haversine) contra "
+        "recorrer toda la tabla, con N lugares sintéticos. Todo corre dentro "
+        "de una transacción que se revierte al final: no deja datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--places", type=int, default=100_000)
+        parser.add_argument("--queries", type=int, default=50)
+        parser.add_argument("--radius", type=float, default=10.0, help="Radio en km.")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, places, queries, radius, seed, **options):
+        rng = random.Random(seed)
+        # Alrededor de Bolivia, para que la densidad sea realista.
+        def point():
+            return rng.uniform(-22.0, -10.0), rng.uniform(-69.0, -58.0)
+
+        try:
+            with transaction.atomic():
+                self._run(places, queries, radius, point)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def _run(self, count, queries, radius, point):
+        start = time.perf_counter()
+        rows = []
+        for i in range(count):
+            lat, lng = point()
+            rows.append(Place(
+                name=f"Bench {i}", slug=f"bench-{i}", lat=round(lat, 6), lng=round(lng, 6),
+                geohash=geo.encode(lat, lng),
+            ))
+        Place.objects.bulk_create(rows, batch_size=2000)
+        self.stdout.write(f"{count} lugares insertados en {time.perf_counter() - start:.1f}s")
+
+        centers = [point() for _ in range(queries)]
+        qs = Place.objects.filter(is_active=True)
+
+        start = time.perf_counter()
+        indexed = [geo.nearby(qs, lat, lng, radius, 20) for lat, lng in centers]
+        indexed_ms = (time.perf_counter() - start) * 1000 / queries
+
+        start = time.perf_counter()
+        everything = list(qs.exclude(lat=None).exclude(lng=None).values_list("pk", "lat", "lng"))
+        naive = []
+        for lat, lng in centers:
+            hits = sorted(
+                (geo.haversine_km(lat, lng, float(plat), float(plng)), pk)
+                for pk, plat, plng in everything
+            )
+            naive.append([pk for distance, pk in hits if distance <= radius][:20])
+        naive_ms = (time.perf_counter() - start) * 1000 / queries
+
+        same = all([p.pk for p in a] == b for a, b in zip(indexed, naive))
+        self.stdout.write(
+            f"radio {radius} km, {queries} consultas:\n"
+            f"  geohash + haversine: {indexed_ms:8.2f} ms/consulta\n"
+            f"  tabla completa:      {naive_ms:8.2f} ms/consulta\n"
+            f"  mismos resultados:   {'sí' if same else 'NO'}"
+        )
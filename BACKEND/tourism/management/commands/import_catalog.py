@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tourism.importer import IMPORTERS, ImportFormatError, read_rows, run_import
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa lugares, contactos o eventos desde un archivo CSV, JSON o "
+        "JSON Lines (crea o actualiza por clave; ver tourism/importer.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORTERS))
+        parser.add_argument("path")
+        parser.add_argument("--dry-run", action="store_true", help="Solo valida; no escribe nada.")
+        parser.add_argument("--user", help="Usuario al que se atribuye la importación en la bitácora.")
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, kind, path, dry_run, user, batch_size, **options):
+        actor = None
+        if user:
+            actor = get_user_model().objects.filter(username=user).first()
+            if actor is None:
+                raise CommandError(f"No existe el usuario {user!r}.")
+        try:
+            with open(path, "rb") as fh:
+                result = run_import(
+                    kind, read_rows(fh, path), user=actor, dry_run=dry_run,
+                    batch_size=batch_size, source=path.rsplit("/", 1)[-1],
+                )
+        except (OSError, ImportFormatError) as exc:
+            raise CommandError(str(exc))
+
+        for error in result.errors:
+            self.stderr.write(f"Fila {error['row']}: {error['errors']}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(f"… y {result.error_count - len(result.errors)} filas más con errores.")
+        self.stdout.write(("[simulación] " if dry_run else "") + str(result))
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tourism.models import UploadJob
+from tourism.uploads import requeue
+
+
+class Command(BaseCommand):
+    help = (
+        "Procesa las subidas que quedaron pendientes (p. ej. si el proceso se "
+        "reinició antes de terminarlas). Conviene correrlo al desplegar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--failed", action="store_true", help="Reintenta también las subidas fallidas."
+        )
+        parser.add_argument(
+            "--stale-minutes", type=int, default=30,
+            help="Retoma las que figuran 'subiendo' sin cambios hace más de N minutos.",
+        )
+
+    def handle(self, *args, failed, stale_minutes, **options):
+        statuses = [UploadJob.STATUS_PENDING]
+        if failed:
+            statuses.append(UploadJob.STATUS_FAILED)
+        jobs = requeue(statuses)
+        jobs += requeue(
+            [UploadJob.STATUS_RUNNING],
+            older_than=timezone.now() - timedelta(minutes=stale_minutes),
+        )
+        done = sum(1 for job in jobs if job and job.status == UploadJob.STATUS_DONE)
+        self.stdout.write(f"{len(jobs)} subidas procesadas, {done} completadas.")
@@ -0,0 +1,22 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tourism.snapshots import publish
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera los snapshots JSON estáticos de todos los endpoints de "
+        "SNAPSHOT_ENDPOINTS y publica el manifiesto (ver tourism/snapshots.py). "
+        "Pensado para correr al desplegar; después se mantienen solos tras "
+        "cada escritura."
+    )
+
+    def handle(self, *args, **options):
+        manifest = publish()
+        for name, url in manifest["files"].items():
+            path = os.path.join(settings.SNAPSHOT_ROOT, os.path.basename(url))
+            self.stdout.write(f"  {name:14} {url}  ({os.path.getsize(path) / 1024:.1f} KB)")
+        self.stdout.write(self.style.SUCCESS(f"Snapshots publicados, versión {manifest['version']}."))
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tourism.chunked import purge
+
+
+class Command(BaseCommand):
+    help = "Borra las subidas por partes abandonadas (y sus archivos en disco)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours", type=int, default=settings.CHUNKED_UPLOAD_EXPIRE_HOURS,
+            help="Horas sin actividad para considerar abandonada una subida.",
+        )
+
+    def handle(self, *args, hours, **options):
+        count = purge(timezone.now() - timedelta(hours=hours))
+        self.stdout.write(f"{count} subidas por partes eliminadas.")
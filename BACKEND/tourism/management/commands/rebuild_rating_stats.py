@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tourism.ratings import refresh_places
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye desde cero PlaceRatingStats (suma, conteo e histograma de "
+        "reseñas aprobadas por lugar) a partir de la tabla Review."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--place", action="append", type=int, dest="place_ids",
+            help="ID de un lugar a recalcular (se puede repetir). Por defecto, todos.",
+        )
+
+    def handle(self, *args, place_ids=None, **options):
+        with transaction.atomic():
+            written = refresh_places(place_ids)
+        self.stdout.write(self.style.SUCCESS(f"Estadísticas recalculadas para {written} lugar(es)."))
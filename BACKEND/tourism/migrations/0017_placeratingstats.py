@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def build_rating_stats(apps, schema_editor):
+    """Llena PlaceRatingStats con las reseñas aprobadas que ya existen."""
+    Place = apps.get_model("tourism", "Place")
+    Review = apps.get_model("tourism", "Review")
+    PlaceRatingStats = apps.get_model("tourism", "PlaceRatingStats")
+
+    aggregates = {
+        row.pop("place_id"): row
+        for row in Review.objects.filter(is_approved=True).order_by().values("place_id").annotate(
+            rating_sum=Sum("rating"),
+            rating_count=Count("id"),
+            **{f"stars_{s}": Count("id", filter=Q(rating=s)) for s in range(1, 6)},
+        )
+    }
+    PlaceRatingStats.objects.bulk_create([
+        PlaceRatingStats(place_id=pk, **aggregates.get(pk, {}))
+        for pk in Place.objects.values_list("pk", flat=True)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourism', '0016_activitylog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlaceRatingStats',
+            fields=[
+                ('place', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating_stats', serialize=False, to='tourism.place')),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('rating_count', models.IntegerField(default=0)),
+                ('stars_1', models.IntegerField(default=0)),
+                ('stars_2', models.IntegerField(default=0)),
+                ('stars_3', models.IntegerField(default=0)),
+                ('stars_4', models.IntegerField(default=0)),
+                ('stars_5', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Estadísticas de calificación',
+                'verbose_name_plural': 'Estadísticas de calificación',
+            },
+        ),
+        migrations.RunPython(build_rating_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def install_search(apps, schema_editor):
+    # El índice vive fuera del modelo (columna generada + GIN en PostgreSQL,
+    # tabla virtual FTS5 en SQLite): ver tourism/search.py.
+    from tourism import search
+    search.install(schema_editor.connection)
+
+
+def uninstall_search(apps, schema_editor):
+    from tourism import search
+    search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourism', '0018_content_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search, uninstall_search),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_geohash(apps, schema_editor):
+    from tourism.geo import encode
+
+    Place = apps.get_model("tourism", "Place")
+    places = list(Place.objects.filter(lat__isnull=False, lng__isnull=False))
+    for place in places:
+        place.geohash = encode(float(place.lat), float(place.lng))
+    Place.objects.bulk_update(places, ["geohash"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourism', '0019_place_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, max_length=12),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(fields=['geohash'], name='tourism_place_geohash_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(fill_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:45
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourism', '0020_place_geohash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('running', 'Subiendo'), ('done', 'Completada'), ('failed', 'Fallida')], default='pending', max_length=10)),
+                ('model', models.CharField(help_text='app_label.ModelName del destino.', max_length=100)),
+                ('object_id', models.CharField(max_length=50)),
+                ('field', models.CharField(max_length=50)),
+                ('folder', models.CharField(blank=True, max_length=100)),
+                ('spool_path', models.CharField(max_length=500)),
+                ('original_name', models.CharField(max_length=255)),
+                ('content_type', models.CharField(blank=True, max_length=100)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('result_name', models.CharField(blank=True, max_length=500)),
+                ('result_url', models.URLField(blank=True, max_length=512)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Subida',
+                'verbose_name_plural': 'Subidas',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='tourism_upl_status_d4291b_idx'), models.Index(fields=['model', 'object_id'], name='tourism_upl_model_877464_idx')],
+            },
+        ),
+    ]
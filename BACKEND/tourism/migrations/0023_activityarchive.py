@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourism', '0022_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='Primer día del mes archivado.', unique=True)),
+                ('path', models.CharField(max_length=500)),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('size_bytes', models.PositiveBigIntegerField(default=0)),
+                ('first_at', models.DateTimeField(blank=True, null=True)),
+                ('last_at', models.DateTimeField(blank=True, null=True)),
+                ('by_model', models.JSONField(blank=True, default=dict, help_text='{modelo: {acción: cantidad}}')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Bitácora archivada',
+                'verbose_name_plural': 'Bitácora archivada',
+                'ordering': ['-month'],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 02:58
+
+from django.db import migrations, models
+
+ORDER_GAP = 1 << 20
+
+
+def spread_order(apps, schema_editor):
+    # 0, 1, 2… (con empates) -> ORDER_GAP, 2·ORDER_GAP, … en el mismo orden.
+    GalleryItem = apps.get_model("tourism", "GalleryItem")
+    items = list(GalleryItem.objects.order_by("order", "-id").only("pk", "order"))
+    for position, item in enumerate(items, start=1):
+        item.order = position * ORDER_GAP
+    GalleryItem.objects.bulk_update(items, ["order"], batch_size=500)
+
+
+def compact_order(apps, schema_editor):
+    GalleryItem = apps.get_model("tourism", "GalleryItem")
+    items = list(GalleryItem.objects.order_by("order", "-id").only("pk", "order"))
+    for position, item in enumerate(items):
+        item.order = position
+    GalleryItem.objects.bulk_update(items, ["order"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourism', '0023_activityarchive'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='galleryitem',
+            name='order',
+            field=models.BigIntegerField(blank=True, default=None, help_text='Vacío al crear: el item va al final.'),
+        ),
+        migrations.RunPython(spread_order, compact_order),
+    ]
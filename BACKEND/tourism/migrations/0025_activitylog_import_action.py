@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourism', '0024_galleryitem_sparse_order'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activitylog',
+            name='action',
+            field=models.CharField(choices=[('create', 'Creación'), ('update', 'Edición'), ('delete', 'Eliminación'), ('import', 'Importación')], max_length=10),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-18 03:05
+
+import django.core.validators
+import tourism.storage
+import tourism.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tourism', '0025_activitylog_import_action'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=tourism.storage.media_storage, upload_to='events/', validators=[django.core.validators.FileExtensionValidator(['jpg', 'jpeg', 'png', 'webp', 'gif']), tourism.validators.validate_file_size]),
+        ),
+        migrations.AlterField(
+            model_name='galleryitem',
+            name='media_file',
+            field=models.FileField(storage=tourism.storage.media_storage, upload_to='gallery/'),
+        ),
+        migrations.AlterField(
+            model_name='media',
+            name='image',
+            field=models.ImageField(storage=tourism.storage.media_storage, upload_to='places/', validators=[django.core.validators.FileExtensionValidator(['jpg', 'jpeg', 'png', 'webp', 'gif']), tourism.validators.validate_file_size]),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='cover',
+            field=models.ImageField(blank=True, storage=tourism.storage.media_storage, upload_to='posts/', validators=[django.core.validators.FileExtensionValidator(['jpg', 'jpeg', 'png', 'webp', 'gif']), tourism.validators.validate_file_size]),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='attachment',
+            field=models.FileField(blank=True, help_text='Opcional: Sube una foto o video (máx 50MB).', null=True, storage=tourism.storage.media_storage, upload_to='reviews/', validators=[django.core.validators.FileExtensionValidator(['jpg', 'jpeg', 'png', 'webp', 'gif', 'mp4', 'mov', 'avi', 'webm']), tourism.validators.validate_file_size]),
+        ),
+    ]
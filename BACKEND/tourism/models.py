@@ -1,9 +1,14 @@
 # tourism/models.py
-from django.db import models
+import uuid
+
+from django.db import models, transaction
 from django.conf import settings
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator, FileExtensionValidator
-from cloudinary_storage.storage import MediaCloudinaryStorage
 from .validators import validate_file_size
+from .caching import bump_version
+from .storage import media_storage
+from . import activity, geo
 
 IMAGE_EXTENSIONS = ["jpg", "jpeg", "png", "webp", "gif"]
 VIDEO_EXTENSIONS = ["mp4", "mov", "avi", "webm"]
@@ -26,6 +31,9 @@ class Place(models.Model):
     address = models.CharField(max_length=200, blank=True)
     lat = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     lng = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    # Celda geográfica de (lat, lng), recalculada en save(); es lo que usan
+    # las búsquedas por cercanía y por bbox (ver tourism/geo.py).
+    geohash = models.CharField(max_length=12, blank=True, editable=False)
     key_features = models.JSONField(
         default=list,
         blank=True,
@@ -39,24 +47,39 @@ class Place(models.Model):
         on_delete=models.SET_NULL,
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Marca de cambio para ETag/Last-Modified (ver tourism/conditional.py)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         indexes = [
             models.Index(fields=["slug"]),
             models.Index(fields=["category", "is_active"]),
+            # varchar_pattern_ops: para que LIKE 'prefijo%' use el índice en
+            # PostgreSQL (en SQLite se ignora y geo.py consulta por rango).
+            models.Index(
+                fields=["geohash"], name="tourism_place_geohash_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
         ]
         ordering = ["-created_at"]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if self.lat is not None and self.lng is not None:
+            self.geohash = geo.encode(float(self.lat), float(self.lng))
+        else:
+            self.geohash = ""
+        super().save(*args, **kwargs)
+
 
 class Media(models.Model):
     place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name="media")
-    # ⬇️ Forzamos Cloudinary
+    # ⬇️ El storage sale de MEDIA_STORAGE (tourism/storage.py)
     image = models.ImageField(
         upload_to="places/",
-        storage=MediaCloudinaryStorage(),
+        storage=media_storage,
         validators=[FileExtensionValidator(IMAGE_EXTENSIONS), validate_file_size],
     )
     caption = models.CharField(max_length=150, blank=True)
@@ -83,7 +106,7 @@ class Event(models.Model):
     # tener un afiche/flyer que ayuda mucho más que solo texto.
     image = models.ImageField(
         upload_to="events/",
-        storage=MediaCloudinaryStorage(),
+        storage=media_storage,
         validators=[FileExtensionValidator(IMAGE_EXTENSIONS), validate_file_size],
         blank=True,
         null=True,
@@ -95,6 +118,7 @@ class Event(models.Model):
     # entrar al sitio, en vez de mostrar automáticamente "el más próximo"
     # (que podría no tener buen arte o no ser el que quieren promocionar).
     is_featured = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-start_date"]
@@ -109,11 +133,11 @@ class Post(models.Model):
     place = models.ForeignKey(
         Place, null=True, blank=True, on_delete=models.SET_NULL, related_name="posts"
     )
-    # ⬇️ Forzamos Cloudinary
+    # ⬇️ El storage sale de MEDIA_STORAGE (tourism/storage.py)
     cover = models.ImageField(
         upload_to="posts/",
         blank=True,
-        storage=MediaCloudinaryStorage(),
+        storage=media_storage,
         validators=[FileExtensionValidator(IMAGE_EXTENSIONS), validate_file_size],
     )
     is_published = models.BooleanField(default=True)
@@ -125,6 +149,7 @@ class Post(models.Model):
 
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         indexes = [
@@ -149,7 +174,7 @@ class Review(models.Model):
         upload_to="reviews/",
         null=True,
         blank=True,
-        storage=MediaCloudinaryStorage(),
+        storage=media_storage,
         validators=[
             FileExtensionValidator(IMAGE_EXTENSIONS + VIDEO_EXTENSIONS),
             validate_file_size
@@ -167,6 +192,46 @@ class Review(models.Model):
         return f"Review #{self.id} · {self.place.name if self.place_id else 'sin lugar'}"
 
 
+class PlaceRatingStats(models.Model):
+    """
+    Estadísticas de calificación de un lugar (solo reseñas aprobadas):
+    suma, cantidad e histograma por estrellas. Antes PlaceViewSet anotaba
+    cada consulta con Avg/Count sobre toda la tabla Review (un GROUP BY que
+    se volvía más lento con cada reseña nueva); ahora se mantienen al día
+    desde tourism/ratings.py y el listado de lugares solo lee una fila por
+    lugar. Si alguna vez se desincronizan, se reconstruyen con
+    `python manage.py rebuild_rating_stats`.
+    """
+    place = models.OneToOneField(
+        Place, on_delete=models.CASCADE, primary_key=True, related_name="rating_stats"
+    )
+    rating_sum = models.IntegerField(default=0)
+    rating_count = models.IntegerField(default=0)
+    stars_1 = models.IntegerField(default=0)
+    stars_2 = models.IntegerField(default=0)
+    stars_3 = models.IntegerField(default=0)
+    stars_4 = models.IntegerField(default=0)
+    stars_5 = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Estadísticas de calificación"
+        verbose_name_plural = "Estadísticas de calificación"
+
+    def __str__(self):
+        return f"{self.place_id}: {self.rating_count} reseñas"
+
+    @property
+    def avg_rating(self):
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+    @property
+    def histogram(self):
+        return {stars: getattr(self, f"stars_{stars}") for stars in range(1, 6)}
+
+
 class ContactInfo(models.Model):
     CATEGORY_CHOICES = [
         ("ASOCIACION", "Asociación y Guías"),
@@ -196,18 +261,33 @@ class ContactInfo(models.Model):
 
 
 class GalleryItem(models.Model):
+    """
+    `order` es un rango disperso: los items quedan separados por ORDER_GAP
+    y mover uno le asigna el punto medio entre sus nuevos vecinos (ver
+    move()), así que reordenar escribe una sola fila. Antes `order` era
+    0, 1, 2… y arrastrar un item al principio obligaba al panel a mandar un
+    PATCH por cada item de la galería. Cuando dos vecinos quedan pegados
+    (sin enteros entre medio) se reparte todo de nuevo con rebalance_order(),
+    en una sola sentencia.
+    """
     MEDIA_TYPE_CHOICES = [
         ("IMAGE", "Image"),
         ("VIDEO", "Video"),
     ]
+    # 2**20: unas veinte inserciones seguidas en el mismo hueco antes de
+    # tener que rebalancear, y sobra rango en un BigInteger.
+    ORDER_GAP = 1 << 20
 
     title = models.CharField(max_length=150)
     media_type = models.CharField(max_length=5, choices=MEDIA_TYPE_CHOICES, default="IMAGE")
-    # ⬇️ Forzamos Cloudinary (sirve para imagen o video)
-    media_file = models.FileField(upload_to="gallery/", storage=MediaCloudinaryStorage())
-    order = models.PositiveIntegerField(default=0)
+    # ⬇️ Imagen o video; el storage sale de MEDIA_STORAGE (tourism/storage.py)
+    media_file = models.FileField(upload_to="gallery/", storage=media_storage)
+    order = models.BigIntegerField(
+        blank=True, default=None, help_text="Vacío al crear: el item va al final."
+    )
     is_active = models.BooleanField(default=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     # No obligatorio; lo autollenamos en la vista (perform_create/update)
     media_file_url = models.URLField(max_length=512, blank=True)
@@ -222,6 +302,87 @@ class GalleryItem(models.Model):
     def __str__(self):
         return f"{self.title} · {self.media_type}"
 
+    def save(self, *args, **kwargs):
+        if self.order is None:
+            self.order = self.next_order()
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def with_file(cls):
+        """
+        Los items que ya tienen archivo. Mientras su subida sigue en cola
+        (tourism/uploads.py) el item existe sin archivo ni URL, y en el
+        sitio público sería una tarjeta rota.
+        """
+        return cls.objects.exclude(media_file="", media_file_url="")
+
+    @classmethod
+    def next_order(cls):
+        last = cls.objects.aggregate(last=models.Max("order"))["last"]
+        return cls.ORDER_GAP if last is None else last + cls.ORDER_GAP
+
+    def move(self, *, before=None, after=None):
+        """
+        Ubica este item justo antes de `before` o justo después de `after`
+        (otro GalleryItem) actualizando solo su fila. Devuelve True si antes
+        hubo que rebalancear toda la galería.
+
+        Bloquea las filas de la galería hasta terminar (lock_rows()) y relee
+        el `order` del vecino: el punto medio se calcula con valores que
+        nadie más puede cambiar mientras tanto, y dos movimientos
+        simultáneos al mismo hueco van uno detrás del otro en vez de caer en
+        el mismo valor.
+        """
+        neighbor = before or after
+        with transaction.atomic():
+            type(self).lock_rows()
+            neighbor.refresh_from_db(fields=["order"])
+            for rebalanced in (False, True):
+                others = type(self).objects.exclude(pk=self.pk)
+                if before is not None:
+                    upper = neighbor.order
+                    lower = others.filter(order__lt=upper).aggregate(v=models.Max("order"))["v"]
+                    lower = upper - 2 * self.ORDER_GAP if lower is None else lower
+                else:
+                    lower = neighbor.order
+                    upper = others.filter(order__gt=lower).aggregate(v=models.Min("order"))["v"]
+                    upper = lower + 2 * self.ORDER_GAP if upper is None else upper
+                tied = others.filter(order=neighbor.order).exclude(pk=neighbor.pk).exists()
+                if upper - lower > 1 and not tied:
+                    break
+                self.rebalance_order()
+                neighbor.refresh_from_db(fields=["order"])
+            else:
+                raise RuntimeError("No se pudo ubicar el item después de rebalancear.")
+
+            self.order = (lower + upper) // 2
+            # update() y no save(): no pasa por señales ni toca los otros campos.
+            self.updated_at = timezone.now()
+            type(self).objects.filter(pk=self.pk).update(order=self.order, updated_at=self.updated_at)
+        return rebalanced
+
+    @classmethod
+    def lock_rows(cls):
+        """
+        SELECT … FOR UPDATE sobre toda la galería (en orden de pk, para que
+        dos transacciones no se bloqueen cruzadas). Hay que estar dentro de
+        transaction.atomic(); el bloqueo dura hasta el final de la misma.
+        """
+        list(cls.objects.select_for_update().order_by("pk").values_list("pk", flat=True))
+
+    @classmethod
+    def rebalance_order(cls):
+        """Reparte `order` cada ORDER_GAP en el orden actual, con un solo UPDATE."""
+        with transaction.atomic():
+            items = list(cls.objects.select_for_update().order_by("order", "-id").only("pk", "order"))
+            now = timezone.now()
+            for position, item in enumerate(items, start=1):
+                item.order = position * cls.ORDER_GAP
+                item.updated_at = now
+            # Sin batch_size: un único UPDATE … SET order = CASE id WHEN … END.
+            cls.objects.bulk_update(items, ["order", "updated_at"])
+        return len(items)
+
 
 def default_park_rules():
     return [
@@ -383,6 +544,9 @@ class SiteSettings(models.Model):
     def save(self, *args, **kwargs):
         self.pk = 1
         super().save(*args, **kwargs)
+        # Invalida la copia en memoria de cada worker (tourism/site_settings.py)
+        # y las respuestas cacheadas, también si se edita desde Django Admin.
+        bump_version("SiteSettings")
 
 
 class ActivityLog(models.Model):
@@ -400,10 +564,13 @@ class ActivityLog(models.Model):
     ACTION_CREATE = "create"
     ACTION_UPDATE = "update"
     ACTION_DELETE = "delete"
+    # Una entrada de resumen por importación masiva (tourism/importer.py).
+    ACTION_IMPORT = "import"
     ACTION_CHOICES = [
         (ACTION_CREATE, "Creación"),
         (ACTION_UPDATE, "Edición"),
         (ACTION_DELETE, "Eliminación"),
+        (ACTION_IMPORT, "Importación"),
     ]
 
     actor = models.ForeignKey(
@@ -435,11 +602,155 @@ class ActivityLog(models.Model):
 
     @classmethod
     def log(cls, *, actor, action, instance):
+        """
+        No escribe de inmediato: se guarda al confirmarse la transacción,
+        junto con el resto de la request (ver tourism/activity.py).
+        """
+        cls.log_many(actor=actor, action=action, instances=[instance])
+
+    @classmethod
+    def log_many(cls, *, actor, action, instances):
+        """Una entrada por instancia, escritas juntas (operaciones masivas)."""
         user = actor if getattr(actor, "is_authenticated", False) else None
-        cls.objects.create(
-            actor=user,
-            action=action,
-            model_name=instance.__class__.__name__,
-            object_id=str(getattr(instance, "pk", "")),
-            object_repr=str(instance)[:255],
-        )
+        activity.record(*(
+            cls(
+                actor=user,
+                action=action,
+                model_name=instance.__class__.__name__,
+                object_id=str(getattr(instance, "pk", "")),
+                object_repr=str(instance)[:255],
+            )
+            for instance in instances
+        ))
+
+
+class UploadJob(models.Model):
+    """
+    Subida de un archivo al almacenamiento, hecha fuera de la request (ver
+    tourism/uploads.py). Antes la galería llamaba a cloudinary.uploader
+    dentro de create/update y los ImageField/FileField de Media, Event,
+    Post y Review subían en el save(): un video de 50 MB dejaba un worker
+    de gunicorn bloqueado decenas de segundos. Ahora la request deja el
+    archivo en disco, crea este registro y responde 202 con su id; el panel
+    consulta /api/uploads/<id>/ hasta que termine.
+
+    `model`/`object_id`/`field` dicen qué campo se llena con el resultado:
+    el nombre del archivo si es un FileField, la URL si es un URLField
+    (GalleryItem.media_file_url). El id es un UUID para que no se puedan
+    adivinar los trabajos de otros.
+    """
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pendiente"),
+        (STATUS_RUNNING, "Subiendo"),
+        (STATUS_DONE, "Completada"),
+        (STATUS_FAILED, "Fallida"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    model = models.CharField(max_length=100, help_text="app_label.ModelName del destino.")
+    object_id = models.CharField(max_length=50)
+    field = models.CharField(max_length=50)
+    folder = models.CharField(max_length=100, blank=True)
+
+    spool_path = models.CharField(max_length=500)
+    original_name = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.PositiveBigIntegerField(default=0)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    result_name = models.CharField(max_length=500, blank=True)
+    result_url = models.URLField(max_length=512, blank=True)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+            models.Index(fields=["model", "object_id"]),
+        ]
+        verbose_name = "Subida"
+        verbose_name_plural = "Subidas"
+
+    def __str__(self):
+        return f"{self.original_name} → {self.model} #{self.object_id} ({self.status})"
+
+
+class ChunkedUpload(models.Model):
+    """
+    Subida reanudable por partes (ver tourism/chunked.py). El cliente la
+    inicia con el nombre y el tamaño, manda los bytes en varios PUT con su
+    offset y al final la cierra con el SHA-256 del archivo. Si se corta la
+    conexión, consulta el offset guardado y sigue desde ahí. Completa, se
+    adjunta por id a una reseña o a un item de la galería (`upload_id`).
+    """
+    STATUS_UPLOADING = "uploading"
+    STATUS_COMPLETE = "complete"
+    STATUS_ATTACHED = "attached"
+    STATUS_CHOICES = [
+        (STATUS_UPLOADING, "Recibiendo"),
+        (STATUS_COMPLETE, "Completa"),
+        (STATUS_ATTACHED, "Adjuntada"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_UPLOADING)
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True)
+    path = models.CharField(max_length=500)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["status", "updated_at"])]
+        verbose_name = "Subida por partes"
+        verbose_name_plural = "Subidas por partes"
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.total_size})"
+
+
+class ActivityArchive(models.Model):
+    """
+    Índice de la bitácora archivada (ver tourism/retention.py): una fila por
+    mes con el archivo .jsonl.gz donde quedaron sus entradas y un resumen,
+    para listar lo archivado sin abrir los archivos. Antes ActivityLog
+    crecía sin límite; ahora lo viejo sale de la tabla y queda acá.
+    """
+    month = models.DateField(unique=True, help_text="Primer día del mes archivado.")
+    path = models.CharField(max_length=500)
+    row_count = models.PositiveIntegerField(default=0)
+    # Bytes confirmados del archivo. Lo que haya después quedó de una
+    # corrida que se cortó antes de borrar sus filas, y se descarta.
+    size_bytes = models.PositiveBigIntegerField(default=0)
+    first_at = models.DateTimeField(null=True, blank=True)
+    last_at = models.DateTimeField(null=True, blank=True)
+    by_model = models.JSONField(default=dict, blank=True, help_text="{modelo: {acción: cantidad}}")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-month"]
+        verbose_name = "Bitácora archivada"
+        verbose_name_plural = "Bitácora archivada"
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} ({self.row_count} entradas)"
@@ -0,0 +1,176 @@
+# tourism/pagination.py
+import json
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+def _encode_value(value):
+    # isoformat() conserva los microsegundos; DjangoJSONEncoder los trunca a
+    # milisegundos y dos filas creadas en el mismo ms terminarían con el
+    # mismo cursor.
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    # None va como null y no como el texto "None". get_ordering() no deja
+    # ordenar por columnas que admiten NULL, así que solo puede venir de una
+    # anotación, y un cursor con null se rechaza en _after().
+    if value is None:
+        return None
+    return str(value)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) para todos los listados de la API.
+
+    A diferencia de CursorPagination de DRF, que solo usa el primer campo
+    del orden y resuelve empates con un offset (con `order` en la galería,
+    donde casi todos los items comparten valor, el offset crecía sin
+    límite), aquí el cursor guarda el valor de TODOS los campos del orden y
+    filtra con una comparación lexicográfica. Siempre se agrega la pk como
+    desempate, así cada posición es única y el cursor es estable aunque se
+    inserten filas nuevas entre páginas.
+
+    El orden sale de `pagination_ordering` en la vista o, si no existe, del
+    order_by() del queryset / Meta.ordering del modelo.
+
+    Es opt-in: mientras settings.API_PAGINATION_OPT_IN sea True, solo se
+    pagina si el cliente manda `?cursor=` o `?page_size=`; sin esos
+    parámetros la respuesta sigue siendo la lista completa de siempre, para
+    no romper a los clientes actuales. Las vistas nuevas cuyo listado puede
+    crecer sin límite (p. ej. la bitácora) ponen `pagination_required =
+    True` y se paginan siempre.
+    """
+    page_size = settings.API_PAGE_SIZE
+    max_page_size = settings.API_MAX_PAGE_SIZE
+    page_size_query_param = "page_size"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if settings.API_PAGINATION_OPT_IN and not getattr(view, "pagination_required", False) and not (
+            self.cursor_query_param in request.query_params
+            or self.page_size_query_param in request.query_params
+        ):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, current_position = False, None
+        else:
+            _, reverse, current_position = self.cursor
+
+        ordering = _reverse_ordering(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if current_position is not None:
+            try:
+                queryset = queryset.filter(self._after(ordering, current_position))
+            except (ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following = len(results) > len(self.page)
+        if reverse:
+            self.page = list(reversed(self.page))
+
+        # Los cursores son exclusivos: "siguiente" arranca después del último
+        # item mostrado y "anterior" termina antes del primero.
+        first = self._position(self.page[0]) if self.page else current_position
+        last = self._position(self.page[-1]) if self.page else current_position
+        if reverse:
+            self.has_next = current_position is not None
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = current_position is not None
+        self.next_position = last
+        self.previous_position = first
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        ordering = (
+            getattr(view, "pagination_ordering", None)
+            or queryset.query.order_by
+            or queryset.model._meta.ordering
+            or ("-pk",)
+        )
+        ordering = (ordering,) if isinstance(ordering, str) else tuple(ordering)
+        assert all("__" not in field for field in ordering), (
+            "KeysetPagination no admite lookups con doble guion bajo en el orden."
+        )
+        # (a > x) no incluye los NULL, y cada base los ordena distinto
+        # (primero en SQLite, al final en PostgreSQL): con un campo nulo en
+        # el orden, las filas con NULL se perderían o repetirían entre páginas.
+        opts = queryset.model._meta
+        for field in ordering:
+            name = field.lstrip("-")
+            try:
+                nullable = name != "pk" and opts.get_field(name).null
+            except FieldDoesNotExist:
+                nullable = False  # una anotación: no hay cómo saberlo
+            assert not nullable, (
+                f"KeysetPagination no admite ordenar por `{name}`, que admite NULL."
+            )
+        if ordering[-1].lstrip("-") not in ("pk", "id"):
+            ordering += ("-pk" if ordering[-1].startswith("-") else "pk",)
+        return ordering
+
+    def _get_position_from_instance(self, instance, ordering):
+        return json.dumps([_encode_value(getattr(instance, field.lstrip("-"))) for field in ordering])
+
+    def _position(self, instance):
+        return self._get_position_from_instance(instance, self.ordering)
+
+    def _after(self, ordering, position):
+        """
+        Filtro "viene después de `position`" según `ordering`:
+        (a > x) OR (a = x AND b > y) OR ... respetando la dirección de cada campo.
+        """
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(ordering) or None in values:
+            raise NotFound(self.invalid_cursor_message)
+
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, values):
+            attr = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{attr}__{lookup}": value})
+            equal[attr] = value
+        return condition
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self._cursor(reverse=False, position=self.next_position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self._cursor(reverse=True, position=self.previous_position))
+
+    def _cursor(self, *, reverse, position):
+        # El offset de DRF no hace falta: cada posición es única.
+        return Cursor(offset=0, reverse=reverse, position=position)
+
+
+def _reverse_ordering(ordering):
+    return tuple(field[1:] if field.startswith("-") else "-" + field for field in ordering)
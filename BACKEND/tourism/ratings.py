@@ -0,0 +1,122 @@
+# tourism/ratings.py
+"""
+Mantenimiento de PlaceRatingStats (suma, conteo e histograma de reseñas
+aprobadas por lugar).
+
+- apply_review(): ajuste incremental (+1/-1) con expresiones F(), usado por
+  las señales de Review (tourism/signals.py) al crear, aprobar/desaprobar,
+  editar o borrar una reseña.
+- refresh_places(): recalcula desde cero las estadísticas de los lugares
+  indicados (o de todos) con una sola consulta agrupada. Lo usan el comando
+  rebuild_rating_stats y cualquier operación masiva que salte las señales
+  (QuerySet.update()/delete()).
+- deferred(): para operaciones masivas; junta los lugares tocados y los
+  recalcula una sola vez al final en vez de un UPDATE por reseña.
+"""
+import contextvars
+from contextlib import contextmanager
+
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import Place, PlaceRatingStats, Review
+
+STARS = range(1, 6)
+STAT_FIELDS = ["rating_sum", "rating_count"] + [f"stars_{s}" for s in STARS] + ["updated_at"]
+
+_deferred = contextvars.ContextVar("rating_stats_deferred", default=None)
+
+
+@contextmanager
+def deferred():
+    """
+    Dentro del bloque, apply_review() (y por lo tanto las señales de Review)
+    solo anota el lugar; al salir sin errores se recalculan todos juntos con
+    refresh_places(). Devuelve el set de lugares, para sumar a mano los que
+    cambian por QuerySet.update(), que no dispara señales.
+    """
+    places = set()
+    token = _deferred.set(places)
+    try:
+        yield places
+    finally:
+        _deferred.reset(token)
+    refresh_places(places)
+
+
+def review_contribution(review):
+    """
+    Lo que aporta una reseña a las estadísticas: (place_id, rating) si está
+    aprobada, None si no cuenta. Lee __dict__ directamente para no disparar
+    consultas con campos diferidos (only()/defer()); si falta alguno de los
+    campos devuelve (place_id, None), que apply_review() resuelve con un
+    recálculo completo del lugar.
+    """
+    data = review.__dict__
+    if not all(key in data for key in ("place_id", "rating", "is_approved")):
+        return (data["place_id"], None) if data.get("place_id") else None
+    if not data["is_approved"] or not data["place_id"]:
+        return None
+    return (data["place_id"], data["rating"])
+
+
+def apply_review(place_id, rating, delta):
+    """
+    Suma (delta=1) o resta (delta=-1) una reseña aprobada a su lugar. Con un
+    rating desconocido recalcula el lugar entero.
+    """
+    places = _deferred.get()
+    if places is not None:
+        places.add(place_id)
+        return
+    if rating not in STARS:
+        refresh_places([place_id])
+        return
+    field = f"stars_{rating}"
+    updated = PlaceRatingStats.objects.filter(place_id=place_id).update(
+        rating_sum=F("rating_sum") + rating * delta,
+        rating_count=F("rating_count") + delta,
+        updated_at=timezone.now(),
+        **{field: F(field) + delta},
+    )
+    if not updated:
+        # Primera reseña del lugar (o fila borrada a mano): se calcula desde
+        # la tabla Review, que a esta altura ya refleja el cambio.
+        refresh_places([place_id])
+
+
+def refresh_places(place_ids=None):
+    """
+    Recalcula las estadísticas de `place_ids` (o de todos los lugares si es
+    None) y las guarda con un único upsert. Devuelve cuántas filas escribió.
+    """
+    reviews = Review.objects.filter(is_approved=True)
+    places = Place.objects.all()
+    if place_ids is not None:
+        place_ids = {pk for pk in place_ids if pk}
+        if not place_ids:
+            return 0
+        reviews = reviews.filter(place_id__in=place_ids)
+        places = places.filter(pk__in=place_ids)
+
+    aggregates = {
+        row.pop("place_id"): row
+        for row in reviews.order_by().values("place_id").annotate(
+            rating_sum=Sum("rating"),
+            rating_count=Count("id"),
+            **{f"stars_{s}": Count("id", filter=Q(rating=s)) for s in STARS},
+        )
+    }
+
+    now = timezone.now()
+    rows = [
+        PlaceRatingStats(place_id=pk, updated_at=now, **aggregates.get(pk, {}))
+        for pk in places.values_list("pk", flat=True)
+    ]
+    PlaceRatingStats.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["place"],
+        update_fields=STAT_FIELDS,
+    )
+    return len(rows)
@@ -0,0 +1,219 @@
+# tourism/retention.py
+"""
+Retención de la bitácora (ActivityLog).
+
+Antes cada create/update/delete del panel sumaba una fila a ActivityLog y
+nada la borraba nunca: la tabla y sus tres índices crecían sin límite en
+una base Postgres chica. Ahora las entradas con más de
+ACTIVITY_LOG_RETENTION_DAYS días se mueven a archivos JSONL comprimidos con
+gzip, uno por mes (ACTIVITY_ARCHIVE_DIR/activity-AAAA-MM.jsonl.gz), y se
+borran de la tabla por lotes. ActivityArchive guarda un índice con el
+resumen de cada mes, y /api/activity/archives/ los lista y los devuelve
+como stream.
+
+Cada lote se agrega al archivo como un miembro gzip nuevo (gzip admite
+varios miembros seguidos en un mismo archivo), se hace fsync, y recién
+entonces se borran sus filas y se actualiza el índice en una transacción.
+El índice guarda cuántos bytes del archivo están confirmados: si una
+corrida se corta entre escribir y borrar, la siguiente trunca lo que sobró
+y vuelve a escribir esas filas. Nunca se borra una fila que no quedó en
+disco, ni se archiva dos veces.
+
+Se corre con `manage.py archive_activity_log` o, con
+ACTIVITY_ARCHIVE_EVERY_HOURS > 0, desde un hilo del propio worker
+(start_scheduler(), llamado en config/wsgi.py). Un lock en el caché
+compartido evita dos corridas a la vez, aunque haya varios workers.
+"""
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ActivityArchive, ActivityLog
+
+log = logging.getLogger(__name__)
+
+LOCK_KEY = "activity-archive:lock"
+LAST_RUN_KEY = "activity-archive:last-run"
+LOCK_TIMEOUT = 60 * 60
+
+FIELDS = ("id", "created_at", "action", "model_name", "object_id", "object_repr", "actor_id", "actor__username")
+KEYS = ("id", "created_at", "action", "model_name", "object_id", "object_repr", "actor_id", "actor")
+
+
+class ArchiveLocked(Exception):
+    """Otra corrida de archivado está en curso."""
+
+
+def cutoff(days=None):
+    days = settings.ACTIVITY_LOG_RETENTION_DAYS if days is None else days
+    return timezone.now() - timedelta(days=days)
+
+
+def _month_bounds(moment):
+    """Primer día del mes (hora local) de `moment`, y el inicio y fin de ese mes."""
+    month = timezone.localtime(moment).date().replace(day=1)
+    following = (month + timedelta(days=32)).replace(day=1)
+    start = timezone.make_aware(datetime.combine(month, datetime.min.time()))
+    end = timezone.make_aware(datetime.combine(following, datetime.min.time()))
+    return month, start, end
+
+
+def archive_path(month):
+    return os.path.join(settings.ACTIVITY_ARCHIVE_DIR, f"activity-{month:%Y-%m}.jsonl.gz")
+
+
+def archive(before, batch_size=None):
+    """
+    Archiva y borra las entradas anteriores a `before`. Devuelve
+    {mes: entradas archivadas}. Lanza ArchiveLocked si ya hay otra corrida.
+    """
+    if not cache.add(LOCK_KEY, True, timeout=LOCK_TIMEOUT):
+        raise ArchiveLocked()
+    try:
+        os.makedirs(settings.ACTIVITY_ARCHIVE_DIR, exist_ok=True)
+        batch_size = batch_size or settings.ACTIVITY_ARCHIVE_BATCH_SIZE
+        moved = {}
+        while True:
+            oldest = (
+                ActivityLog.objects.filter(created_at__lt=before)
+                .order_by("created_at").values_list("created_at", flat=True).first()
+            )
+            if oldest is None:
+                return moved
+            month, start, end = _month_bounds(oldest)
+            moved[month] = _archive_month(month, start, min(end, before), batch_size)
+    finally:
+        cache.delete(LOCK_KEY)
+
+
+def _archive_month(month, start, end, batch_size):
+    entry, _ = ActivityArchive.objects.get_or_create(month=month, defaults={"path": archive_path(month)})
+    rows = ActivityLog.objects.filter(created_at__gte=start, created_at__lt=end).order_by("id")
+    moved = 0
+    while True:
+        batch = [dict(zip(KEYS, row)) for row in rows.values_list(*FIELDS)[:batch_size]]
+        if not batch:
+            return moved
+        size = _append(entry.path, entry.size_bytes, batch)
+        with transaction.atomic():
+            ActivityLog.objects.filter(pk__in=[row["id"] for row in batch]).delete()
+            _summarize(entry, batch, size)
+            entry.save()
+        moved += len(batch)
+
+
+def _append(path, valid_size, rows):
+    """Agrega `rows` como un miembro gzip nuevo; devuelve el tamaño final."""
+    mode = "r+b" if os.path.exists(path) else "wb"
+    with open(path, mode) as raw:
+        raw.truncate(valid_size)
+        raw.seek(valid_size)
+        with gzip.GzipFile(fileobj=raw, mode="wb") as gz:
+            for row in rows:
+                line = json.dumps({**row, "created_at": row["created_at"].isoformat()}, ensure_ascii=False)
+                gz.write((line + "\n").encode("utf-8"))
+        raw.flush()
+        os.fsync(raw.fileno())
+        return raw.tell()
+
+
+def _summarize(entry, rows, size):
+    counts = defaultdict(lambda: defaultdict(int))
+    for model_name, actions in entry.by_model.items():
+        counts[model_name].update(actions)
+    for row in rows:
+        counts[row["model_name"]][row["action"]] += 1
+    entry.by_model = {model_name: dict(actions) for model_name, actions in counts.items()}
+    entry.row_count += len(rows)
+    entry.size_bytes = size
+    moments = [row["created_at"] for row in rows]
+    entry.first_at = min(filter(None, [entry.first_at, *moments]))
+    entry.last_at = max(filter(None, [entry.last_at, *moments]))
+
+
+def read_archive(entry):
+    """Las entradas de un mes archivado, una por una (dicts como en el JSONL)."""
+    with open(entry.path, "rb") as raw:
+        # Solo la parte confirmada (ver arriba).
+        with gzip.GzipFile(fileobj=_Limited(raw, entry.size_bytes), mode="rb") as gz:
+            for line in gz:
+                yield json.loads(line)
+
+
+def read_archive_raw(entry, chunk_size=64 * 1024):
+    """El archivo .jsonl.gz tal cual, en bloques, sin descomprimir."""
+    with open(entry.path, "rb") as raw:
+        limited = _Limited(raw, entry.size_bytes)
+        yield from iter(lambda: limited.read(chunk_size), b"")
+
+
+class _Limited:
+    """Lee un archivo solo hasta `limit` bytes."""
+
+    def __init__(self, raw, limit):
+        self.raw, self.remaining = raw, limit
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.raw.read(size)
+        self.remaining -= len(data)
+        return data
+
+
+# ----------------------------------------------------------------------
+# Programador en proceso
+# ----------------------------------------------------------------------
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_scheduler():
+    """Arranca el hilo de archivado si ACTIVITY_ARCHIVE_EVERY_HOURS > 0."""
+    global _scheduler
+    hours = settings.ACTIVITY_ARCHIVE_EVERY_HOURS
+    if hours <= 0:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = threading.Thread(
+                target=_loop, args=(hours * 60 * 60,), name="activity-archive", daemon=True
+            )
+            _scheduler.start()
+        return _scheduler
+
+
+def _loop(interval):
+    time.sleep(60)  # que el worker termine de arrancar primero
+    while True:
+        run_scheduled(interval)
+        time.sleep(interval)
+
+
+def run_scheduled(interval):
+    # Con varios workers, corre el primero que llega en cada intervalo.
+    if not cache.add(LAST_RUN_KEY, True, timeout=max(int(interval) - 60, 60)):
+        return None
+    try:
+        moved = archive(cutoff())
+        if moved:
+            log.info("Bitácora archivada: %s", {f"{month:%Y-%m}": count for month, count in moved.items()})
+        return moved
+    except ArchiveLocked:
+        return None
+    except Exception:
+        log.exception("Falló el archivado de la bitácora")
+        return None
+    finally:
+        connection.close()
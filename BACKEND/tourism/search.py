@@ -0,0 +1,291 @@
+# tourism/search.py
+"""
+Búsqueda de lugares con índice de texto completo.
+
+Antes PlaceViewSet filtraba con name__icontains | description__icontains,
+que obliga a recorrer la tabla entera, y el frontend terminaba filtrando
+en el navegador. Ahora hay un motor por base de datos:
+
+- PostgreSQL (producción): columna generada `search_vector` (tsvector,
+  diccionarios 'simple' + 'spanish', sin acentos vía unaccent) con índice
+  GIN, ranking con ts_rank_cd y, si no hay coincidencias, un respaldo por
+  similitud de trigramas (pg_trgm) sobre el nombre para tolerar errores de
+  tipeo ("cascda" -> "Cascada").
+- SQLite (desarrollo y tests): tabla virtual FTS5 `tourism_place_fts` con
+  remove_diacritics, mantenida por triggers, y ranking bm25(). Sin
+  coincidencias, el mismo respaldo por trigramas pero calculado en Python
+  (trigram_similarity()) sobre los nombres de los candidatos: SQLite no
+  trae pg_trgm, y sin esto un error de tipeo daba 0 resultados solo en
+  desarrollo.
+- Cualquier otra base: el icontains de siempre.
+
+La búsqueda se hace dentro del queryset que recibe (ya filtrado por
+is_active, category, bbox): el LIMIT de MAX_RESULTS se aplica a los
+candidatos, no a toda la tabla, así que un filtro nunca deja afuera
+coincidencias que sí existen.
+
+Los términos se buscan como prefijos ("casc" encuentra "Cascada"), sin
+distinguir mayúsculas ni acentos, en español o inglés. install() es
+idempotente: la corre la migración y se vuelve a correr tras cada migrate
+(las migraciones de SQLite que reconstruyen tourism_place borran los
+triggers).
+"""
+import abc
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Case, FloatField, Q, Value, When
+
+# Máximo de resultados rankeados que devuelve el índice (entre los
+# candidatos ya filtrados por la vista).
+MAX_RESULTS = 200
+TRIGRAM_THRESHOLD = 0.3
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _terms(query):
+    """Palabras de la búsqueda, en minúsculas y sin acentos."""
+    normalized = unicodedata.normalize("NFKD", query.lower())
+    normalized = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return _TERM_RE.findall(normalized)[:10]
+
+
+def _trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def trigram_similarity(query, text):
+    """
+    Parecido (0..1) entre `query` y la mejor palabra (o tramo de palabras
+    seguidas, tantas como tenga la búsqueda) de `text`, con trigramas como
+    pg_trgm: "cascda" contra "Cascada Escondida" da 0.5.
+    """
+    query_terms, words = _terms(query), _terms(text)
+    if not query_terms or not words:
+        return 0.0
+    wanted = set().union(*(_trigrams(term) for term in query_terms))
+    size = len(query_terms)
+    best = 0.0
+    for start in range(len(words)):
+        extent = set().union(*(_trigrams(word) for word in words[start:start + size]))
+        best = max(best, len(wanted & extent) / len(wanted | extent))
+    return best
+
+
+class IcontainsBackend:
+    vendor = None
+
+    def install(self, conn):
+        pass
+
+    def uninstall(self, conn):
+        pass
+
+    def search(self, queryset, query):
+        condition = Q()
+        for term in query.split():
+            condition &= Q(name__icontains=term) | Q(description__icontains=term)
+        return queryset.filter(condition)
+
+
+class RankedBackend(IcontainsBackend, metaclass=abc.ABCMeta):
+    """Base para motores que devuelven (id, rank) desde SQL crudo."""
+
+    @abc.abstractmethod
+    def ranked_ids(self, cursor, terms, candidates):
+        """[(id, rank)] de las coincidencias exactas/prefijo entre `candidates`."""
+
+    @abc.abstractmethod
+    def typo_ids(self, cursor, query, candidates):
+        """[(id, rank)] por parecido del nombre, si no hubo coincidencias."""
+
+    def search(self, queryset, query):
+        terms = _terms(query)
+        if not terms:
+            return queryset.none()
+        # Los ids candidatos como subconsulta (sin orden ni anotaciones).
+        candidates = queryset.order_by().values("pk").query.sql_with_params()
+        with connection.cursor() as cursor:
+            ranked = self.ranked_ids(cursor, terms, candidates) or self.typo_ids(cursor, query, candidates)
+        if not ranked:
+            return queryset.none()
+        return queryset.filter(pk__in=[pk for pk, _ in ranked]).annotate(
+            search_rank=Case(
+                *[When(pk=pk, then=Value(float(rank))) for pk, rank in ranked],
+                output_field=FloatField(),
+            )
+        ).order_by("-search_rank", "-created_at")
+
+
+class PostgresBackend(RankedBackend):
+    vendor = "postgresql"
+
+    def install(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            # unaccent() no es IMMUTABLE, así que no puede usarse en una
+            # columna generada ni en un índice; se envuelve en una función
+            # que sí lo declara (apuntando al esquema donde vive la
+            # extensión: en Supabase es "extensions", no "public").
+            cursor.execute(
+                "SELECT n.nspname FROM pg_extension e "
+                "JOIN pg_namespace n ON n.oid = e.extnamespace WHERE e.extname = 'unaccent'"
+            )
+            schema = cursor.fetchone()[0]
+            cursor.execute(f"""
+                CREATE OR REPLACE FUNCTION tourism_unaccent(text) RETURNS text AS $$
+                    SELECT {schema}.unaccent('{schema}.unaccent'::regdictionary, $1)
+                $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+            """)
+            cursor.execute("""
+                ALTER TABLE tourism_place ADD COLUMN IF NOT EXISTS search_vector tsvector
+                GENERATED ALWAYS AS (
+                    setweight(to_tsvector('simple', tourism_unaccent(coalesce(name, ''))), 'A') ||
+                    setweight(to_tsvector('spanish', tourism_unaccent(coalesce(name, ''))), 'A') ||
+                    setweight(to_tsvector('simple', tourism_unaccent(coalesce(address, ''))), 'C') ||
+                    setweight(to_tsvector('simple', tourism_unaccent(coalesce(description, ''))), 'B') ||
+                    setweight(to_tsvector('spanish', tourism_unaccent(coalesce(description, ''))), 'B')
+                ) STORED
+            """)
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS tourism_place_search_gin "
+                "ON tourism_place USING GIN (search_vector)"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS tourism_place_name_trgm "
+                "ON tourism_place USING GIN (tourism_unaccent(lower(name)) gin_trgm_ops)"
+            )
+
+    def uninstall(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute("DROP INDEX IF EXISTS tourism_place_name_trgm")
+            cursor.execute("ALTER TABLE tourism_place DROP COLUMN IF EXISTS search_vector")
+            cursor.execute("DROP FUNCTION IF EXISTS tourism_unaccent(text)")
+
+    def ranked_ids(self, cursor, terms, candidates):
+        prefix_query = " & ".join(f"{term}:*" for term in terms)
+        candidates_sql, candidates_params = candidates
+        cursor.execute(
+            f"""
+            SELECT id, ts_rank_cd(search_vector, query) AS rank
+            FROM tourism_place,
+                 (to_tsquery('simple', %s) || plainto_tsquery('spanish', tourism_unaccent(%s))) AS query
+            WHERE search_vector @@ query AND id IN ({candidates_sql})
+            ORDER BY rank DESC
+            LIMIT %s
+            """,
+            [prefix_query, " ".join(terms), *candidates_params, MAX_RESULTS],
+        )
+        return cursor.fetchall()
+
+    def typo_ids(self, cursor, query, candidates):
+        candidates_sql, candidates_params = candidates
+        cursor.execute(
+            f"""
+            SELECT id, word_similarity(tourism_unaccent(lower(%s)), tourism_unaccent(lower(name))) AS rank
+            FROM tourism_place
+            WHERE tourism_unaccent(lower(%s)) <%% tourism_unaccent(lower(name)) AND id IN ({candidates_sql})
+            ORDER BY rank DESC
+            LIMIT %s
+            """,
+            [query, query, *candidates_params, MAX_RESULTS],
+        )
+        return [(pk, rank) for pk, rank in cursor.fetchall() if rank >= TRIGRAM_THRESHOLD]
+
+
+class SqliteBackend(RankedBackend):
+    vendor = "sqlite"
+
+    def install(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS tourism_place_fts USING fts5(
+                    name, address, description,
+                    content='tourism_place', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'tourism_place_fts_%'"
+            )
+            had_triggers = cursor.fetchone()[0] == 3
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS tourism_place_fts_ai AFTER INSERT ON tourism_place BEGIN
+                    INSERT INTO tourism_place_fts(rowid, name, address, description)
+                    VALUES (new.id, new.name, new.address, new.description);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS tourism_place_fts_ad AFTER DELETE ON tourism_place BEGIN
+                    INSERT INTO tourism_place_fts(tourism_place_fts, rowid, name, address, description)
+                    VALUES ('delete', old.id, old.name, old.address, old.description);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS tourism_place_fts_au AFTER UPDATE ON tourism_place BEGIN
+                    INSERT INTO tourism_place_fts(tourism_place_fts, rowid, name, address, description)
+                    VALUES ('delete', old.id, old.name, old.address, old.description);
+                    INSERT INTO tourism_place_fts(rowid, name, address, description)
+                    VALUES (new.id, new.name, new.address, new.description);
+                END
+            """)
+            if not had_triggers:
+                # Tabla nueva o triggers perdidos: el índice puede estar desfasado.
+                cursor.execute("INSERT INTO tourism_place_fts(tourism_place_fts) VALUES ('rebuild')")
+
+    def uninstall(self, conn):
+        with conn.cursor() as cursor:
+            for suffix in ("ai", "ad", "au"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS tourism_place_fts_{suffix}")
+            cursor.execute("DROP TABLE IF EXISTS tourism_place_fts")
+
+    def ranked_ids(self, cursor, terms, candidates):
+        # Cada término entre comillas (sin operadores FTS del usuario) y como prefijo.
+        match = " ".join(f'"{term}"*' for term in terms)
+        candidates_sql, candidates_params = candidates
+        cursor.execute(
+            f"""
+            SELECT rowid, -bm25(tourism_place_fts, 10.0, 2.0, 5.0) AS rank
+            FROM tourism_place_fts
+            WHERE tourism_place_fts MATCH %s AND rowid IN ({candidates_sql})
+            ORDER BY rank DESC
+            LIMIT %s
+            """,
+            [match, *candidates_params, MAX_RESULTS],
+        )
+        return cursor.fetchall()
+
+    def typo_ids(self, cursor, query, candidates):
+        # Sin pg_trgm: los nombres de los candidatos se comparan en Python
+        # (solo cuando FTS5 no encontró nada, y un parque tiene pocos lugares).
+        candidates_sql, candidates_params = candidates
+        cursor.execute(
+            f"SELECT id, name FROM tourism_place WHERE id IN ({candidates_sql})", candidates_params,
+        )
+        scored = [(pk, trigram_similarity(query, name)) for pk, name in cursor.fetchall()]
+        scored = [(pk, rank) for pk, rank in scored if rank >= TRIGRAM_THRESHOLD]
+        return sorted(scored, key=lambda row: -row[1])[:MAX_RESULTS]
+
+
+_BACKENDS = {backend.vendor: backend for backend in (PostgresBackend(), SqliteBackend())}
+
+
+def get_backend(conn=None):
+    return _BACKENDS.get((conn or connection).vendor, IcontainsBackend())
+
+
+def install(conn=None):
+    get_backend(conn).install(conn or connection)
+
+
+def uninstall(conn=None):
+    get_backend(conn).uninstall(conn or connection)
+
+
+def search_places(queryset, query):
+    """Filtra `queryset` por `query` y lo ordena por relevancia."""
+    return get_backend().search(queryset, query)
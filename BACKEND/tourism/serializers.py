@@ -1,18 +1,29 @@
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Substr
 from rest_framework import serializers
 from .models import (
-    Place, Event, Post, Review, ContactInfo, GalleryItem, Media, SiteSettings, ActivityLog,
+    Place, Event, Post, Review, ContactInfo, GalleryItem, Media, SiteSettings, ActivityLog, ActivityArchive,
+    UploadJob, ChunkedUpload,
 )
+from . import images
+from .images import ImageVariantsField, StoredImageField
+from .sparse import SparseFieldsSerializerMixin
 
 class MediaSerializerForPlace(serializers.ModelSerializer):
+    # Anchos para srcset y miniatura (ver tourism/images.py)
+    image_variants = ImageVariantsField(source='image')
+
     class Meta:
         model = Media
-        fields = ('id', 'image', 'caption')
+        fields = ('id', 'image', 'image_variants', 'caption')
 
-class PlaceSerializer(serializers.ModelSerializer):
+class PlaceSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     media = MediaSerializerForPlace(many=True, read_only=True)
-    # Nuevos campos para enriquecer la tarjeta
-    avg_rating = serializers.FloatField(read_only=True)
-    reviews_count = serializers.IntegerField(read_only=True)
+    # Nuevos campos para enriquecer la tarjeta (leídos de PlaceRatingStats;
+    # el queryset debe hacer select_related("rating_stats"))
+    avg_rating = serializers.SerializerMethodField()
+    reviews_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Place
@@ -24,40 +35,165 @@ class PlaceSerializer(serializers.ModelSerializer):
             'reviews_count'   # <-- Conteo de opiniones
         )
         lookup_field = "slug"
+        # Columnas de los campos calculados, para ?fields= (tourism/sparse.py);
+        # el rating sale del select_related("rating_stats") de la vista.
+        sparse_sources = {'avg_rating': (), 'reviews_count': ()}
+
+    def get_avg_rating(self, obj):
+        stats = getattr(obj, "rating_stats", None)
+        return stats.avg_rating if stats else None
+
+    def get_reviews_count(self, obj):
+        stats = getattr(obj, "rating_stats", None)
+        return stats.rating_count if stats else 0
+
+# --- Tarjetas de los listados ---
+# El listado de /api/places/ y /api/posts/ no necesita el texto entero ni
+# todas las fotos: sale una tarjeta con portada, rating y un resumen. La
+# portada y el resumen se calculan en la misma consulta (place_cards() /
+# post_cards()); la descripción completa y `media` quedan para el detalle.
+
+EXCERPT_LENGTH = 180
+
+
+def _excerpt(field_name):
+    # Un carácter de más para saber si el texto sigue y va "…".
+    return Substr(field_name, 1, EXCERPT_LENGTH + 1)
+
+
+def place_cards(queryset):
+    """
+    Anota `excerpt` y `cover` (la foto más reciente) para PlaceListSerializer.
+    El rating necesita además select_related("rating_stats").
+    """
+    # Sin las fotos cuya subida sigue en cola (image vacío).
+    newest_photo = (
+        Media.objects.filter(place=OuterRef('pk')).exclude(image='')
+        .order_by('-id').values('image')[:1]
+    )
+    return queryset.annotate(
+        excerpt=_excerpt('description'), cover=Subquery(newest_photo),
+    )
+
+
+def post_cards(queryset):
+    """Anota `excerpt` para PostListSerializer."""
+    return queryset.annotate(excerpt=_excerpt('body'))
+
+
+class ExcerptField(serializers.CharField):
+    """Los primeros EXCERPT_LENGTH caracteres, cortados en un espacio."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        text = ' '.join((value or '').split())
+        if len(text) <= EXCERPT_LENGTH:
+            return text
+        return text[:EXCERPT_LENGTH].rsplit(' ', 1)[0].rstrip(' ,.;:') + '…'
+
+
+class PlaceListSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    excerpt = ExcerptField()
+    cover = StoredImageField(Media._meta.get_field('image'))
+    cover_variants = ImageVariantsField(model_field=Media._meta.get_field('image'), source='cover')
+    avg_rating = serializers.SerializerMethodField()
+    reviews_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Place
+        fields = (
+            'id', 'name', 'slug', 'category', 'excerpt', 'address', 'lat', 'lng',
+            'cover', 'cover_variants', 'key_features', 'avg_rating', 'reviews_count',
+        )
+        # Anotaciones de place_cards(): no son columnas que only() deba pedir.
+        sparse_sources = {
+            'excerpt': (), 'cover': (), 'cover_variants': (), 'avg_rating': (), 'reviews_count': (),
+        }
+
+    get_avg_rating = PlaceSerializer.get_avg_rating
+    get_reviews_count = PlaceSerializer.get_reviews_count
+
+
+class NearbyPlaceSerializer(PlaceSerializer):
+    # Calculada en tourism.geo.nearby() (haversine), no es un campo del modelo.
+    distance_km = serializers.FloatField(read_only=True)
+
+    class Meta(PlaceSerializer.Meta):
+        fields = PlaceSerializer.Meta.fields + ('distance_km',)
 
 # --- El resto de tus serializers (Event, Post, etc.) irían aquí ---
 # Por ejemplo:
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    image_variants = ImageVariantsField(source='image')
+
     class Meta:
         model = Event
         fields = '__all__'
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    cover_variants = ImageVariantsField(source='cover')
+
     class Meta:
         model = Post
         fields = '__all__'
 
-class ReviewSerializer(serializers.ModelSerializer):
+class PostListSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    # Sin `body`: el resumen sale de post_cards().
+    excerpt = ExcerptField()
+    cover = StoredImageField()
+    cover_variants = ImageVariantsField(source='cover')
+
+    class Meta:
+        model = Post
+        fields = (
+            'id', 'title', 'excerpt', 'place', 'cover', 'cover_variants', 'is_published',
+            'is_featured', 'cta_url', 'cta_label', 'created_by', 'created_at', 'updated_at',
+        )
+        sparse_sources = {'excerpt': ()}
+
+class ReviewSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = '__all__'
 
-class ModerationReviewSerializer(serializers.ModelSerializer):
+class ModerationReviewSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = '__all__'
 
-class ContactInfoSerializer(serializers.ModelSerializer):
+class ReviewBulkActionSerializer(serializers.Serializer):
+    ACTIONS = ('approve', 'unapprove', 'delete')
+    MAX_IDS = 500
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=MAX_IDS
+    )
+    action = serializers.ChoiceField(choices=ACTIONS)
+
+class ContactInfoSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = ContactInfo
         fields = '__all__'
 
-class GalleryItemSerializer(serializers.ModelSerializer):
+class GalleryItemSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    # De un video solo viene `thumb` (un fotograma), para las miniaturas.
+    media_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = GalleryItem
         fields = '__all__'
+        sparse_sources = {'media_variants': ('media_file', 'media_file_url')}
+
+    def get_media_variants(self, obj):
+        url = obj.media_file_url or images.file_url(obj.media_file, self.context.get('request'))
+        return images.variants(url)
+
+class MediaSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    image_variants = ImageVariantsField(source='image')
 
-class MediaSerializer(serializers.ModelSerializer):
     class Meta:
         model = Media
         fields = '__all__'
@@ -68,6 +204,39 @@ class SiteSettingsSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 class ActivityLogSerializer(serializers.ModelSerializer):
+    actor_username = serializers.CharField(source='actor.username', read_only=True, default=None)
+
     class Meta:
         model = ActivityLog
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class ActivityArchiveSerializer(serializers.ModelSerializer):
+    month = serializers.DateField(format='%Y-%m', read_only=True)
+
+    class Meta:
+        model = ActivityArchive
+        fields = ('month', 'row_count', 'size_bytes', 'first_at', 'last_at', 'by_model', 'updated_at')
+        read_only_fields = fields
+
+class UploadJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadJob
+        fields = (
+            'id', 'status', 'model', 'object_id', 'field', 'original_name', 'size',
+            'attempts', 'error', 'result_url', 'created_at', 'finished_at',
+        )
+        read_only_fields = fields
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ChunkedUpload
+        fields = (
+            'id', 'status', 'filename', 'total_size', 'offset', 'chunk_size',
+            'created_at', 'completed_at',
+        )
+        read_only_fields = ('id', 'status', 'offset', 'created_at', 'completed_at')
+
+    def get_chunk_size(self, obj):
+        return settings.CHUNKED_UPLOAD_MAX_CHUNK
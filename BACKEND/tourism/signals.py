@@ -0,0 +1,56 @@
+from django.db import connections
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from .models import Place, Review
+from . import ratings, search
+
+
+@receiver(post_init, sender=Review)
+def remember_rating_contribution(sender, instance, **kwargs):
+    """
+    Guarda lo que la reseña aporta hoy a PlaceRatingStats, para que al
+    guardarla (aprobar/desaprobar, cambiar rating o lugar) se pueda aplicar
+    solo la diferencia sin volver a consultar la base de datos.
+    """
+    instance._rating_contribution = ratings.review_contribution(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=Review)
+def update_rating_stats_on_save(sender, instance, created=False, **kwargs):
+    old = None if created else getattr(instance, "_rating_contribution", None)
+    new = ratings.review_contribution(instance)
+    if any(c and c[1] is None for c in (old, new)):
+        # Cargada con only()/defer(): no se sabe qué aportaba ni qué aporta
+        # (old y new pueden ser iguales aunque haya cambiado is_approved);
+        # se recalculan los lugares desde la tabla Review.
+        for place_id in {c[0] for c in (old, new) if c}:
+            ratings.apply_review(place_id, None, delta=0)
+    elif old != new:
+        if old:
+            ratings.apply_review(*old, delta=-1)
+        if new:
+            ratings.apply_review(*new, delta=1)
+    instance._rating_contribution = new
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_stats_on_delete(sender, instance, origin=None, **kwargs):
+    # Si la reseña se borra en cascada porque se borró su Place, las
+    # estadísticas se van junto con el lugar: no hay nada que ajustar (y
+    # recalcular aquí recrearía una fila para un lugar que está por borrarse).
+    if origin is not None and getattr(origin, "model", type(origin)) is not Review:
+        return
+    old = getattr(instance, "_rating_contribution", None)
+    if old:
+        ratings.apply_review(*old, delta=-1)
+
+
+def ensure_search_index(sender, using="default", **kwargs):
+    """
+    Conectada a post_migrate en TourismConfig.ready(). En SQLite, las
+    migraciones que reconstruyen tourism_place (casi cualquier AddField)
+    se llevan los triggers del índice FTS5; esto los vuelve a crear.
+    """
+    conn = connections[using]
+    if Place._meta.db_table in conn.introspection.table_names():
+        search.install(conn)
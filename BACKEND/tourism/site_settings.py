@@ -0,0 +1,49 @@
+# tourism/site_settings.py
+"""
+Copia en memoria (por worker de gunicorn) de SiteSettings ya serializado.
+
+/api/site-settings/ se pide en cada carga de página (useSiteSettings) y el
+contenido cambia, con suerte, una vez por semana; antes cada request hacía
+get_or_create(pk=1) y pasaba por el serializer. Ahora cada worker guarda la
+instancia y su JSON ya serializado junto con la versión de "SiteSettings"
+del caché compartido (tourism/caching.py). Leer cuesta solo comparar esa
+versión; SiteSettings.save() la sube y todos los workers recargan en su
+próxima lectura.
+
+La carga y el serializer corren fuera de `_lock`: load() puede crear la
+fila y ese save() sube la versión y dispara otros trabajos (p. ej. los
+snapshots de tourism/snapshots.py, que vuelven a leer esto). Bajo el lock
+solo se reemplaza la copia; dos workers que recargan a la vez hacen el
+trabajo dos veces, pero nunca se bloquean.
+"""
+import threading
+from collections import namedtuple
+
+from .caching import get_versions
+from .models import SiteSettings
+
+Snapshot = namedtuple("Snapshot", ["version", "instance", "data"])
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+def site_settings_snapshot():
+    """Devuelve el Snapshot vigente, recargándolo si otra escritura lo invalidó."""
+    global _snapshot
+    version = get_versions(["SiteSettings"])["SiteSettings"]
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    # Import diferido: serializers importa models, y models no debe
+    # depender de este módulo.
+    from .serializers import SiteSettingsSerializer
+
+    instance = SiteSettings.load()
+    fresh = Snapshot(version, instance, SiteSettingsSerializer(instance).data)
+    with _lock:
+        # Si otro hilo dejó una copia más nueva mientras tanto, gana esa.
+        if _snapshot is None or _snapshot.version <= version:
+            _snapshot = fresh
+        return _snapshot
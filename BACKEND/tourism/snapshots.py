@@ -0,0 +1,351 @@
+# tourism/snapshots.py
+"""
+Snapshots estáticos del contenido público: lugares, eventos, noticias,
+galería, contactos e información del sitio.
+
+Antes toda lectura anónima pasaba por Django aunque el contenido cambie un
+par de veces por semana, y en un host que se duerme la primera visita
+pagaba el arranque en frío. Ahora, después de cada escritura de un editor
+(bump_version() de tourism/caching.py, que llaman ActivityLoggingMixin y
+el resto de las escrituras), se vuelven a renderizar los endpoints de
+SNAPSHOT_ENDPOINTS afectados y quedan en SNAPSHOT_ROOT:
+
+    places.3f9a1c2b7d4e.json     (+ .json.br y .json.gz ya comprimidos)
+    manifest.json                {"version": ..., "files": {"places": "/snapshots/places.3f9a1c2b7d4e.json", ...}}
+
+- El JSON sale de la vista real con una request anónima (mismo
+  serializer, mismos filtros de activos/publicados, lista completa sin
+  paginar): es idéntico a GET /api/places/.
+- El nombre lleva el hash del contenido, así que un archivo nunca cambia
+  y se sirve con Cache-Control immutable. Lo que cambia es el manifiesto,
+  que se sirve con no-cache (revalidación por ETag), en SNAPSHOT_URL y en
+  GET /api/snapshots/.
+- Cada archivo se escribe en un temporal y se mueve con os.replace(): un
+  lector nunca ve uno a medias. El manifiesto va al final, cuando sus
+  archivos ya existen. Se conservan los de la versión anterior (un cliente
+  pudo leer el manifiesto viejo hace un instante); los más viejos se
+  borran.
+- Un lock de archivo evita que dos workers publiquen a la vez y se pisen
+  el manifiesto.
+
+Siempre publica un hilo aparte, nunca la request ni el commit que causó
+el cambio: render() vuelve a entrar en las vistas, que pueden escribir
+(SiteSettings.load() crea la fila si falta) y volver a pedir una
+publicación mientras se tienen tomados los locks de la primera. Con
+SNAPSHOT_ASYNC=True (por defecto) el hilo junta las escrituras de
+SNAPSHOT_DELAY segundos y el editor no espera el render; con False la
+request espera a que el hilo termine.
+SnapshotWhiteNoiseMiddleware (en lugar de WhiteNoiseMiddleware) sirve los
+archivos sin pasar por vistas ni base de datos; con una CDN delante basta
+con apuntar SNAPSHOT_URL a ella. `manage.py publish_snapshots` los genera
+todos (p. ej. al desplegar).
+"""
+import atexit
+import contextlib
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpRequest
+from django.urls import resolve
+from django.utils import timezone
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.responders import MissingFileError
+from whitenoise.string_utils import ensure_leading_trailing_slash
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+log = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+HASH_LENGTH = 12
+SNAPSHOT_FILE_RE = re.compile(r"^[\w-]+\.[0-9a-f]{%d}\.json(\.gz|\.br)?$" % HASH_LENGTH)
+
+
+# ----------------------------------------------------------------------
+# Render
+# ----------------------------------------------------------------------
+
+def _anonymous_request(path):
+    site = urlsplit(settings.SNAPSHOT_SITE_URL)
+    request = HttpRequest()
+    request.method = "GET"
+    request.path = request.path_info = path
+    request.META = {
+        "HTTP_HOST": site.netloc,
+        "SERVER_NAME": site.hostname,
+        "SERVER_PORT": str(site.port or (443 if site.scheme == "https" else 80)),
+        "HTTP_ACCEPT": "application/json",
+        # Para que build_absolute_uri() arme las URLs con el esquema del
+        # sitio (SECURE_PROXY_SSL_HEADER).
+        "HTTP_X_FORWARDED_PROTO": site.scheme,
+    }
+    return request
+
+
+def render(path):
+    """El cuerpo JSON que un visitante anónimo recibe en GET `path`."""
+    match = resolve(path)
+    response = match.func(_anonymous_request(path), *match.args, **match.kwargs)
+    response.render()
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {path} respondió {response.status_code}")
+    return response.content
+
+
+def dependencies(path):
+    """Modelos de los que depende el endpoint (su `cache_models`)."""
+    return set(getattr(resolve(path).func.cls, "cache_models", ()))
+
+
+# ----------------------------------------------------------------------
+# Escritura
+# ----------------------------------------------------------------------
+
+def _atomic_write(target, data):
+    temp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(temp, target)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def _write_snapshot(root, name, content):
+    digest = hashlib.sha1(content).hexdigest()[:HASH_LENGTH]
+    filename = f"{name}.{digest}.json"
+    target = os.path.join(root, filename)
+    if not os.path.exists(target):
+        # Las variantes comprimidas antes que el .json: WhiteNoise solo las
+        # busca si existe el original. Se comprime al máximo: es una vez por
+        # cambio, no por request.
+        variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants[".br"] = brotli.compress(content, quality=11, mode=brotli.MODE_TEXT)
+        for suffix, compressed in variants.items():
+            if len(compressed) < len(content):
+                _atomic_write(target + suffix, compressed)
+        _atomic_write(target, content)
+    return settings.SNAPSHOT_URL + filename
+
+
+def _filename(url):
+    return os.path.basename(urlsplit(url).path)
+
+
+def _prune(root, keep):
+    for filename in os.listdir(root):
+        match = SNAPSHOT_FILE_RE.match(filename)
+        if match and filename[:len(filename) - len(match.group(1) or "")] not in keep:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(root, filename))
+
+
+@contextlib.contextmanager
+def _lock(root):
+    with open(os.path.join(root, ".lock"), "w") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+        yield
+
+
+def read_manifest():
+    try:
+        with open(os.path.join(settings.SNAPSHOT_ROOT, MANIFEST), "rb") as fh:
+            return json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+_local = threading.local()
+
+
+def publish(model_names=None):
+    """
+    Vuelve a renderizar los endpoints que dependen de `model_names` (todos
+    si es None o si todavía no tienen snapshot) y publica un manifiesto
+    nuevo si algo cambió. Devuelve el manifiesto vigente.
+    """
+    root = settings.SNAPSHOT_ROOT
+    os.makedirs(root, exist_ok=True)
+    _local.publishing = True
+    try:
+        with _lock(root):
+            return _publish_locked(root, model_names)
+    finally:
+        _local.publishing = False
+
+
+def _publish_locked(root, model_names):
+    previous = read_manifest() or {}
+    old_files = previous.get("files", {})
+    files = {}
+    for name, path in settings.SNAPSHOT_ENDPOINTS.items():
+        if model_names is not None and name in old_files and not dependencies(path) & set(model_names):
+            files[name] = old_files[name]
+        else:
+            files[name] = _write_snapshot(root, name, render(path))
+    if files == old_files:
+        return previous
+
+    manifest = {
+        "version": hashlib.sha1(
+            "|".join(files[name] for name in sorted(files)).encode("utf-8")
+        ).hexdigest()[:HASH_LENGTH],
+        "generated_at": timezone.now().isoformat(),
+        "files": files,
+    }
+    _atomic_write(os.path.join(root, MANIFEST), json.dumps(manifest).encode("utf-8"))
+    _prune(root, {_filename(url) for url in [*files.values(), *old_files.values()]})
+    return manifest
+
+
+# ----------------------------------------------------------------------
+# Publicación tras las escrituras
+# ----------------------------------------------------------------------
+
+class _Publisher:
+    def __init__(self):
+        self.pending = set()
+        self.everything = False
+        self.busy = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name="snapshots", daemon=True)
+        self.thread.start()
+        atexit.register(self.drain)
+
+    def put(self, model_names):
+        with self.condition:
+            if model_names is None:
+                self.everything = True
+            else:
+                self.pending.update(model_names)
+            self.condition.notify_all()
+
+    def _waiting(self):
+        return self.everything or bool(self.pending)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(self._waiting)
+            # Una edición en lote dispara varias escrituras seguidas: se
+            # junta todo lo que llegue en SNAPSHOT_DELAY en una publicación
+            # (sin SNAPSHOT_ASYNC hay una request esperando).
+            if settings.SNAPSHOT_ASYNC:
+                time.sleep(settings.SNAPSHOT_DELAY)
+            with self.condition:
+                model_names = None if self.everything else self.pending
+                self.pending, self.everything, self.busy = set(), False, True
+            try:
+                _publish_logged(model_names)
+            finally:
+                connection.close()
+                with self.condition:
+                    self.busy = False
+                    self.condition.notify_all()
+
+    def drain(self, timeout=60):
+        with self.condition:
+            self.condition.wait_for(lambda: not (self.busy or self._waiting()), timeout=timeout)
+
+
+_publisher = None
+_publisher_lock = threading.Lock()
+
+
+def _get_publisher():
+    global _publisher
+    with _publisher_lock:
+        if _publisher is None:
+            _publisher = _Publisher()
+        return _publisher
+
+
+def _publish_logged(model_names):
+    try:
+        publish(model_names)
+    except Exception:
+        # El cambio ya está confirmado y la API lo sirve; un snapshot viejo
+        # se corrige en la próxima escritura o con publish_snapshots.
+        log.exception("No se pudieron publicar los snapshots (%s)", model_names or "todos")
+
+
+def schedule_publish(model_names=None):
+    """
+    Pide al hilo de publicación los endpoints afectados por `model_names`.
+    Sin SNAPSHOT_ASYNC espera a que publique, salvo que esto venga de
+    adentro de un publish() (una escritura durante un render): ese hilo
+    tiene el lock y se quedaría esperándose a sí mismo; lo pedido se
+    publica en cuanto termine.
+    """
+    if not settings.SNAPSHOTS_ENABLED:
+        return
+    publisher = _get_publisher()
+    publisher.put(model_names)
+    if not settings.SNAPSHOT_ASYNC and not getattr(_local, "publishing", False):
+        publisher.drain()
+
+
+# ----------------------------------------------------------------------
+# Servir
+# ----------------------------------------------------------------------
+
+class SnapshotWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware que además sirve SNAPSHOT_ROOT en SNAPSHOT_URL.
+    WhiteNoise indexa sus archivos al arrancar; los snapshots aparecen
+    después, así que se buscan en disco en cada request (un stat, sin
+    vistas ni base de datos). Elige el .br / .gz según Accept-Encoding y
+    responde 304 con su ETag como con cualquier estático.
+    """
+
+    def __init__(self, get_response=None, settings=settings):
+        # Antes de super(): add_cache_headers() ya se usa al indexar STATIC_ROOT.
+        self.snapshot_prefix = ensure_leading_trailing_slash(urlsplit(settings.SNAPSHOT_URL).path)
+        self.snapshot_root = os.path.abspath(settings.SNAPSHOT_ROOT)
+        super().__init__(get_response, settings)
+
+    def __call__(self, request):
+        if request.path_info.startswith(self.snapshot_prefix):
+            static_file = self.find_snapshot(request.path_info)
+            if static_file is not None:
+                return self.serve(static_file, request)
+        return super().__call__(request)
+
+    def find_snapshot(self, url):
+        name = url[len(self.snapshot_prefix):]
+        if name != MANIFEST and not (SNAPSHOT_FILE_RE.match(name) and name.endswith(".json")):
+            return None
+        try:
+            return self.get_static_file(os.path.join(self.snapshot_root, name), url)
+        except (MissingFileError, FileNotFoundError):
+            return None
+
+    def add_cache_headers(self, headers, path, url):
+        if not url.startswith(self.snapshot_prefix):
+            return super().add_cache_headers(headers, path, url)
+        if url.endswith("/" + MANIFEST):
+            headers["Cache-Control"] = "no-cache, public"
+        else:
+            headers["Cache-Control"] = f"max-age={self.FOREVER}, public, immutable"
@@ -0,0 +1,165 @@
+# tourism/sparse.py
+"""
+Campos a pedido (?fields= / ?omit=) en los listados y detalles.
+
+Antes cada respuesta traía el objeto entero: PlaceSerializer con la
+descripción y la lista de fotos anidada, y los serializers '__all__'
+(eventos, noticias, reseñas, galería) con cuerpos y textos largos, aunque
+el mapa o la lista de favoritos solo usen id, nombre, slug y lat/lng.
+Ahora:
+
+    /api/places/?fields=id,name,slug,lat,lng
+    /api/posts/?omit=body
+
+- SparseFieldsSerializerMixin deja en el serializer solo los campos
+  pedidos (o quita los omitidos). Un nombre que no existe es un 400.
+- SparseFieldsViewMixin achica además la consulta: only() con las
+  columnas que esos campos leen (más la pk y las del orden, que usa el
+  cursor de paginación), y solo hace el select_related / prefetch_related
+  de `sparse_related` que algún campo pedido necesita. Menos JSON y menos
+  lecturas a la vez.
+
+Las columnas de cada campo salen de su `source`. Los campos calculados
+(SerializerMethodField) declaran las suyas en `Meta.sparse_sources`; si uno
+pedido no las declara, no se usa only() (nunca se difiere una columna que
+después haría una consulta por fila).
+
+Solo aplica a GET/HEAD: en una escritura, quitar campos del serializer
+haría que se ignoren datos del cuerpo. Solo campos de primer nivel
+(`media`, no `media.caption`).
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = "fields"
+OMIT_PARAM = "omit"
+
+
+def _names(raw):
+    return {name.strip() for name in (raw or "").split(",") if name.strip()}
+
+
+def requested_fields(request):
+    """(campos pedidos o None, campos omitidos) de la query string, o None si no hay filtro."""
+    if request is None or request.method not in permissions.SAFE_METHODS:
+        return None
+    params = request.query_params
+    if FIELDS_PARAM not in params and OMIT_PARAM not in params:
+        return None
+    only = _names(params.get(FIELDS_PARAM)) if FIELDS_PARAM in params else None
+    return only, _names(params.get(OMIT_PARAM))
+
+
+class SparseFieldsSerializerMixin:
+    """Recorta `fields` según ?fields= / ?omit= (ver arriba)."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # Solo el serializer de la vista (o el hijo de su ListSerializer);
+        # los anidados devuelven todo lo suyo.
+        parent = self.parent
+        if parent is not None and not (parent.parent is None and getattr(parent, "child", None) is self):
+            return fields
+        selection = self.context.get("sparse_fields")
+        if selection is None:
+            return fields
+        return select_fields(fields, *selection)
+
+
+def select_fields(fields, only, omit):
+    unknown = ((only or set()) | omit) - set(fields)
+    if unknown:
+        raise ValidationError({"fields": f"Campos desconocidos: {', '.join(sorted(unknown))}."})
+    keep = set(fields) if only is None else only
+    return {name: field for name, field in fields.items() if name in keep and name not in omit}
+
+
+def model_sources(serializer, names):
+    """
+    Columnas del modelo que leen los campos `names` de `serializer`, o None
+    si alguno no se puede saber (campo calculado sin Meta.sparse_sources).
+    """
+    declared = getattr(serializer.Meta, "sparse_sources", {})
+    opts = serializer.Meta.model._meta
+    columns = set()
+    for name in names:
+        if name in declared:
+            columns.update(declared[name])
+            continue
+        source = serializer.fields[name].source
+        if source == "*":
+            return None
+        root = source.split(".")[0]
+        try:
+            field = opts.get_field(root)
+        except FieldDoesNotExist:
+            return None
+        if field.concrete:
+            columns.add(field.name)
+        # Relaciones inversas / m2m (p. ej. `media`): las trae el prefetch.
+    return columns
+
+
+class SparseFieldsViewMixin:
+    """
+    Pasa ?fields= / ?omit= al serializer y achica el queryset en
+    filter_queryset(). `sparse_related` mapea un campo del serializer a lo
+    que necesita precargar: {"media": ("prefetch", "media"),
+    "avg_rating": ("select", "rating_stats")}. Esas relaciones no van en
+    get_queryset(): las agrega narrow_queryset() cuando hacen falta.
+    """
+    sparse_related = {}
+
+    def sparse_selection(self):
+        if not hasattr(self, "_sparse_selection"):
+            self._sparse_selection = requested_fields(self.request)
+        return self._sparse_selection
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["sparse_fields"] = self.sparse_selection()
+        return context
+
+    def filter_queryset(self, queryset):
+        return self.narrow_queryset(super().filter_queryset(queryset))
+
+    def narrow_queryset(self, queryset):
+        serializer = self.get_serializer_class()()
+        selection = self.sparse_selection()
+        names = set(serializer.fields)
+        if selection is not None:
+            names = set(select_fields(serializer.fields, *selection))
+
+        selected = set()
+        for name, (kind, lookup) in self.sparse_related.items():
+            if name not in names:
+                continue
+            if kind == "select":
+                selected.add(lookup)
+                queryset = queryset.select_related(lookup)
+            else:
+                queryset = queryset.prefetch_related(lookup)
+
+        if selection is None:
+            return queryset
+        columns = model_sources(serializer, names)
+        if columns is None:
+            return queryset
+        opts = queryset.model._meta
+        ordering = list(getattr(self, "pagination_ordering", ())) + list(queryset.query.order_by)
+        for name in ordering:
+            if isinstance(name, str):
+                name = name.lstrip("-")
+                try:
+                    if opts.get_field(name).concrete:
+                        columns.add(name)
+                except FieldDoesNotExist:
+                    pass  # anotaciones (search_rank) o "pk"
+        columns.add(opts.pk.name)
+        if isinstance(queryset.query.select_related, dict):
+            # El select_related que ya traía get_queryset().
+            selected.update(queryset.query.select_related)
+        # Una relación del select_related no puede quedar diferida; se
+        # nombra y sus columnas se cargan enteras.
+        return queryset.only(*columns, *selected)
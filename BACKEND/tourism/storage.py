@@ -0,0 +1,344 @@
+# tourism/storage.py
+"""
+Almacenamiento de los archivos de los modelos (fotos, afiches, portadas,
+adjuntos de reseñas, galería) elegido por configuración.
+
+Antes cada ImageField/FileField tenía `storage=MediaCloudinaryStorage()`
+fijo: sin credenciales de Cloudinary no se podía guardar ni mostrar una
+foto, ni medir nada del camino de los archivos, ni alojarlos nosotros.
+Ahora los campos usan `storage=media_storage` (un callable, así que la
+migración no guarda la clase) y MEDIA_STORAGE elige la implementación:
+
+- cloudinary_storage.storage.MediaCloudinaryStorage (por defecto).
+- tourism.storage.LocalMediaStorage: archivos en MEDIA_ROOT, servidos por
+  serve_media() en MEDIA_URL.
+
+serve_media() atiende pedidos de rango (Range / If-Range → 206), responde
+304 con ETag / Last-Modified y entrega el archivo con FileResponse, que
+gunicorn manda con sendfile. Con ?w= (y opcionalmente &h=) devuelve una
+versión reducida (WebP si el navegador la acepta), que es lo que piden
+las URLs de tourism.images.LocalTransformer:
+
+- Solo se aceptan los tamaños de IMAGE_VARIANT_WIDTHS e IMAGE_THUMB_SIZE,
+  para que nadie llene el disco pidiendo anchos arbitrarios.
+- La imagen se genera con Pillow en un pool de procesos (no bloquea el
+  GIL del worker) y se guarda en MEDIA_CACHE_DIR; dos pedidos simultáneos
+  de la misma variante esperan un solo trabajo.
+- El caché es LRU por fecha de último acceso (atime, que serve_media
+  anota a mano porque los discos suelen montarse con noatime/relatime) y
+  se recorta a MEDIA_CACHE_MAX_BYTES. Un pedido repetido es un stat y un
+  sendfile.
+"""
+import functools
+import hashlib
+import mimetypes
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.deconstruct import deconstructible
+from django.utils.http import http_date, quote_etag
+from django.utils.module_loading import import_string
+from django.views.decorators.http import require_safe
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# Un acceso que "refresca" una variante del caché LRU solo se anota si la
+# última anotación tiene más de esto, para no escribir en disco en cada hit.
+TOUCH_EVERY = 60 * 60
+
+
+@deconstructible
+class LocalMediaStorage(FileSystemStorage):
+    """FileSystemStorage en MEDIA_ROOT / MEDIA_URL (servido por serve_media)."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("location", settings.MEDIA_ROOT)
+        kwargs.setdefault("base_url", settings.MEDIA_URL)
+        super().__init__(**kwargs)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_storage(path):
+    return import_string(path)()
+
+
+def media_storage():
+    """El storage de MEDIA_STORAGE; es el `storage=` de los campos de archivo."""
+    return _load_storage(settings.MEDIA_STORAGE)
+
+
+# ----------------------------------------------------------------------
+# Variantes reducidas
+# ----------------------------------------------------------------------
+
+def _render(source, target, width, height, fmt):
+    """Genera la variante en `target` (corre en un proceso del pool)."""
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        # JPEG: decodifica ya reducido (potencias de 2), mucho más barato.
+        image.draft("RGB", (width, height or width))
+        image = ImageOps.exif_transpose(image)
+        if height:
+            image = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+        else:
+            image.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+        if fmt == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+        elif image.mode not in ("RGB", "RGBA", "L", "LA"):
+            image = image.convert("RGBA")
+        temp = f"{target}.{os.getpid()}.tmp"
+        options = {"WEBP": {"quality": 80, "method": 4}, "JPEG": {"quality": 82, "optimize": True}}
+        image.save(temp, fmt, **options.get(fmt, {}))
+    os.replace(temp, target)
+    return os.path.getsize(target)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_pending = {}
+_pending_lock = threading.Lock()
+_cache_bytes = None
+_cache_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn y no fork: el worker ya tiene hilos (subidas, bitácora).
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.MEDIA_THUMB_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _generate(source, target, width, height, fmt):
+    """Genera la variante una sola vez aunque la pidan varios hilos a la vez."""
+    with _pending_lock:
+        future = _pending.get(target)
+        owner = future is None
+        if owner:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if settings.MEDIA_THUMB_WORKERS > 0:
+                future = _get_pool().submit(_render, source, target, width, height, fmt)
+            _pending[target] = future
+    try:
+        if future is None:
+            size = _render(source, target, width, height, fmt)
+        else:
+            size = future.result(timeout=settings.MEDIA_THUMB_TIMEOUT)
+    except BrokenProcessPool:
+        # Un proceso murió (OOM con una imagen enorme): el próximo pedido
+        # arma un pool nuevo en vez de fallar para siempre.
+        _reset_pool()
+        raise
+    finally:
+        if owner:
+            with _pending_lock:
+                _pending.pop(target, None)
+    if owner:
+        _account(size)
+
+
+def _account(size):
+    """Suma `size` al total del caché y lo recorta si se pasó del límite."""
+    global _cache_bytes
+    with _cache_lock:
+        if _cache_bytes is None:
+            _cache_bytes = _scan(settings.MEDIA_CACHE_DIR)[1]
+        else:
+            _cache_bytes += size
+        if _cache_bytes > settings.MEDIA_CACHE_MAX_BYTES:
+            _cache_bytes = prune_cache()
+
+
+def _scan(directory):
+    entries, total = [], 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+            total += stat.st_size
+    return entries, total
+
+
+def prune_cache(max_bytes=None):
+    """
+    Borra las variantes usadas hace más tiempo hasta quedar en el 90% de
+    `max_bytes` (MEDIA_CACHE_MAX_BYTES). Devuelve el total que queda.
+    """
+    max_bytes = settings.MEDIA_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries, total = _scan(settings.MEDIA_CACHE_DIR)
+    if total <= max_bytes:
+        return total
+    target = max_bytes * 0.9
+    for _, size, path in sorted(entries):
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+    return total
+
+
+def _variant_format(request, source):
+    if "image/webp" in request.headers.get("Accept", ""):
+        return "WEBP", "webp"
+    if source.lower().endswith(".png"):
+        return "PNG", "png"
+    return "JPEG", "jpg"
+
+
+def _variant_path(name, stat, width, height, extension):
+    key = f"{name}|{stat.st_size}|{stat.st_mtime_ns}|{width}|{height}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(settings.MEDIA_CACHE_DIR, digest[:2], f"{digest}.{extension}")
+
+
+def _parse_size(value, allowed):
+    if value is None:
+        return None
+    if not value.isdigit() or int(value) not in allowed:
+        raise ValueError(value)
+    return int(value)
+
+
+# ----------------------------------------------------------------------
+# Entrega
+# ----------------------------------------------------------------------
+
+class _RangeFile:
+    """
+    Un tramo de un archivo abierto. Expone fileno(): con wsgi.file_wrapper
+    (gunicorn) el tramo sale por sendfile desde la posición actual y con el
+    Content-Length de la respuesta; sin él, read() corta al final del tramo.
+    """
+
+    def __init__(self, handle, start, length):
+        handle.seek(start)
+        self.handle, self.remaining = handle, length
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.handle.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.handle.fileno()
+
+    def close(self):
+        self.handle.close()
+
+
+def _byte_range(header, size):
+    """(inicio, fin) del Range pedido, None si no aplica, o "invalid" (416)."""
+    match = RANGE_RE.match(header.strip())
+    if match is None:
+        return None  # varios rangos u otra unidad: se responde el archivo entero
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return "invalid"
+    return start, end
+
+
+def file_response(request, path, content_type=None):
+    """Responde `path` con 304 / 206 / 200 según los encabezados del pedido."""
+    stat = os.stat(path)
+    etag = quote_etag(f"{stat.st_size:x}-{stat.st_mtime_ns:x}")
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        content_type = content_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+        byte_range = None
+        header = request.headers.get("Range")
+        if_range = request.headers.get("If-Range")
+        if header and (if_range is None or if_range in (etag, http_date(stat.st_mtime))):
+            byte_range = _byte_range(header, stat.st_size)
+        if byte_range == "invalid":
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+        elif byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            response = FileResponse(_RangeFile(open(path, "rb"), start, length), content_type=content_type, status=206)
+            response["Content-Length"] = str(length)
+            response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        else:
+            response = FileResponse(open(path, "rb"), content_type=content_type)
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    patch_cache_control(response, public=True, max_age=settings.MEDIA_MAX_AGE)
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """MEDIA_URL/<path>[?w=…[&h=…]] desde MEDIA_ROOT (ver arriba)."""
+    # safe_join lanza SuspiciousFileOperation (400) si `path` sale de MEDIA_ROOT.
+    source = safe_join(settings.MEDIA_ROOT, path)
+    if not os.path.isfile(source):
+        raise Http404()
+
+    if "w" not in request.GET and "h" not in request.GET:
+        return file_response(request, source)
+
+    allowed = set(settings.IMAGE_VARIANT_WIDTHS) | {settings.IMAGE_THUMB_SIZE}
+    try:
+        width = _parse_size(request.GET.get("w"), allowed)
+        height = _parse_size(request.GET.get("h"), allowed)
+    except ValueError:
+        return HttpResponseBadRequest("Tamaño no permitido.")
+    if width is None:
+        return HttpResponseBadRequest("Falta w.")
+    fmt, extension = _variant_format(request, source)
+    target = _variant_path(path, os.stat(source), width, height, extension)
+    try:
+        stat = os.stat(target)
+    except FileNotFoundError:
+        try:
+            _generate(source, target, width, height, fmt)
+        except OSError:
+            # Pillow no la puede abrir (un video, un archivo dañado).
+            raise Http404()
+    else:
+        now = time.time()
+        if now - stat.st_atime > TOUCH_EVERY:
+            # Solo atime: mtime es parte del ETag.
+            os.utime(target, (now, stat.st_mtime))
+    response = file_response(request, target, content_type=f"image/{'jpeg' if extension == 'jpg' else extension}")
+    patch_vary_headers(response, ["Accept"])
+    return response
@@ -1,3 +1,1474 @@
-from django.test import TestCase
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings as django_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Avg, Count
+from django.http import HttpResponse, StreamingHttpResponse
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import Cursor
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from . import chunked, compression, fastjson, images, importer, pagination, retention, search, site_settings, snapshots, storage, uploads
+from .activity import ActivityLogBufferMiddleware
+from .caching import bump_version
+from .models import ActivityArchive, ActivityLog, ChunkedUpload, ContactInfo, Event, GalleryItem, Media, Place, PlaceRatingStats, Post, Review, SiteSettings
+from .ratings import refresh_places
+from .views import ActivityLogViewSet
+
+
+# Caché en memoria (no el de disco compartido entre corridas) y sin
+# snapshots estáticos: cada test parte limpio y no escribe fuera de la base.
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    SNAPSHOTS_ENABLED=False,
+)
+class TourismTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @staticmethod
+    def make_place(slug, **kwargs):
+        kwargs = {"name": slug.title(), "lat": -17.8, "lng": -63.1, **kwargs}
+        return Place.objects.create(slug=slug, **kwargs)
+
+    @staticmethod
+    def make_item(title, **kwargs):
+        # Con URL: sin archivo el item no aparece en el sitio público.
+        kwargs = {"media_file_url": "https://cdn.example.com/foto.jpg", **kwargs}
+        return GalleryItem.objects.create(title=title, **kwargs)
+
+    def assertStatsMatch(self, *places):
+        """PlaceRatingStats debe coincidir con un Avg/Count recién calculado."""
+        for place in places:
+            fresh = Review.objects.filter(place=place, is_approved=True).aggregate(
+                avg=Avg("rating"), count=Count("id"),
+            )
+            stats = PlaceRatingStats.objects.filter(place=place).first()
+            count = stats.rating_count if stats else 0
+            self.assertEqual(count, fresh["count"], place.slug)
+            if fresh["count"]:
+                self.assertAlmostEqual(stats.avg_rating, fresh["avg"])
+                for stars in range(1, 6):
+                    self.assertEqual(
+                        getattr(stats, f"stars_{stars}"),
+                        Review.objects.filter(place=place, is_approved=True, rating=stars).count(),
+                    )
+            elif stats:
+                self.assertIsNone(stats.avg_rating)
+
+
+class RatingStatsTests(TourismTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.place = self.make_place("cascada")
+        self.other = self.make_place("mirador")
+
+    def test_create(self):
+        Review.objects.create(place=self.place, rating=5)
+        Review.objects.create(place=self.place, rating=2)
+        Review.objects.create(place=self.place, rating=4, is_approved=False)
+        self.assertStatsMatch(self.place, self.other)
+
+    def test_approve_and_unapprove(self):
+        review = Review.objects.create(place=self.place, rating=3, is_approved=False)
+        Review.objects.create(place=self.place, rating=5)
+        self.assertStatsMatch(self.place)
+        review.is_approved = True
+        review.save()
+        self.assertStatsMatch(self.place)
+        review.is_approved = False
+        review.save()
+        self.assertStatsMatch(self.place)
+
+    def test_change_rating(self):
+        review = Review.objects.create(place=self.place, rating=1)
+        review.rating = 5
+        review.save()
+        self.assertStatsMatch(self.place)
+
+    def test_delete(self):
+        keep = Review.objects.create(place=self.place, rating=4)
+        Review.objects.create(place=self.place, rating=2).delete()
+        self.assertStatsMatch(self.place)
+        keep.delete()
+        self.assertStatsMatch(self.place)
+
+    def test_move_to_another_place(self):
+        review = Review.objects.create(place=self.place, rating=5)
+        Review.objects.create(place=self.other, rating=1)
+        review.place = self.other
+        review.save()
+        self.assertStatsMatch(self.place, self.other)
+
+    def test_deferred_fields(self):
+        # Con only() la señal no conoce el rating viejo y recalcula el lugar.
+        Review.objects.create(place=self.place, rating=2)
+        review = Review.objects.only("id", "place_id").get()
+        review.is_approved = False
+        review.save(update_fields=["is_approved"])
+        self.assertStatsMatch(self.place)
+
+    def test_queryset_update_then_refresh(self):
+        Review.objects.create(place=self.place, rating=5)
+        Review.objects.filter(place=self.place).update(rating=1)  # sin señales
+        refresh_places([self.place.pk])
+        self.assertStatsMatch(self.place)
+
+    def test_rebuild_command(self):
+        Review.objects.create(place=self.place, rating=4)
+        Review.objects.create(place=self.other, rating=2)
+        PlaceRatingStats.objects.all().update(rating_sum=99, rating_count=7, stars_4=0)
+        call_command("rebuild_rating_stats", stdout=io.StringIO())
+        self.assertStatsMatch(self.place, self.other)
+
+    def test_rebuild_command_single_place(self):
+        Review.objects.create(place=self.place, rating=4)
+        Review.objects.create(place=self.other, rating=2)
+        PlaceRatingStats.objects.all().update(rating_count=7)
+        call_command("rebuild_rating_stats", place_ids=[self.place.pk], stdout=io.StringIO())
+        self.assertStatsMatch(self.place)
+        self.assertEqual(PlaceRatingStats.objects.get(place=self.other).rating_count, 7)
+
+
+class BulkModerationTests(TourismTestCase):
+    def setUp(self):
+        super().setUp()
+        self.place = self.make_place("cascada")
+        self.other = self.make_place("mirador")
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("boss", is_staff=True))
+
+    def bulk(self, action, ids):
+        response = self.client.post("/api/moderation/reviews/bulk/", {"ids": ids, "action": action}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_approve_reports_each_id(self):
+        pending = Review.objects.create(place=self.place, rating=5, is_approved=False)
+        other = Review.objects.create(place=self.other, rating=1, is_approved=False)
+        approved = Review.objects.create(place=self.place, rating=3)
+        data = self.bulk("approve", [pending.pk, approved.pk, 9999, other.pk, pending.pk])
+        self.assertEqual(data["changed"], 2)
+        self.assertEqual(data["results"], [
+            {"id": pending.pk, "status": "approved"},
+            {"id": approved.pk, "status": "unchanged"},
+            {"id": 9999, "status": "not_found"},
+            {"id": other.pk, "status": "approved"},
+        ])
+        self.assertStatsMatch(self.place, self.other)
+
+    def test_unapprove(self):
+        reviews = [Review.objects.create(place=self.place, rating=r) for r in (2, 4)]
+        pending = Review.objects.create(place=self.place, rating=5, is_approved=False)
+        data = self.bulk("unapprove", [reviews[0].pk, pending.pk])
+        self.assertEqual(
+            [r["status"] for r in data["results"]], ["unapproved", "unchanged"],
+        )
+        self.assertStatsMatch(self.place)
+
+    def test_delete(self):
+        keep = Review.objects.create(place=self.place, rating=4)
+        gone = [
+            Review.objects.create(place=self.place, rating=1),
+            Review.objects.create(place=self.other, rating=5),
+        ]
+        data = self.bulk("delete", [review.pk for review in gone] + [9999])
+        self.assertEqual(
+            [r["status"] for r in data["results"]], ["deleted", "deleted", "not_found"],
+        )
+        self.assertEqual(list(Review.objects.values_list("pk", flat=True)), [keep.pk])
+        self.assertStatsMatch(self.place, self.other)
+
+    def test_invalid_action(self):
+        response = self.client.post(
+            "/api/moderation/reviews/bulk/", {"ids": [1], "action": "publish"}, format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class KeysetPaginationTests(TourismTestCase):
+    """Recorrer las páginas no debe repetir ni saltear filas, aunque empaten en el orden."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+    def walk(self, url, key="next"):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            ids.extend(item["id"] for item in page["results"])
+            url, pages = page[key], pages + 1
+            self.assertLess(pages, 50)
+        return ids
+
+    def test_gallery_ties_on_order(self):
+        # Casi todos con el mismo `order`: el desempate es la pk.
+        for i in range(11):
+            self.make_item(f"Foto {i}", order=100 if i % 4 else 50)
+        expected = list(GalleryItem.objects.order_by("order", "-id").values_list("id", flat=True))
+
+        forward = self.walk("/api/gallery/?page_size=3")
+        self.assertEqual(forward, expected)
+
+        # Y hacia atrás desde la última página.
+        response = self.client.get("/api/gallery/?page_size=3")
+        while response.json()["next"]:
+            response = self.client.get(response.json()["next"])
+        pages = [[item["id"] for item in response.json()["results"]]]
+        url = response.json()["previous"]
+        while url:
+            page = self.client.get(url).json()
+            pages.insert(0, [item["id"] for item in page["results"]])
+            url = page["previous"]
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_places_ties_on_created_at(self):
+        for i in range(7):
+            self.make_place(f"lugar-{i}")
+        Place.objects.update(created_at=timezone.now())
+        expected = list(Place.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        self.assertEqual(self.walk("/api/places/?page_size=2"), expected)
+
+    def test_rows_inserted_between_pages_are_not_repeated(self):
+        for i in range(6):
+            self.make_item(f"Foto {i}", order=100)
+        first = self.client.get("/api/gallery/?page_size=3").json()
+        self.make_item("Nueva", order=1)  # antes del cursor
+        rest = self.walk(first["next"])
+        seen = [item["id"] for item in first["results"]] + rest
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(len(seen), 6)
+
+    def test_without_params_returns_full_list(self):
+        for i in range(3):
+            self.make_item(f"Foto {i}")
+        self.assertEqual(len(self.client.get("/api/gallery/").json()), 3)
+
+    def test_nullable_ordering_is_rejected(self):
+        view = mock.Mock(pagination_ordering=("end_date", "-id"))
+        request = Request(RequestFactory().get("/", {"page_size": 2}))
+        with self.assertRaisesMessage(AssertionError, "end_date"):
+            pagination.KeysetPagination().paginate_queryset(Event.objects.all(), request, view)
+
+    def test_cursor_with_null_is_invalid(self):
+        self.make_item("Foto")
+        self.assertIsNone(pagination._encode_value(None))
+        paginator = pagination.KeysetPagination()
+        paginator.base_url = "http://testserver/api/gallery/?page_size=2"
+        url = paginator.encode_cursor(Cursor(offset=0, reverse=False, position=json.dumps([None, None])))
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get("/api/gallery/?cursor=basura").status_code, 404)
+
+
+class GalleryOrderTests(TourismTestCase):
+    GAP = GalleryItem.ORDER_GAP
+
+    def setUp(self):
+        super().setUp()
+        self.items = [self.make_item(f"Foto {i}") for i in range(4)]
+
+    def titles(self):
+        return list(GalleryItem.objects.values_list("title", flat=True))
+
+    def orders(self):
+        return dict(GalleryItem.objects.values_list("pk", "order"))
+
+    def test_new_items_go_last_with_gaps(self):
+        self.assertEqual([item.order for item in self.items], [self.GAP * i for i in range(1, 5)])
+
+    def test_move_writes_only_the_moved_row(self):
+        a, b, c, d = self.items
+        before = self.orders()
+        self.assertFalse(d.move(before=b))
+        self.assertEqual(self.titles(), ["Foto 0", "Foto 3", "Foto 1", "Foto 2"])
+        after = self.orders()
+        self.assertEqual({pk for pk in before if before[pk] != after[pk]}, {d.pk})
+        self.assertEqual(after[d.pk], (a.order + b.order) // 2)
+
+    def test_move_to_the_ends(self):
+        a, b, c, d = self.items
+        c.move(before=a)
+        b.move(after=d)
+        self.assertEqual(self.titles(), ["Foto 2", "Foto 0", "Foto 3", "Foto 1"])
+
+    def test_exhausted_gap_rebalances(self):
+        a, b, c, d = self.items
+        expected = ["Foto 0", "Foto 1", "Foto 2", "Foto 3"]
+        rebalanced = []
+        # Mover c y d alternadamente justo después de a parte el hueco a la
+        # mitad cada vez, hasta que no queda lugar.
+        for i in range(2 * self.GAP.bit_length()):
+            item = (c, d)[i % 2]
+            item.refresh_from_db()
+            a.refresh_from_db()
+            rebalanced.append(item.move(after=a))
+            expected.remove(item.title)
+            expected.insert(1, item.title)
+            self.assertEqual(self.titles(), expected)
+        self.assertTrue(any(rebalanced))
+        self.assertEqual(len(set(self.orders().values())), 4)
+
+    def test_tied_neighbors_rebalance(self):
+        a, b, c, d = self.items
+        GalleryItem.objects.filter(pk__in=[a.pk, b.pk]).update(order=self.GAP)
+        a.refresh_from_db()
+        self.assertTrue(d.move(after=a))
+        orders = self.orders()
+        self.assertEqual(len(set(orders.values())), 4)
+        self.assertEqual(self.titles()[self.titles().index(a.title) + 1], d.title)
+
+    def test_move_rereads_the_neighbor_under_the_lock(self):
+        a, b, c, d = self.items
+        stale_b = GalleryItem.objects.get(pk=b.pk)
+        # Otra request mueve b al final después de que leímos la fila.
+        b.move(after=d)
+        with CaptureQueriesContext(connection) as queries:
+            d.move(before=stale_b)
+        self.assertEqual(self.titles(), ["Foto 0", "Foto 2", "Foto 3", "Foto 1"])
+        self.assertEqual(stale_b.order, GalleryItem.objects.get(pk=b.pk).order)
+        if connection.features.has_select_for_update:
+            self.assertIn("FOR UPDATE", queries[1]["sql"])
+
+    def test_rebalance_is_one_update(self):
+        GalleryItem.objects.update(order=7)
+        # SAVEPOINT, el SELECT … FOR UPDATE, un único UPDATE y RELEASE.
+        with self.assertNumQueries(4):
+            self.assertEqual(GalleryItem.rebalance_order(), 4)
+        self.assertEqual(sorted(self.orders().values()), [self.GAP * i for i in range(1, 5)])
+        # Con empate, el orden previo era -id: se conserva.
+        self.assertEqual(self.titles(), ["Foto 3", "Foto 2", "Foto 1", "Foto 0"])
+
+    def test_move_endpoint(self):
+        a, b, c, d = self.items
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user("boss", is_staff=True))
+        response = client.post(f"/api/gallery/{a.pk}/move/", {"after": c.pk}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["rebalanced"], False)
+        self.assertEqual(self.titles(), ["Foto 1", "Foto 2", "Foto 0", "Foto 3"])
+        for body in ({}, {"before": a.pk}, {"after": 9999}, {"before": b.pk, "after": c.pk}):
+            self.assertEqual(client.post(f"/api/gallery/{a.pk}/move/", body, format="json").status_code, 400)
+
+
+class ResponseCacheTests(TourismTestCase):
+    def test_hits_skip_the_database_and_are_counted(self):
+        self.make_place("cascada")
+        client = APIClient()
+        first = client.get("/api/contact/")
+        self.assertEqual(first["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            second = client.get("/api/contact/")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.json(), second.json())
+
+        admin = User.objects.create_user("boss", is_staff=True)
+        client.force_authenticate(admin)
+        stats = client.get("/api/stats/").json()["response_cache"]
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (1, 1, 0.5))
+
+    def test_write_invalidates(self):
+        client = APIClient()
+        self.assertEqual(client.get("/api/contact/").json(), [])
+        ContactInfo.objects.create(name="Guía", category="GENERAL")
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_version("ContactInfo")
+        self.assertEqual(len(client.get("/api/contact/").json()), 1)
+
+
+class ConditionalGetTests(TourismTestCase):
+    def setUp(self):
+        super().setUp()
+        self.place = self.make_place("cascada")
+        self.client = APIClient()
+
+    def test_list_hit_and_304_do_not_query(self):
+        first = self.client.get("/api/places/?search=cascada")
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            hit = self.client.get("/api/places/?search=cascada")
+        self.assertEqual((hit["X-Cache"], hit["ETag"]), ("HIT", first["ETag"]))
+        with self.assertNumQueries(0):
+            not_modified = self.client.get("/api/places/?search=cascada", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_etag_depends_on_query_and_versions(self):
+        etag = self.client.get("/api/places/")["ETag"]
+        self.assertNotEqual(self.client.get("/api/places/?category=mirador")["ETag"], etag)
+        self.assertEqual(self.client.get("/api/places/")["ETag"], etag)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_version("Review")  # el rating del listado depende de las reseñas
+        response = self.client.get("/api/places/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_detail(self):
+        first = self.client.get("/api/places/cascada/")
+        self.assertEqual(first.status_code, 200)
+        again = self.client.get("/api/places/cascada/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(self.client.get("/api/places/no-existe/").status_code, 404)
+
+
+class StatsTests(TourismTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        place = self.make_place("cascada")
+        self.make_place("mirador", is_active=False)
+        Review.objects.create(place=place, rating=5)
+        Review.objects.create(place=place, rating=3, is_approved=False)
+        old = Review.objects.create(place=place, rating=4)
+        Review.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=3))
+
+    def test_one_query_per_model_and_cached(self):
+        self.client.force_authenticate(User.objects.create_user("boss", is_staff=True))
+        # places, events, posts, gallery, contacts, activity, users y reviews
+        # (totales y por día juntos).
+        with self.assertNumQueries(8):
+            data = self.client.get("/api/stats/").json()
+        self.assertEqual(data["places"], {"total": 2, "active": 1, "inactive": 1})
+        self.assertEqual(data["reviews"], {"total": 3, "approved": 2, "pending": 1})
+        per_day = data["reviews_per_day"]
+        self.assertEqual(len(per_day), 30)
+        self.assertEqual(per_day[-1], {"date": timezone.localdate().isoformat(), "count": 2})
+        self.assertEqual(per_day[-4]["count"], 1)
+        self.assertEqual(sum(day["count"] for day in per_day), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/stats/").json(), data)
+
+    def test_admin_only(self):
+        self.assertIn(self.client.get("/api/stats/").status_code, (401, 403))
+        self.client.force_authenticate(User.objects.create_user("editora"))
+        self.assertEqual(self.client.get("/api/stats/").status_code, 403)
+
+
+class SearchTests(TourismTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+    def names(self, **params):
+        response = self.client.get("/api/places/", params)
+        self.assertEqual(response.status_code, 200)
+        return [place["name"] for place in response.json()]
+
+    def test_typo_falls_back_to_trigrams(self):
+        self.make_place("cascada-escondida", name="Cascada Escondida")
+        self.make_place("mirador", name="Mirador del Sol")
+        self.assertEqual(self.names(search="cascda"), ["Cascada Escondida"])
+        self.assertEqual(self.names(search="mirdor sol"), ["Mirador del Sol"])
+        self.assertEqual(self.names(search="zzzz"), [])
+
+    def test_filters_apply_before_the_limit(self):
+        # Más coincidencias que MAX_RESULTS fuera del filtro: la que sí lo
+        # cumple no debe quedar afuera del ranking.
+        for i in range(5):
+            self.make_place(f"mirador-{i}", category="mirador")
+        self.make_place("lejano", name="Mirador Lejano", category="ruta", lat=-18.5, lng=-64.0)
+        self.make_place("oculto", name="Mirador Oculto", category="ruta", is_active=False)
+        with mock.patch("tourism.search.MAX_RESULTS", 3):
+            self.assertEqual(self.names(search="mirador", category="ruta"), ["Mirador Lejano"])
+            self.assertEqual(self.names(search="mirador", bbox="-64.1,-18.6,-63.9,-18.4"), ["Mirador Lejano"])
+            self.assertEqual(self.names(search="mirdor", category="ruta"), ["Mirador Lejano"])
+
+    def test_backends_must_implement_ranking(self):
+        class Incomplete(search.RankedBackend):
+            vendor = "otro"
+
+            def ranked_ids(self, cursor, terms, candidates):
+                return []
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+
+class GeoQueryTests(TourismTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        # A ~0.5 km, ~3 km y ~15 km al norte de (-17.8, -63.1).
+        self.make_place("cerca", lat=-17.7955, lng=-63.1)
+        self.make_place("medio", lat=-17.773, lng=-63.1)
+        self.make_place("lejos", lat=-17.665, lng=-63.1)
+        self.make_place("oculto", lat=-17.8, lng=-63.1001, is_active=False)
+
+    def nearby(self, **params):
+        return self.client.get("/api/places/nearby/", {"lat": -17.8, "lng": -63.1, **params})
+
+    def test_nearby_orders_by_distance_within_radius(self):
+        response = self.nearby(radius=10)
+        self.assertEqual(response.status_code, 200)
+        places = response.json()
+        self.assertEqual([p["slug"] for p in places], ["cerca", "medio"])
+        self.assertAlmostEqual(places[0]["distance_km"], 0.5, delta=0.05)
+        self.assertAlmostEqual(places[1]["distance_km"], 3.0, delta=0.05)
+        self.assertEqual([p["slug"] for p in self.nearby(radius=20).json()], ["cerca", "medio", "lejos"])
+        self.assertEqual([p["slug"] for p in self.nearby(radius=20, limit=1).json()], ["cerca"])
+
+    def test_bbox(self):
+        response = self.client.get("/api/places/", {"bbox": "-63.2,-17.85,-63.0,-17.77"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(p["slug"] for p in response.json()), ["cerca", "medio"])
+
+    def test_invalid_parameters_are_400(self):
+        for params in ({"limit": "inf"}, {"limit": "nan"}, {"limit": "2.5"}, {"radius": "inf"},
+                       {"lat": "nan"}, {"lat": "91"}, {"radius": "0"}):
+            self.assertEqual(self.nearby(**params).status_code, 400, params)
+        for bbox in ("nan,0,0,0", "-inf,-20,-60,-10", "1,2,3", "-64,-17,-63,-18",
+                     "-63,-17,-64,-16", "-190,-17,-63,-16", "-64,-95,-63,-16"):
+            response = self.client.get("/api/places/", {"bbox": bbox})
+            self.assertEqual(response.status_code, 400, bbox)
+
+
+class UploadResponseTests(TransactionTestCase):
+    """Sin transacción envolvente, para que el on_commit de la subida corra de verdad."""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings = override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+            SNAPSHOTS_ENABLED=False,
+            MEDIA_ROOT=media.name,
+            UPLOAD_SPOOL_DIR=f"{media.name}/spool",
+            UPLOAD_STORAGE_CLIENT="tourism.uploads.LocalClient",
+            UPLOAD_RUN_INLINE=True,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        uploads._load_client.cache_clear()
+        self.addCleanup(uploads._load_client.cache_clear)
+        cache.clear()
+
+    def test_202_reports_the_current_job_status(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user("boss", is_staff=True))
+        content = io.BytesIO()
+        Image.new("RGB", (4, 4), "red").save(content, "PNG")
+        image = SimpleUploadedFile("afiche.png", content.getvalue(), content_type="image/png")
+        response = client.post(
+            "/api/events/",
+            {"title": "Feria", "start_date": "2026-01-10T10:00:00Z", "image": image},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["upload_job"]["status"], "done")
+
+    def test_pending_uploads_are_hidden_from_visitors(self):
+        staff = APIClient()
+        staff.force_authenticate(User.objects.create_user("boss", is_staff=True))
+        visitor = APIClient()
+        place = Place.objects.create(name="Cascada", slug="cascada")
+
+        def image(name):
+            content = io.BytesIO()
+            Image.new("RGB", (4, 4), "red").save(content, "PNG")
+            return SimpleUploadedFile(name, content.getvalue(), content_type="image/png")
+
+        def listed(client):
+            return (
+                [item["id"] for item in client.get("/api/gallery/").data],
+                [item["id"] for item in client.get("/api/media/", {"place": "cascada"}).data],
+            )
+
+        # Los trabajos quedan en cola hasta llamar a run_job().
+        with mock.patch.object(uploads, "submit") as submit:
+            item = staff.post(
+                "/api/gallery/", {"title": "Salto", "media_file": image("salto.png"), "is_active": "true"},
+                format="multipart",
+            ).data
+            photo = staff.post(
+                "/api/media/", {"place": place.pk, "image": image("poza.png")}, format="multipart",
+            ).data
+        self.assertEqual(listed(staff), ([item["id"]], [photo["id"]]))
+        self.assertEqual(listed(visitor), ([], []))
+        self.assertEqual(visitor.get("/api/home/").data["gallery"], [])
+        self.assertEqual(visitor.get("/api/places/cascada/").data["media"], [])
+
+        for call in submit.call_args_list:
+            uploads.run_job(call.args[0].pk)
+        self.assertEqual(listed(visitor), ([item["id"]], [photo["id"]]))
+        self.assertEqual([i["id"] for i in visitor.get("/api/home/").data["gallery"]], [item["id"]])
+        self.assertEqual([m["id"] for m in visitor.get("/api/places/cascada/").data["media"]], [photo["id"]])
+
+
+class ChunkedUploadTests(TourismTestCase):
+    CONTENT = bytes(range(256)) * 40  # 10 240 bytes
+
+    def setUp(self):
+        super().setUp()
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        settings = override_settings(
+            CHUNKED_UPLOAD_DIR=f"{root.name}/chunks", UPLOAD_SPOOL_DIR=f"{root.name}/spool",
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client = APIClient()
+
+    def start(self, filename="clip.mp4"):
+        response = self.client.post(
+            "/api/chunked-uploads/", {"filename": filename, "total_size": len(self.CONTENT)}, format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["offset"], 0)
+        return f"/api/chunked-uploads/{response.data['id']}/"
+
+    def put(self, url, offset, data):
+        return self.client.put(f"{url}?offset={offset}", data, content_type="application/octet-stream")
+
+    def complete(self, url, sha256=None):
+        sha256 = sha256 or hashlib.sha256(self.CONTENT).hexdigest()
+        return self.client.post(f"{url}complete/", {"sha256": sha256}, format="json")
+
+    def upload(self, filename="clip.mp4"):
+        url = self.start(filename)
+        self.assertEqual(self.put(url, 0, self.CONTENT).status_code, 200)
+        self.assertEqual(self.complete(url).status_code, 200)
+        return url.rstrip("/").rsplit("/", 1)[1]
+
+    def test_resume_after_a_cut(self):
+        url = self.start()
+        self.assertEqual(self.put(url, 0, self.CONTENT[:4000]).data["offset"], 4000)
+        # Tras un corte, el cliente pregunta dónde quedó y sigue desde ahí.
+        offset = self.client.get(url).data["offset"]
+        self.assertEqual(offset, 4000)
+        self.assertEqual(self.put(url, offset, self.CONTENT[offset:]).data["offset"], len(self.CONTENT))
+        response = self.complete(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["status"], ChunkedUpload.STATUS_COMPLETE)
+        upload = ChunkedUpload.objects.get()
+        with open(upload.path, "rb") as fh:
+            self.assertEqual(fh.read(), self.CONTENT)
+
+    def test_out_of_order_chunk_returns_the_real_offset(self):
+        url = self.start()
+        self.put(url, 0, self.CONTENT[:1000])
+        for offset in (0, 2000):
+            response = self.put(url, offset, self.CONTENT[offset:offset + 1000])
+            self.assertEqual(response.status_code, 409)
+            self.assertEqual(response.data["offset"], 1000)
+        self.assertEqual(ChunkedUpload.objects.get().offset, 1000)
+
+    def test_size_mismatch(self):
+        url = self.start()
+        # Más bytes que los declarados.
+        self.assertEqual(self.put(url, 0, self.CONTENT + b"x").status_code, 400)
+        # Cerrar antes de recibirlo todo.
+        self.put(url, 0, self.CONTENT[:-1])
+        self.assertEqual(self.complete(url).status_code, 400)
+        self.assertEqual(ChunkedUpload.objects.get().status, ChunkedUpload.STATUS_UPLOADING)
+
+    def test_checksum_mismatch_starts_over(self):
+        url = self.start()
+        self.put(url, 0, self.CONTENT)
+        self.assertEqual(self.complete(url, sha256="0" * 64).status_code, 400)
+        upload = ChunkedUpload.objects.get()
+        self.assertEqual((upload.status, upload.offset), (ChunkedUpload.STATUS_UPLOADING, 0))
+        self.assertEqual(os.path.getsize(upload.path), 0)
+
+    def test_double_complete(self):
+        url = self.start()
+        self.put(url, 0, self.CONTENT)
+        self.assertEqual(self.complete(url).status_code, 200)
+        self.assertEqual(self.complete(url).status_code, 400)
+        self.assertEqual(self.put(url, 0, self.CONTENT).status_code, 400)
+
+    def test_attach_once(self):
+        upload_id = self.upload()
+        place = self.make_place("cascada")
+        response = self.client.post(
+            "/api/reviews/", {"place": place.pk, "rating": 5, "upload_id": upload_id}, format="json",
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(ChunkedUpload.objects.get().status, ChunkedUpload.STATUS_ATTACHED)
+        response = self.client.post(
+            "/api/reviews/", {"place": place.pk, "rating": 4, "upload_id": upload_id}, format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Review.objects.count(), 1)
+
+    def test_failed_save_releases_the_upload(self):
+        upload_id = self.upload()
+        place = self.make_place("cascada")
+        with mock.patch.object(uploads, "queue_upload", side_effect=OSError("disco lleno")):
+            with self.assertRaises(OSError):
+                self.client.post(
+                    "/api/reviews/", {"place": place.pk, "rating": 5, "upload_id": upload_id}, format="json",
+                )
+        self.assertFalse(Review.objects.exists())
+        self.assertEqual(ChunkedUpload.objects.get().status, ChunkedUpload.STATUS_COMPLETE)
+        with transaction.atomic():
+            file_obj = chunked.take(upload_id)
+        with file_obj:
+            self.assertEqual(file_obj.read(), self.CONTENT)
+        self.assertEqual(ChunkedUpload.objects.get().status, ChunkedUpload.STATUS_ATTACHED)
+
+    def test_rejected_file_stays_available(self):
+        upload_id = self.upload()
+
+        def reject(file_obj):
+            raise ValidationError({"upload_id": "no"})
+
+        with self.assertRaises(ValidationError), transaction.atomic():
+            chunked.take(upload_id, validate=reject)
+        self.assertEqual(ChunkedUpload.objects.get().status, ChunkedUpload.STATUS_COMPLETE)
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    SNAPSHOTS_ENABLED=False,
+    ACTIVITY_LOG_ASYNC=False,
+)
+class ActivityLogBufferTests(TransactionTestCase):
+    """Transacciones reales: las entradas entran al buffer recién al confirmarse."""
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().post("/")
+
+    def write(self, name):
+        contact = ContactInfo.objects.create(name=name, category="GENERAL")
+        ActivityLog.log(actor=None, action=ActivityLog.ACTION_CREATE, instance=contact)
+
+    def run_view(self, view):
+        return ActivityLogBufferMiddleware(view)(self.request)
+
+    def logged(self):
+        return sorted(repr_.split(" (")[0] for repr_ in ActivityLog.objects.values_list("object_repr", flat=True))
+
+    def log_inserts(self, queries):
+        return [q["sql"] for q in queries if q["sql"].startswith('INSERT INTO "tourism_activitylog"')]
+
+    def test_one_bulk_insert_per_request(self):
+        def view(request):
+            with self.assertNumQueries(3):  # solo los INSERT de ContactInfo
+                for name in ("a", "b", "c"):
+                    self.write(name)
+            return HttpResponse()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.run_view(view)
+        # Un único bulk_create, al terminar la request, con las tres entradas.
+        self.assertEqual(len(self.log_inserts(queries)), 1)
+        self.assertEqual(self.logged(), ["a", "b", "c"])
+
+    def test_bulk_endpoint_writes_the_log_once(self):
+        place = Place.objects.create(name="Cascada", slug="cascada")
+        reviews = [Review.objects.create(place=place, rating=4, is_approved=False) for _ in range(3)]
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user("boss", is_staff=True))
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(
+                "/api/moderation/reviews/bulk/",
+                {"ids": [review.pk for review in reviews], "action": "approve"},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.log_inserts(queries)), 1)
+        self.assertEqual(ActivityLog.objects.filter(action=ActivityLog.ACTION_UPDATE).count(), 3)
+
+    def test_flushed_when_the_view_raises(self):
+        def view(request):
+            self.write("guardado")
+            raise RuntimeError("falla después de guardar")
+
+        with self.assertRaises(RuntimeError):
+            self.run_view(view)
+        self.assertEqual(self.logged(), ["guardado"])
+
+    def test_flushed_when_a_transaction_rolls_back(self):
+        def view(request):
+            self.write("guardado")
+            with transaction.atomic():
+                self.write("revertido")
+                raise RuntimeError("se revierte")
+
+        with self.assertRaises(RuntimeError):
+            self.run_view(view)
+        # Lo confirmado se escribe; lo revertido nunca pasó.
+        self.assertEqual(self.logged(), ["guardado"])
+        self.assertFalse(ContactInfo.objects.filter(name="revertido").exists())
+
+
+class SyncSnapshotTests(TransactionTestCase):
+    """SNAPSHOT_ASYNC=False: la request espera la publicación, pero no la hace ella."""
+
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.root = root.name
+        settings = override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+            SNAPSHOTS_ENABLED=True,
+            SNAPSHOT_ASYNC=False,
+            SNAPSHOT_ROOT=self.root,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        cache.clear()
+        site_settings._snapshot = None
+        self.addCleanup(setattr, site_settings, "_snapshot", None)
+
+    def get_in_thread(self, path):
+        # En un hilo aparte para que un deadlock falle el test en vez de colgarlo.
+        result = {}
+
+        def run():
+            try:
+                result["response"] = APIClient().get(path)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=30)
+        self.assertFalse(thread.is_alive(), f"GET {path} no terminó")
+        return result["response"]
+
+    def test_first_site_settings_read_on_empty_table(self):
+        # load() crea la fila, su save() sube la versión y eso publica
+        # snapshots que vuelven a leer /api/site-settings/.
+        self.assertFalse(SiteSettings.objects.exists())
+        response = self.get_in_thread("/api/site-settings/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(SiteSettings.objects.count(), 1)
+
+        manifest = snapshots.read_manifest()
+        self.assertIsNotNone(manifest)
+        filename = os.path.basename(manifest["files"]["site-settings"])
+        with open(os.path.join(self.root, filename), "rb") as fh:
+            self.assertEqual(json.load(fh), response.json())
+
+
+class CompressionTests(TourismTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        for i in range(15):
+            ContactInfo.objects.create(name=f"Guía {i}", category="GENERAL", address="Camino a El Torno, km 30")
+        self.plain = self.client.get("/api/contact/").content
+        self.assertGreater(len(self.plain), 1024)
+
+    def get(self, accept_encoding, path="/api/contact/"):
+        return self.client.get(path, HTTP_ACCEPT_ENCODING=accept_encoding)
+
+    def test_negotiation(self):
+        br = self.get("gzip, deflate, br")
+        self.assertEqual(br["Content-Encoding"], "br")
+        self.assertEqual(compression.brotli.decompress(br.content), self.plain)
+
+        gz = self.get("gzip, br;q=0")
+        self.assertEqual(gz["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(gz.content), self.plain)
+
+        for header in ("", "identity", "br;q=0, gzip;q=0", "*;q=0"):
+            response = self.get(header)
+            self.assertFalse(response.has_header("Content-Encoding"), header)
+            self.assertEqual(response.content, self.plain)
+            self.assertIn("Accept-Encoding", response["Vary"])
+
+        for response in (br, gz):
+            self.assertIn("Accept-Encoding", response["Vary"])
+            self.assertEqual(response["Content-Length"], str(len(response.content)))
+
+    def test_cached_body_without_etag_is_compressed_once(self):
+        with mock.patch("tourism.compression.compress", wraps=compression.compress) as compress:
+            first, second = self.get("br"), self.get("br")
+        self.assertFalse(first.has_header("ETag"))
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(first.content, second.content)
+
+    def test_small_and_streaming_responses_are_left_alone(self):
+        ContactInfo.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_version("ContactInfo")
+        small = self.get("br")
+        self.assertFalse(small.has_header("Content-Encoding"))
+
+        request = RequestFactory().get("/api/export/", HTTP_ACCEPT_ENCODING="br, gzip")
+        streaming = StreamingHttpResponse(iter([b"[" + b"0," * 2000 + b"0]"]), content_type="application/json")
+        response = compression.CompressionMiddleware(lambda request: streaming)(request)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(len(b"".join(response.streaming_content)), 4003)
+
+
+class ImporterTests(TourismTestCase):
+    def csv_rows(self, text):
+        return importer.read_rows(io.BytesIO(text.encode("utf-8")), "catalogo.csv")
+
+    def test_create_update_and_row_errors(self):
+        result = importer.run_import("places", self.csv_rows(
+            "name,slug,category,lat,lng,key_features\n"
+            "Cascada Alta,cascada-alta,cascada,-17.8,-63.1,Piscina|Sendero\n"
+            "Mirador,mirador,mirador,-17.81,-63.12,\n"
+            ",sin-nombre,ruta,,,\n"
+            "Lejos,lejos,volcan,-17.9,-63.2,\n"
+        ))
+        self.assertEqual((result.total, result.created, result.updated, result.error_count), (4, 2, 0, 2))
+        self.assertEqual([error["row"] for error in result.errors], [3, 4])
+        self.assertIn("name", result.errors[0]["errors"])
+        self.assertIn("category", result.errors[1]["errors"])
+        cascada = Place.objects.get(slug="cascada-alta")
+        self.assertEqual(cascada.key_features, ["Piscina", "Sendero"])
+        self.assertTrue(cascada.geohash)
+
+        # Misma clave: actualiza, y las celdas vacías no pisan lo que había.
+        result = importer.run_import("places", self.csv_rows(
+            "name,slug,category,description,lat,lng\n"
+            "Cascada Alta,cascada-alta,cascada,Nueva descripción,,\n"
+            "Ruta Nueva,ruta-nueva,ruta,,,\n"
+        ))
+        self.assertEqual((result.created, result.updated, result.error_count), (1, 1, 0))
+        cascada.refresh_from_db()
+        self.assertEqual(cascada.description, "Nueva descripción")
+        self.assertEqual((float(cascada.lat), cascada.key_features), (-17.8, ["Piscina", "Sendero"]))
+        self.assertEqual(Place.objects.count(), 3)
+
+    def test_events_resolve_places_by_slug(self):
+        self.make_place("cascada")
+        result = importer.run_import("events", iter([
+            {"title": "Feria", "start_date": "2026-03-01T10:00:00Z", "place": "cascada"},
+            {"title": "Rally", "start_date": "2026-04-01T10:00:00Z", "place": "no-existe"},
+        ]))
+        self.assertEqual((result.created, result.error_count), (1, 1))
+        self.assertEqual(Event.objects.get().place.slug, "cascada")
+        self.assertIn("place", result.errors[0]["errors"])
+
+    def test_queries_do_not_grow_with_rows(self):
+        def queries_for(count, prefix):
+            rows = [
+                {"name": f"Lugar {i}", "slug": f"{prefix}-{i}", "category": "otro", "lat": -17.8, "lng": -63.1}
+                for i in range(count)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                result = importer.run_import("places", iter(rows), batch_size=500)
+            self.assertEqual(result.created + result.updated, count)
+            return len(queries)
+
+        # 10 o 400 filas en un lote: las mismas consultas, al crear y al
+        # volver a importar (upsert de todas). Django parte los INSERT de
+        # SQLite en tandas de 999 parámetros (PostgreSQL no tiene ese
+        # límite); se sube para medir lo que hace el importador.
+        with mock.patch.object(connection.features, "max_query_params", 32766):
+            self.assertEqual(queries_for(10, "a"), queries_for(400, "b"))
+            self.assertEqual(queries_for(10, "a"), queries_for(400, "b"))
+
+    def test_importer_requires_existing(self):
+        class Incomplete(importer.Importer):
+            model = Place
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+
+class SparseFieldsTests(TourismTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.place = self.make_place("cascada", description="Una caída de agua de 40 metros.")
+        for caption in ("poza", "sendero"):
+            Media.objects.create(place=self.place, image=f"places/{caption}.jpg", caption=caption)
+        Review.objects.create(place=self.place, rating=4)
+        self.make_place("mirador")
+        Post.objects.create(title="Temporada de lluvias", body="Texto largo " * 50, place=self.place)
+
+    def get(self, url, **params):
+        cache.clear()
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_output_matches_the_full_serializer(self):
+        cases = [
+            ("/api/places/", "id,name,slug,lat,lng,avg_rating"),
+            ("/api/places/cascada/", "id,name,media,reviews_count"),
+            ("/api/posts/", "id,title,excerpt"),
+        ]
+        for url, fields in cases:
+            with self.subTest(url=url, fields=fields):
+                full = self.get(url)
+                sparse = self.get(url, fields=fields)
+                names = fields.split(",")
+                project = lambda row: {name: row[name] for name in names}
+                if isinstance(full, list):
+                    self.assertEqual(sparse, [project(row) for row in full])
+                else:
+                    self.assertEqual(sparse, project(full))
+        full = self.get("/api/places/cascada/")
+        omitted = self.get("/api/places/cascada/", omit="media,description")
+        self.assertEqual(omitted, {k: v for k, v in full.items() if k not in ("media", "description")})
+
+    def test_queryset_is_narrowed(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.get("/api/places/cascada/")
+        self.assertEqual(len(queries), 2)  # el lugar (JOIN a rating_stats) y el prefetch de fotos
+        with CaptureQueriesContext(connection) as queries:
+            self.get("/api/places/cascada/", fields="id,name,slug")
+        # Sin prefetch de fotos ni JOIN a las estadísticas, y solo las columnas pedidas.
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]["sql"]
+        self.assertNotIn("rating_stats", sql)
+        self.assertNotIn('"description"', sql)
+        self.assertIn('"slug"', sql)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.get("/api/places/cascada/", omit="media")
+        self.assertEqual(len(queries), 1)
+
+    def test_unknown_field_is_a_400(self):
+        response = self.client.get("/api/places/", {"fields": "id,nope"})
+        self.assertEqual(response.status_code, 400)
+
+
+class FastJSONTests(TestCase):
+    def test_renderer_matches_drf(self):
+        when = timezone.now().replace(microsecond=123456)
+        row = ReturnDict(
+            {
+                "precio": Decimal("12.50"),
+                "lat": Decimal("-17.800123"),
+                "cuando": when,
+                "naive": datetime(2026, 1, 10, 8, 30, 15, 250),
+                "fecha": date(2026, 1, 10),
+                "hora": time(8, 30, 0, 500),
+                "duracion": timedelta(hours=1, seconds=5),
+                "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+                "texto": gettext_lazy("Lugares"),
+                "acentos": "Cascada ñandú · 🌊",
+                "separadores": "a\u2028b\u2029c",
+                "vacio": None,
+                "ok": True,
+            },
+            serializer=None,
+        )
+        data = ReturnList([row, ReturnDict({"anidado": ReturnList([row], serializer=None)}, serializer=None)], serializer=None)
+        # Sin caer en el JSONRenderer de DRF: la salida es la de orjson.
+        with mock.patch.object(JSONRenderer, "render", side_effect=AssertionError("fallback")):
+            rendered = fastjson.FastJSONRenderer().render(data)
+        self.assertEqual(rendered, JSONRenderer().render(data))
+        # Con sangría 2 también la de orjson; con otra (o con un entero de
+        # más de 64 bits, que orjson no acepta) se usa la de DRF.
+        for indent in (2, 4):
+            context = {"indent": indent}
+            self.assertEqual(
+                fastjson.FastJSONRenderer().render(data, renderer_context=context),
+                JSONRenderer().render(data, renderer_context=context),
+            )
+        data.append({"grande": 2 ** 70})
+        self.assertEqual(fastjson.FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_parser_rejects_malformed_bodies(self):
+        client = APIClient()
+        for body in ('{"filename": "clip.mp4",', "no es json", '{"a": NaN}', b"\xff\xfe"):
+            with self.subTest(body=body):
+                response = client.post("/api/chunked-uploads/", body, content_type="application/json")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("JSON parse error", response.json()["detail"])
+        self.assertEqual(
+            fastjson.FastJSONParser().parse(io.BytesIO(b'{"a": [1, 2.5, "\\u00f1"]}')), {"a": [1, 2.5, "ñ"]},
+        )
+
+
+@override_settings(IMAGE_VARIANT_WIDTHS=[320, 640], IMAGE_THUMB_SIZE=200)
+class ImageVariantsTests(TestCase):
+    CLOUD = "https://res.cloudinary.com/demo/image/upload/v1/media/places/salto.jpg"
+
+    @override_settings(IMAGE_URL_TRANSFORMER="tourism.images.CloudinaryTransformer")
+    def test_cloudinary(self):
+        base = "https://res.cloudinary.com/demo/image/upload/"
+        self.assertEqual(images.variants(self.CLOUD), {
+            "src": self.CLOUD,
+            "srcset": f"{base}w_320,c_limit,f_auto,q_auto/v1/media/places/salto.jpg 320w, "
+                      f"{base}w_640,c_limit,f_auto,q_auto/v1/media/places/salto.jpg 640w",
+            "widths": {
+                "320": f"{base}w_320,c_limit,f_auto,q_auto/v1/media/places/salto.jpg",
+                "640": f"{base}w_640,c_limit,f_auto,q_auto/v1/media/places/salto.jpg",
+            },
+            "thumb": f"{base}c_fill,g_auto,w_200,h_200,f_auto,q_auto/v1/media/places/salto.jpg",
+        })
+        video = images.variants("https://res.cloudinary.com/demo/video/upload/v1/media/gallery/rio.mp4")
+        self.assertEqual(video["widths"], {})
+        self.assertEqual(
+            video["thumb"],
+            "https://res.cloudinary.com/demo/video/upload/so_0,c_fill,g_auto,w_200,h_200,f_auto,q_auto/v1/media/gallery/rio.jpg",
+        )
+
+    @override_settings(IMAGE_URL_TRANSFORMER="tourism.images.LocalTransformer")
+    def test_local(self):
+        data = images.variants("http://testserver/media/places/salto.jpg")
+        self.assertEqual(data["widths"]["640"], "http://testserver/media/places/salto.jpg?w=640")
+        self.assertEqual(data["thumb"], "http://testserver/media/places/salto.jpg?w=200&h=200")
+        self.assertEqual(images.variants("/media/places/salto.png?v=2")["widths"]["320"], "/media/places/salto.png?v=2&w=320")
+        # Un video local queda sin variantes.
+        self.assertEqual(
+            images.variants("/media/gallery/rio.mp4"),
+            {"src": "/media/gallery/rio.mp4", "srcset": "", "widths": {}, "thumb": None},
+        )
+
+    @override_settings(IMAGE_URL_TRANSFORMER="tourism.images.CloudinaryTransformer")
+    def test_other_origins_and_empty(self):
+        self.assertEqual(images.variants("https://example.com/a.jpg")["srcset"], "")
+        self.assertIsNone(images.variants(""))
+        self.assertIsNone(images.variants(None))
+
+
+class MediaServingTests(TestCase):
+    CONTENT = bytes(range(256)) * 4  # 1024 bytes
+
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        settings = override_settings(
+            MEDIA_ROOT=f"{root.name}/media", MEDIA_CACHE_DIR=f"{root.name}/cache",
+            MEDIA_THUMB_WORKERS=0, IMAGE_VARIANT_WIDTHS=[320, 640], IMAGE_THUMB_SIZE=200,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        os.makedirs(f"{root.name}/media/places")
+        with open(f"{root.name}/media/places/plano.bin", "wb") as fh:
+            fh.write(self.CONTENT)
+        Image.new("RGB", (800, 600), "green").save(f"{root.name}/media/places/salto.jpg", "JPEG")
+        self.factory = RequestFactory()
+
+    def serve(self, path, query=None, **headers):
+        response = storage.serve_media(self.factory.get(f"/media/{path}", query, headers=headers), path)
+        self.addCleanup(response.close)
+        return response
+
+    def body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_full_and_conditional(self):
+        response = self.serve("places/plano.bin")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.CONTENT)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(self.serve("places/plano.bin", If_None_Match=response["ETag"]).status_code, 304)
+
+    def test_range(self):
+        cases = {"bytes=10-19": (10, 19), "bytes=1000-": (1000, 1023), "bytes=-24": (1000, 1023), "bytes=1020-5000": (1020, 1023)}
+        for header, (start, end) in cases.items():
+            with self.subTest(header):
+                response = self.serve("places/plano.bin", Range=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/1024")
+                self.assertEqual(response["Content-Length"], str(end - start + 1))
+                self.assertEqual(self.body(response), self.CONTENT[start:end + 1])
+
+    def test_range_past_the_end(self):
+        for header in ("bytes=1024-", "bytes=2000-3000"):
+            response = self.serve("places/plano.bin", Range=header)
+            self.assertEqual(response.status_code, 416)
+            self.assertEqual(response["Content-Range"], "bytes */1024")
+
+    def test_if_range(self):
+        etag = self.serve("places/plano.bin")["ETag"]
+        self.assertEqual(self.serve("places/plano.bin", Range="bytes=0-9", If_Range=etag).status_code, 206)
+        # El archivo cambió desde que el cliente guardó el ETag: va entero.
+        response = self.serve("places/plano.bin", Range="bytes=0-9", If_Range='"viejo"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.CONTENT)
+
+    def test_variants(self):
+        for query in ({"w": "123"}, {"w": "640", "h": "99"}, {"h": "200"}, {"w": "abc"}):
+            with self.subTest(query):
+                self.assertEqual(self.serve("places/salto.jpg", query).status_code, 400)
+
+        response = self.serve("places/salto.jpg", {"w": "320"}, Accept="image/webp,*/*")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        self.assertIn("Accept", response["Vary"])
+        with Image.open(io.BytesIO(self.body(response))) as image:
+            self.assertEqual(image.size, (320, 240))
+        # El segundo pedido sale del caché, sin volver a generarla.
+        with mock.patch.object(storage, "_render") as render:
+            self.assertEqual(self.serve("places/salto.jpg", {"w": "320"}, Accept="image/webp").status_code, 200)
+        render.assert_not_called()
+
+        response = self.serve("places/salto.jpg", {"w": "200", "h": "200"})
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        with Image.open(io.BytesIO(self.body(response))) as image:
+            self.assertEqual(image.size, (200, 200))
+
+    def test_prune_cache_evicts_least_recently_used(self):
+        cache_dir = os.path.join(django_settings.MEDIA_CACHE_DIR, "ab")
+        os.makedirs(cache_dir)
+        now = timezone.now().timestamp()
+        # El más viejo por atime es el más nuevo por mtime: cuenta el acceso.
+        ages = {"a": 300, "b": 100, "c": 200}
+        for name, age in ages.items():
+            path = os.path.join(cache_dir, name)
+            with open(path, "wb") as fh:
+                fh.write(b"x" * 100)
+            os.utime(path, (now - age, now - 400 + age))
+        self.assertEqual(storage.prune_cache(max_bytes=300), 300)  # sin pasarse, no toca nada
+        self.assertEqual(storage.prune_cache(max_bytes=250), 200)
+        self.assertEqual(sorted(os.listdir(cache_dir)), ["b", "c"])
+        self.assertEqual(storage.prune_cache(max_bytes=150), 100)
+        self.assertEqual(os.listdir(cache_dir), ["b"])
+
+
+class ActivityLogExportTests(TourismTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user("boss", is_staff=True)
+        self.editor = User.objects.create_user("editora")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        base = datetime(2026, 3, 10, 12, 0, tzinfo=dt_timezone.utc)
+        for day, (actor, action, model_name) in enumerate([
+            (self.admin, "create", "Place"),
+            (self.editor, "update", "Place"),
+            (self.editor, "update", "Event"),
+            (self.admin, "delete", "Post"),
+            (None, "update", "Place"),
+        ]):
+            self.log(actor, action, model_name, base + timedelta(days=day))
+
+    @staticmethod
+    def log(actor, action, model_name, when):
+        entry = ActivityLog.objects.create(
+            actor=actor, action=action, model_name=model_name, object_id="1", object_repr=f"{model_name} 1",
+        )
+        ActivityLog.objects.filter(pk=entry.pk).update(created_at=when)
+
+    def export(self, **params):
+        response = self.client.get("/api/activity/export/", params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode("utf-8")
+
+    def csv_rows(self, **params):
+        header, *rows = csv.reader(io.StringIO(self.export(**params)))
+        self.assertEqual(header, list(ActivityLogViewSet.EXPORT_KEYS))
+        return rows
+
+    def test_filters(self):
+        cases = [
+            ({}, 5),
+            ({"model_name": "Place"}, 3),
+            ({"action": "update"}, 3),
+            ({"actor": self.editor.pk}, 2),
+            ({"model_name": "Place", "action": "update"}, 2),
+            # Una fecha sola como `until` incluye todo ese día.
+            ({"since": "2026-03-11", "until": "2026-03-12"}, 2),
+            ({"since": "2026-03-11T12:00:00Z"}, 4),
+        ]
+        for params, count in cases:
+            with self.subTest(params):
+                self.assertEqual(len(self.csv_rows(**params)), count)
+                self.assertEqual(len(self.client.get("/api/activity/", params).json()["results"]), count)
+
+    def test_csv_and_ndjson(self):
+        rows = self.csv_rows(actor=self.editor.pk)
+        # Del más nuevo al más viejo, como el listado.
+        self.assertEqual(
+            [row[1:7] for row in rows],
+            [
+                ["update", "Event", "1", "Event 1", str(self.editor.pk), "editora"],
+                ["update", "Place", "1", "Place 1", str(self.editor.pk), "editora"],
+            ],
+        )
+        self.assertEqual(rows[0][0], "2026-03-12T12:00:00+00:00")
+        # Sin actor: celdas vacías en CSV y null en NDJSON.
+        self.assertEqual(self.csv_rows(since="2026-03-14")[0][5:], ["", ""])
+        records = [json.loads(line) for line in self.export(output="ndjson", since="2026-03-14").splitlines()]
+        self.assertEqual(records, [{
+            "created_at": "2026-03-14T12:00:00+00:00", "action": "update", "model_name": "Place",
+            "object_id": "1", "object_repr": "Place 1", "actor_id": None, "actor": None,
+        }])
+
+    def test_export_is_read_while_streaming(self):
+        with mock.patch.object(ActivityLogViewSet, "EXPORT_CHUNK_SIZE", 2):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get("/api/activity/export/", {"output": "ndjson"})
+            self.assertFalse(any("tourism_activitylog" in q["sql"] for q in queries))
+            lines = list(response.streaming_content)
+        self.assertEqual(len(lines), 5)
+
+    def test_invalid_params_and_permissions(self):
+        for params in ({"action": "borrar"}, {"actor": "x"}, {"since": "ayer"}, {"output": "xlsx"}):
+            with self.subTest(params):
+                self.assertEqual(self.client.get("/api/activity/export/", params).status_code, 400)
+        self.client.force_authenticate(self.editor)
+        self.assertEqual(self.client.get("/api/activity/export/").status_code, 403)
+
+
+class ActivityArchiveTests(TourismTestCase):
+    def setUp(self):
+        super().setUp()
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        settings = override_settings(ACTIVITY_ARCHIVE_DIR=root.name, ACTIVITY_ARCHIVE_BATCH_SIZE=2)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.admin = User.objects.create_user("boss", is_staff=True)
+        for month, count in ((1, 5), (2, 3), (4, 2)):
+            for day in range(count):
+                when = datetime(2026, month, 10 + day, 12, 0, tzinfo=dt_timezone.utc)
+                ActivityLogExportTests.log(self.admin if day % 2 else None, "update", f"Modelo{day % 2}", when)
+        self.before = datetime(2026, 3, 1, tzinfo=dt_timezone.utc)
+
+    def snapshot(self, month):
+        rows = ActivityLog.objects.filter(created_at__month=month).order_by("id").values_list(*retention.FIELDS)
+        return [
+            {**dict(zip(retention.KEYS, row)), "created_at": row[1].isoformat()} for row in rows
+        ]
+
+    def test_archived_month_restores_the_same_rows(self):
+        expected = {1: self.snapshot(1), 2: self.snapshot(2)}
+        moved = retention.archive(self.before)
+        self.assertEqual(moved, {date(2026, 1, 1): 5, date(2026, 2, 1): 3})
+        self.assertEqual(ActivityLog.objects.count(), 2)
+        for month, rows in expected.items():
+            entry = ActivityArchive.objects.get(month=date(2026, month, 1))
+            self.assertEqual(list(retention.read_archive(entry)), rows)
+            self.assertEqual(entry.row_count, len(rows))
+            self.assertEqual(sum(entry.by_model[name]["update"] for name in entry.by_model), len(rows))
+        # Nada más para archivar: una segunda corrida no duplica.
+        self.assertEqual(retention.archive(self.before), {})
+        self.assertEqual(ActivityArchive.objects.get(month=date(2026, 1, 1)).row_count, 5)
+
+    def test_interrupted_run_is_rewritten(self):
+        retention.archive(self.before)
+        entry = ActivityArchive.objects.get(month=date(2026, 1, 1))
+        # Una corrida anterior escribió y se cortó antes de borrar sus filas.
+        with open(entry.path, "ab") as fh:
+            fh.write(gzip.compress(b'{"id": 999}\n'))
+        ActivityLogExportTests.log(None, "create", "Place", datetime(2026, 1, 20, tzinfo=dt_timezone.utc))
+        late = self.snapshot(1)
+        retention.archive(self.before)
+        entry.refresh_from_db()
+        rows = list(retention.read_archive(entry))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[-1], late[0])
+        self.assertEqual(os.path.getsize(entry.path), entry.size_bytes)
+
+    def test_archive_endpoint(self):
+        expected = self.snapshot(2)
+        retention.archive(self.before)
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        self.assertEqual([a["month"] for a in client.get("/api/activity/archives/").json()], ["2026-02", "2026-01"])
+
+        response = client.get("/api/activity/archives/2026-02/", {"output": "ndjson"})
+        records = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        self.assertEqual(records, [{key: row[key] for key in ActivityLogViewSet.EXPORT_KEYS} for row in expected])
+
+        response = client.get("/api/activity/archives/2026-02/", {"output": "gz"})
+        lines = gzip.decompress(b"".join(response.streaming_content)).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], expected)
+        self.assertEqual(client.get("/api/activity/archives/2025-02/").status_code, 404)
+
+    def test_one_run_at_a_time(self):
+        cache.add(retention.LOCK_KEY, True)
+        with self.assertRaises(retention.ArchiveLocked):
+            retention.archive(self.before)
+        self.assertEqual(ActivityLog.objects.count(), 10)
+
+
+class SiteSettingsSnapshotTests(TourismTestCase):
+    def setUp(self):
+        super().setUp()
+        site_settings._snapshot = None
+        self.addCleanup(setattr, site_settings, "_snapshot", None)
+
+    def test_reads_are_served_from_memory(self):
+        first = site_settings.site_settings_snapshot()
+        with self.assertNumQueries(0):
+            self.assertIs(site_settings.site_settings_snapshot(), first)
+            self.assertEqual(APIClient().get("/api/site-settings/").json()["camping_text"], first.data["camping_text"])
+
+    def test_save_invalidates_the_snapshot(self):
+        instance = site_settings.site_settings_snapshot().instance
+        instance.camping_text = "Zona de camping renovada."
+        with self.captureOnCommitCallbacks(execute=True):
+            instance.save()
+        self.assertEqual(site_settings.site_settings_snapshot().data["camping_text"], "Zona de camping renovada.")
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user("boss", is_staff=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.patch("/api/site-settings/", {"camping_text": "Cerrado por lluvias."}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(APIClient().get("/api/site-settings/").json()["camping_text"], "Cerrado por lluvias.")
+
+
+class HomeFragmentTests(TourismTestCase):
+    def setUp(self):
+        super().setUp()
+        self.staff = APIClient()
+        self.staff.force_authenticate(User.objects.create_user("boss", is_staff=True))
+        self.visitor = APIClient()
+        place = self.make_place("cascada")
+        self.event = Event.objects.create(title="Feria", start_date=timezone.now() + timedelta(days=2), place=place)
+        Review.objects.create(place=place, rating=5)
+        self.make_item("Salto")
+
+    def home(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.visitor.get("/api/home/")
+        self.assertEqual(response.status_code, 200)
+        tables = {table for q in queries for table in ("place", "event", "review", "galleryitem") if f'"tourism_{table}"' in q["sql"]}
+        return response.json(), tables
+
+    def write(self, method, url, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.staff, method)(url, data, format="json")
+        self.assertLess(response.status_code, 300)
+
+    def test_sections(self):
+        data, tables = self.home()
+        self.assertEqual(set(data), {"upcoming_events", "reviews", "gallery", "places"})
+        self.assertEqual(tables, {"place", "event", "review", "galleryitem"})
+        self.assertEqual(self.home()[1], set())
+
+    def test_place_change_rebuilds_only_places(self):
+        self.home()
+        self.write("patch", "/api/places/cascada/", {"name": "Cascada Alta"})
+        data, tables = self.home()
+        self.assertEqual(data["places"][0]["name"], "Cascada Alta")
+        self.assertNotIn("event", tables)
+        self.assertNotIn("galleryitem", tables)
+
+    def test_event_change_rebuilds_only_events(self):
+        self.home()
+        self.write("patch", f"/api/events/{self.event.pk}/", {"title": "Feria del Agua"})
+        data, tables = self.home()
+        self.assertEqual(data["upcoming_events"][0]["title"], "Feria del Agua")
+        self.assertEqual(tables, {"event"})
+
+    def test_post_change_keeps_every_section(self):
+        self.home()
+        self.write("post", "/api/posts/", {"title": "Temporada", "body": "Texto", "is_featured": True})
+        self.assertEqual(self.home()[1], set())
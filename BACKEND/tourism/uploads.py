@@ -0,0 +1,363 @@
+# tourism/uploads.py
+"""
+Subidas de archivos en segundo plano.
+
+Antes cada archivo se subía a Cloudinary dentro de la request (a mano en
+la galería, vía el storage de los ImageField/FileField en el resto), y un
+video de 50 MB dejaba ocupado un worker de gunicorn durante toda la
+subida. Ahora:
+
+1. la request valida el archivo, lo deja en UPLOAD_SPOOL_DIR (si Django ya
+   lo había volcado a un temporal, solo se mueve), crea un UploadJob
+   pendiente y responde 202 con el id del trabajo;
+2. al confirmarse la transacción, un pool de hilos del mismo proceso toma
+   el trabajo, lo sube con el cliente configurado (reintentando con
+   espera exponencial) y llena el campo destino: el nombre del archivo en
+   un FileField o la URL en GalleryItem.media_file_url;
+3. el panel consulta /api/uploads/<id>/ hasta ver "done" o "failed".
+
+Sin broker externo: si el proceso muere con trabajos a medias, el comando
+`process_uploads` los retoma (los archivos siguen en el spool).
+
+El cliente de almacenamiento es intercambiable (UPLOAD_STORAGE_CLIENT):
+cualquier clase con `upload(path, *, folder, original_name)` que devuelva
+un UploadResult. LocalClient copia a MEDIA_ROOT y sirve para desarrollo y
+pruebas sin credenciales de Cloudinary.
+"""
+import functools
+import logging
+import mimetypes
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import cloudinary.uploader
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files import File
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, models, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.status import HTTP_202_ACCEPTED
+
+from . import chunked
+from .caching import bump_version
+from .models import GalleryItem, UploadJob
+from .serializers import UploadJobSerializer
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class UploadResult:
+    name: str  # lo que se guarda en un FileField
+    url: str   # URL pública
+
+
+class CloudinaryClient:
+    def upload(self, path, *, folder, original_name):
+        # Mismo prefijo que MediaCloudinaryStorage ("media/…"): así el
+        # public_id sirve tal cual como nombre de un FileField con ese storage.
+        from cloudinary_storage import app_settings
+
+        prefix = app_settings.PREFIX.strip("/")
+        result = cloudinary.uploader.upload(
+            path,
+            folder=f"{prefix}/{folder}" if prefix else folder,
+            resource_type="auto",
+        )
+        return UploadResult(name=result["public_id"], url=result.get("secure_url", ""))
+
+
+class LocalClient:
+    def __init__(self, location=None, base_url=None):
+        self.storage = FileSystemStorage(
+            location=location or settings.MEDIA_ROOT, base_url=base_url or settings.MEDIA_URL
+        )
+
+    def upload(self, path, *, folder, original_name):
+        with open(path, "rb") as fh:
+            name = self.storage.save(f"{folder}/{os.path.basename(original_name)}", File(fh))
+        return UploadResult(name=name, url=self.storage.url(name))
+
+
+@functools.lru_cache(maxsize=None)
+def _load_client(path):
+    return import_string(path)()
+
+
+def get_client():
+    return _load_client(settings.UPLOAD_STORAGE_CLIENT)
+
+
+# ----------------------------------------------------------------------
+# Encolar
+# ----------------------------------------------------------------------
+
+def _spool(file_obj, job_id):
+    os.makedirs(settings.UPLOAD_SPOOL_DIR, exist_ok=True)
+    extension = os.path.splitext(file_obj.name)[1].lower()
+    path = os.path.join(settings.UPLOAD_SPOOL_DIR, f"{job_id}{extension}")
+    if hasattr(file_obj, "temporary_file_path"):
+        file_move_safe(file_obj.temporary_file_path(), path)
+    else:
+        with open(path, "wb") as out:
+            for chunk in file_obj.chunks():
+                out.write(chunk)
+    return path
+
+
+def _default_folder(instance, field_name):
+    field = instance._meta.get_field(field_name)
+    upload_to = getattr(field, "upload_to", "")
+    if isinstance(upload_to, str) and upload_to.strip("/"):
+        return upload_to.strip("/")
+    return instance._meta.model_name
+
+
+def queue_upload(file_obj, instance, field_name, *, user=None, folder=None):
+    """
+    Deja `file_obj` en el spool y programa su subida al campo `field_name`
+    de `instance` (que ya debe estar guardada). La subida arranca cuando se
+    confirma la transacción actual.
+    """
+    job_id = uuid.uuid4()
+    # El tamaño se lee antes de mover el archivo al spool.
+    size = file_obj.size or 0
+    path = _spool(file_obj, job_id)
+    content_type = (
+        mimetypes.guess_type(file_obj.name)[0] or getattr(file_obj, "content_type", None) or ""
+    )
+    job = UploadJob.objects.create(
+        id=job_id,
+        model=instance._meta.label,
+        object_id=str(instance.pk),
+        field=field_name,
+        folder=folder or _default_folder(instance, field_name),
+        spool_path=path,
+        original_name=os.path.basename(file_obj.name)[:255],
+        content_type=content_type,
+        size=size,
+        created_by=user if getattr(user, "is_authenticated", False) else None,
+    )
+    transaction.on_commit(lambda: submit(job))
+    return job
+
+
+# ----------------------------------------------------------------------
+# Procesar
+# ----------------------------------------------------------------------
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.UPLOAD_WORKERS, thread_name_prefix="upload"
+            )
+        return _executor
+
+
+def submit(job):
+    if settings.UPLOAD_RUN_INLINE:
+        # En el mismo hilo se actualiza el UploadJob que devolvió
+        # queue_upload(), y la respuesta 202 ya lo muestra terminado.
+        run_job(job.pk, job=job)
+    else:
+        _get_executor().submit(_run_in_thread, job.pk)
+
+
+def _run_in_thread(job_id):
+    try:
+        run_job(job_id)
+    except Exception:
+        log.exception("Falló el trabajo de subida %s", job_id)
+    finally:
+        # Cada hilo abre su propia conexión; no dejarla colgada.
+        connection.close()
+
+
+def run_job(job_id, job=None):
+    """
+    Sube el archivo de un trabajo pendiente y llena el campo destino. Con
+    `job` (la instancia de ese trabajo) la actualiza en vez de leer otra.
+    """
+    # Se "reclama" el trabajo con un UPDATE condicional: si otro hilo o el
+    # comando process_uploads ya lo tomó, no se sube dos veces.
+    claimed = UploadJob.objects.filter(pk=job_id, status=UploadJob.STATUS_PENDING).update(
+        status=UploadJob.STATUS_RUNNING, updated_at=timezone.now()
+    )
+    if not claimed:
+        return None
+    if job is None:
+        job = UploadJob.objects.get(pk=job_id)
+    else:
+        job.refresh_from_db()
+    client = get_client()
+
+    delay = 1
+    while True:
+        job.attempts += 1
+        try:
+            result = client.upload(job.spool_path, folder=job.folder, original_name=job.original_name)
+            break
+        except Exception as exc:
+            log.warning("Subida %s, intento %s: %s", job.pk, job.attempts, exc)
+            if job.attempts >= settings.UPLOAD_MAX_ATTEMPTS:
+                # El archivo queda en el spool para reintentar con process_uploads --failed.
+                return _finish(job, UploadJob.STATUS_FAILED, error=str(exc) or repr(exc))
+            time.sleep(delay)
+            delay *= 2
+
+    job.result_name, job.result_url = result.name, result.url
+    if not _apply(job, result):
+        _finish(job, UploadJob.STATUS_FAILED, error="El registro ya no existe.")
+    else:
+        _finish(job, UploadJob.STATUS_DONE)
+    _remove_spool(job)
+    return job
+
+
+def _apply(job, result):
+    model = apps.get_model(job.model)
+    # Si ya terminó una subida más nueva al mismo campo, esta llegó tarde.
+    newer = UploadJob.objects.filter(
+        model=job.model, object_id=job.object_id, field=job.field,
+        status=UploadJob.STATUS_DONE, created_at__gt=job.created_at,
+    ).exists()
+    if newer:
+        return model.objects.filter(pk=job.object_id).exists()
+
+    field = model._meta.get_field(job.field)
+    values = {job.field: result.url if isinstance(field, models.URLField) else result.name}
+    if model is GalleryItem:
+        values["media_type"] = "VIDEO" if job.content_type.startswith("video/") else "IMAGE"
+    if any(f.name == "updated_at" for f in model._meta.concrete_fields):
+        # update() no pasa por auto_now; el GET condicional lo necesita.
+        values["updated_at"] = timezone.now()
+    if not model.objects.filter(pk=job.object_id).update(**values):
+        return False
+    bump_version(model.__name__)
+    return True
+
+
+def _finish(job, status, error=""):
+    job.status = status
+    job.error = error
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def _remove_spool(job):
+    try:
+        os.remove(job.spool_path)
+    except FileNotFoundError:
+        pass
+
+
+def requeue(statuses, older_than=None):
+    """
+    Vuelve a procesar (en el hilo actual) los trabajos en `statuses`. Lo usa
+    el comando process_uploads para retomar lo que quedó a medias.
+    """
+    jobs = UploadJob.objects.filter(status__in=statuses)
+    if older_than is not None:
+        jobs = jobs.filter(updated_at__lt=older_than)
+    job_ids = list(jobs.order_by("created_at").values_list("pk", flat=True))
+    UploadJob.objects.filter(pk__in=job_ids).update(status=UploadJob.STATUS_PENDING, attempts=0)
+    return [run_job(job_id) for job_id in job_ids]
+
+
+# ----------------------------------------------------------------------
+# Vistas
+# ----------------------------------------------------------------------
+
+def _run_field_validators(field, file_obj):
+    try:
+        field.run_validators(file_obj)
+    except DjangoValidationError as exc:
+        raise ValidationError({"upload_id": exc.messages})
+
+
+class DeferredUploadMixin:
+    """
+    Para ViewSets de modelos con un archivo (`upload_field`): el archivo se
+    valida como siempre (extensión, tamaño), pero se saca de validated_data
+    antes de guardar y se encola. Si hubo archivo, la respuesta es 202 y
+    trae `upload_job`.
+    """
+    upload_field = None
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        # Con `upload_id` (subida por partes, tourism/chunked.py) el archivo
+        # no viene en la request, aunque el campo sea obligatorio.
+        if (
+            self.upload_field
+            and self.request.method not in SAFE_METHODS
+            and self.request.data.get("upload_id")
+            and self.upload_field in serializer.fields
+        ):
+            serializer.fields[self.upload_field].required = False
+        return serializer
+
+    def create(self, request, *args, **kwargs):
+        return self._with_upload_job(super().create(request, *args, **kwargs))
+
+    def update(self, request, *args, **kwargs):
+        return self._with_upload_job(super().update(request, *args, **kwargs))
+
+    # Atómicos: una subida por partes (`upload_id`) se reclama en la misma
+    # transacción que guarda el registro (ver chunked.take()).
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            file_obj = self._pop_upload(serializer)
+            super().perform_create(serializer)
+            self._queue(serializer.instance, file_obj)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            file_obj = self._pop_upload(serializer)
+            super().perform_update(serializer)
+            self._queue(serializer.instance, file_obj)
+
+    def _pop_upload(self, serializer):
+        self.upload_job = None
+        if not self.upload_field:
+            return None
+        if serializer.validated_data.get(self.upload_field):
+            return serializer.validated_data.pop(self.upload_field)
+        upload_id = self.request.data.get("upload_id")
+        if upload_id:
+            field = serializer.Meta.model._meta.get_field(self.upload_field)
+            return chunked.take(upload_id, validate=lambda file_obj: _run_field_validators(field, file_obj))
+        return None
+
+    def _queue(self, instance, file_obj):
+        if file_obj is not None:
+            try:
+                self.upload_job = queue_upload(file_obj, instance, self.upload_field, user=self.request.user)
+            finally:
+                file_obj.close()
+
+    def _with_upload_job(self, response):
+        job = getattr(self, "upload_job", None)
+        if job is not None and response.status_code < 300:
+            response.status_code = HTTP_202_ACCEPTED
+            # Sin releer: con UPLOAD_RUN_INLINE run_job() ya actualizó esta
+            # misma instancia; si no, el trabajo sigue en la cola.
+            response.data["upload_job"] = UploadJobSerializer(job).data
+        return response
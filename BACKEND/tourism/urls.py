@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PlaceViewSet, EventViewSet, PostViewSet, PublicReviewViewSet, ModerationReviewViewSet, ContactInfoViewSet, GalleryItemViewSet, MediaViewSet, SiteSettingsView, health_check
+from .views import PlaceViewSet, EventViewSet, PostViewSet, PublicReviewViewSet, ModerationReviewViewSet, ContactInfoViewSet, GalleryItemViewSet, MediaViewSet, ChunkedUploadViewSet, ActivityLogViewSet, SiteSettingsView, HomeView, SnapshotManifestView, StatsView, UploadJobView, ImportView, health_check
 
 router = DefaultRouter()
 router.register(r'places', PlaceViewSet, basename='place')
@@ -11,9 +11,16 @@ router.register(r'moderation/reviews', ModerationReviewViewSet, basename='review
 router.register(r'contact', ContactInfoViewSet, basename='contact')
 router.register(r'gallery', GalleryItemViewSet, basename='gallery')
 router.register(r'media', MediaViewSet, basename='media')                        # /api/media/?place=<slug>
+router.register(r'chunked-uploads', ChunkedUploadViewSet, basename='chunked-upload')
+router.register(r'activity', ActivityLogViewSet, basename='activity')                # /api/activity/ (solo admin)
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('home/', HomeView.as_view(), name='home'),
+    path('snapshots/', SnapshotManifestView.as_view(), name='snapshot-manifest'),
+    path('stats/', StatsView.as_view(), name='stats'),
+    path('uploads/<uuid:pk>/', UploadJobView.as_view(), name='upload-job'),
+    path('import/<str:kind>/', ImportView.as_view(), name='import'),
     path('site-settings/', SiteSettingsView.as_view(), name='site-settings'),
     path('health/', health_check, name='health_check'),
 ]
@@ -1,19 +1,43 @@
 from rest_framework import viewsets, mixins, permissions, generics
 from rest_framework.response import Response
-from django.db.models import Q, Avg, Count
-from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from .models import Place, Event, Post, Review, ContactInfo, GalleryItem, Media, SiteSettings, ActivityLog
+import csv
+import json
+import math
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
+from django.db.models.functions import TruncDate
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.parsers import MultiPartParser, FormParser
+from .models import Place, Event, Post, Review, ContactInfo, GalleryItem, Media, SiteSettings, ActivityLog, ActivityArchive, UploadJob, ChunkedUpload
 from .serializers import (
-    PlaceSerializer, EventSerializer, PostSerializer,
+    PlaceSerializer, PlaceListSerializer, NearbyPlaceSerializer, EventSerializer, PostSerializer, PostListSerializer,
+    place_cards, post_cards,
     ReviewSerializer, ContactInfoSerializer,
-    ModerationReviewSerializer, GalleryItemSerializer, MediaSerializer,
-    SiteSettingsSerializer, ActivityLogSerializer,
+    ModerationReviewSerializer, ReviewBulkActionSerializer, GalleryItemSerializer, MediaSerializer,
+    SiteSettingsSerializer, ActivityLogSerializer, ActivityArchiveSerializer,
+    UploadJobSerializer, ChunkedUploadSerializer,
 )
 from .permissions import IsEditorOrAdmin, IsAdmin
+from .caching import CachedResponseMixin, bump_version, cached_fragment, response_cache_stats
+from .conditional import ConditionalGetMixin
+from .fastjson import FastJSONParser
+from .sparse import SparseFieldsViewMixin
+from .site_settings import site_settings_snapshot
+from .snapshots import read_manifest, schedule_publish
+from .search import search_places
+from .uploads import DeferredUploadMixin, queue_upload
+from . import chunked, geo, importer, ratings, retention
 import os
-import cloudinary
-import cloudinary.uploader
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
@@ -22,59 +46,159 @@ class ActivityLoggingMixin:
     """
     Registra en la bitácora quién crea/edita/borra contenido. Se engancha en
     perform_create/update/destroy (no en señales) para tener siempre el
-    usuario correcto de la request actual.
+    usuario correcto de la request actual. De paso invalida el caché de
+    respuestas públicas del modelo tocado (ver tourism/caching.py), lo que
+    también vuelve a publicar sus snapshots estáticos (tourism/snapshots.py).
     """
 
     def perform_create(self, serializer):
         instance = serializer.save()
         ActivityLog.log(actor=self.request.user, action=ActivityLog.ACTION_CREATE, instance=instance)
+        bump_version(type(instance).__name__)
 
     def perform_update(self, serializer):
         instance = serializer.save()
         ActivityLog.log(actor=self.request.user, action=ActivityLog.ACTION_UPDATE, instance=instance)
+        bump_version(type(instance).__name__)
 
     def perform_destroy(self, instance):
         ActivityLog.log(actor=self.request.user, action=ActivityLog.ACTION_DELETE, instance=instance)
+        bump_version(type(instance).__name__)
         instance.delete()
 
 
-class PlaceViewSet(ActivityLoggingMixin, viewsets.ModelViewSet):
+# Las fotos de un lugar sin las que todavía esperan su subida (image vacío).
+PLACE_MEDIA = Prefetch("media", queryset=Media.objects.exclude(image=""))
+
+
+def _parse_floats(raw, name, count=1):
+    try:
+        values = [float(v) for v in raw.split(",")]
+    except ValueError:
+        values = []
+    # float() acepta "nan" e "inf", que después rompen math.floor()/int().
+    if len(values) != count or not all(math.isfinite(v) for v in values):
+        raise ValidationError({name: f"Se esperaban {count} número(s) separados por coma."})
+    return values
+
+
+def _parse_int(raw, name):
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        raise ValidationError({name: "Se esperaba un número entero."})
+
+
+def _parse_bbox(raw):
+    """?bbox=oeste,sur,este,norte (orden GeoJSON: lng/lat) -> (sur, oeste, norte, este)."""
+    west, south, east, north = _parse_floats(raw, 'bbox', count=4)
+    if not (-90 <= south <= north <= 90 and -180 <= west <= east <= 180):
+        # west > east sería un rectángulo que cruza el antimeridiano: no se admite.
+        raise ValidationError({"bbox": "Rectángulo fuera de rango (oeste ≤ este, sur ≤ norte)."})
+    return south, west, north, east
+
+
+class PlaceViewSet(ConditionalGetMixin, CachedResponseMixin, SparseFieldsViewMixin, ActivityLoggingMixin, viewsets.ModelViewSet):
     serializer_class = PlaceSerializer
+    NEARBY_MAX_RADIUS_KM = 500
+    NEARBY_MAX_LIMIT = 100
+    # avg_rating/reviews_count dependen de las reseñas y `media` de las fotos
+    cache_models = ("Place", "Media", "Review")
+    pagination_ordering = ("-created_at", "-id")
     lookup_field = "slug"
+    # Fotos y rating solo si la respuesta los incluye (?fields=, tourism/sparse.py)
+    sparse_related = {
+        "media": ("prefetch", PLACE_MEDIA),
+        "avg_rating": ("select", "rating_stats"),
+        "reviews_count": ("select", "rating_stats"),
+    }
 
     def get_permissions(self):
         if self.request.method in permissions.SAFE_METHODS:
             return [permissions.AllowAny()]
         return [IsEditorOrAdmin()]
 
+    def get_serializer_class(self):
+        # El listado manda tarjetas (portada, rating, resumen); la
+        # descripción completa y todas las fotos, solo el detalle.
+        if self.action == "list":
+            return PlaceListSerializer
+        return PlaceSerializer
+
     def get_queryset(self):
         """
         Mejora: El queryset ahora es dinámico. Acepta filtros por `category`
-        y `q` (búsqueda) desde la URL, permitiendo que el frontend pida solo
+        y `q` o `search` (búsqueda) desde la URL, permitiendo que el frontend pida solo
         los datos que necesita. Esto es clave para la optimización.
         Ej: /api/places/?category=cascada
         Ej: /api/places/?q=chorro
         """
-        # Anotamos el queryset con el promedio de rating y el conteo de reviews.
-        qs = Place.objects.annotate(
-            avg_rating=Avg('reviews__rating'),
-            reviews_count=Count('reviews')
-        ).order_by("-created_at")
+        # El promedio y el conteo de reseñas vienen de PlaceRatingStats
+        # (mantenido al día por tourism/ratings.py): un JOIN 1 a 1 en vez de
+        # un GROUP BY sobre toda la tabla Review en cada request. El JOIN y
+        # el prefetch de fotos los agrega narrow_queryset() (sparse_related).
+        qs = Place.objects.order_by("-created_at")
 
         if self.request.method in permissions.SAFE_METHODS:
             qs = qs.filter(is_active=True)
 
         category = self.request.query_params.get('category')
-        search_query = self.request.query_params.get('q')
+        search_query = self.search_query()
 
         if category: qs = qs.filter(category=category)
-        if search_query: qs = qs.filter(Q(name__icontains=search_query) | Q(description__icontains=search_query))
 
+        # ?bbox=oeste,sur,este,norte (orden GeoJSON: lng/lat), para el mapa
+        bbox = self.request.query_params.get('bbox')
+        if bbox:
+            qs = geo.in_bbox(qs, *_parse_bbox(bbox))
+
+        # Índice de texto completo, ordenado por relevancia (tourism/search.py).
+        # Va al final: rankea solo entre los lugares que pasaron los filtros.
+        if search_query: qs = search_places(qs, search_query)
+
+        if self.action == "list":
+            qs = place_cards(qs)
         return qs
 
-class EventViewSet(ActivityLoggingMixin, viewsets.ModelViewSet):
+    @action(detail=False, methods=["get"])
+    def nearby(self, request):
+        """
+        /api/places/nearby/?lat=&lng=&radius=&limit=  (radio en km)
+        Lugares activos ordenados por distancia; cada uno con `distance_km`.
+        """
+        return self.cached_response(self._nearby, request)
+
+    def _nearby(self, request):
+        params = request.query_params
+        lat, lng = _parse_floats(f"{params.get('lat', '')},{params.get('lng', '')}", 'lat/lng', count=2)
+        radius = min(_parse_floats(params.get('radius', '10'), 'radius')[0], self.NEARBY_MAX_RADIUS_KM)
+        limit = min(_parse_int(params.get('limit', '20'), 'limit'), self.NEARBY_MAX_LIMIT)
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180) or radius <= 0 or limit <= 0:
+            raise ValidationError({"detail": "Parámetros fuera de rango."})
+
+        places = geo.nearby(
+            self.get_queryset().select_related("rating_stats").prefetch_related(PLACE_MEDIA), lat, lng, radius, limit
+        )
+        return Response(NearbyPlaceSerializer(places, many=True, context=self.get_serializer_context()).data)
+
+    def search_query(self):
+        # Places.jsx manda ?search=; se aceptan ambos nombres.
+        params = self.request.query_params
+        return (params.get('q') or params.get('search') or '').strip()
+
+    def paginate_queryset(self, queryset):
+        # Una búsqueda ya viene acotada (search.MAX_RESULTS) y ordenada por
+        # relevancia, que no es un campo sobre el que se pueda paginar por cursor.
+        if self.search_query():
+            return None
+        return super().paginate_queryset(queryset)
+
+class EventViewSet(ConditionalGetMixin, CachedResponseMixin, SparseFieldsViewMixin, DeferredUploadMixin, ActivityLoggingMixin, viewsets.ModelViewSet):
     serializer_class = EventSerializer
-    parser_classes = [MultiPartParser, FormParser, JSONParser]
+    upload_field = "image"
+    cache_models = ("Event",)
+    pagination_ordering = ("-start_date", "-id")
+    parser_classes = [MultiPartParser, FormParser, FastJSONParser]
 
     def get_permissions(self):
         if self.request.method in permissions.SAFE_METHODS:
@@ -92,19 +216,30 @@ class EventViewSet(ActivityLoggingMixin, viewsets.ModelViewSet):
         ctx["request"] = self.request
         return ctx
 
-class PostViewSet(ActivityLoggingMixin, viewsets.ModelViewSet):
+class PostViewSet(ConditionalGetMixin, CachedResponseMixin, SparseFieldsViewMixin, DeferredUploadMixin, ActivityLoggingMixin, viewsets.ModelViewSet):
     serializer_class = PostSerializer
-    parser_classes = [MultiPartParser, FormParser, JSONParser]
+    upload_field = "cover"
+    cache_models = ("Post",)
+    pagination_ordering = ("-created_at", "-id")
+    parser_classes = [MultiPartParser, FormParser, FastJSONParser]
 
     def get_permissions(self):
         if self.request.method in permissions.SAFE_METHODS:
             return [permissions.AllowAny()]
         return [IsEditorOrAdmin()]
 
+    def get_serializer_class(self):
+        # Sin `body` en el listado (ver PostListSerializer).
+        if self.action == "list":
+            return PostListSerializer
+        return PostSerializer
+
     def get_queryset(self):
         qs = Post.objects.all().order_by("-created_at")
         if self.request.method in permissions.SAFE_METHODS:
             qs = qs.filter(is_published=True)
+        if self.action == "list":
+            qs = post_cards(qs)
         return qs
     
     def get_serializer_context(self):
@@ -112,12 +247,16 @@ class PostViewSet(ActivityLoggingMixin, viewsets.ModelViewSet):
         ctx["request"] = self.request
         return ctx
 
-class PublicReviewViewSet(mixins.CreateModelMixin,
+class PublicReviewViewSet(SparseFieldsViewMixin,
+                          DeferredUploadMixin,
+                          mixins.CreateModelMixin,
                           mixins.ListModelMixin,
                           viewsets.GenericViewSet):
     serializer_class = ReviewSerializer
+    upload_field = "attachment"
+    pagination_ordering = ("-created_at", "-id")
     permission_classes = [permissions.AllowAny]
-    parser_classes = [MultiPartParser, FormParser, JSONParser]
+    parser_classes = [MultiPartParser, FormParser, FastJSONParser]
 
     def get_queryset(self):
         qs = Review.objects.filter(is_approved=True).order_by("-created_at")
@@ -126,10 +265,17 @@ class PublicReviewViewSet(mixins.CreateModelMixin,
             qs = qs.filter(place_id=place_id)
         return qs
 
-class ModerationReviewViewSet(ActivityLoggingMixin, viewsets.ModelViewSet):
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        # Las reseñas nuevas entran aprobadas y cambian el rating del lugar.
+        bump_version("Review")
+
+class ModerationReviewViewSet(SparseFieldsViewMixin, DeferredUploadMixin, ActivityLoggingMixin, viewsets.ModelViewSet):
     serializer_class = ModerationReviewSerializer
+    upload_field = "attachment"
+    pagination_ordering = ("-created_at", "-id")
     permission_classes = [IsEditorOrAdmin]
-    parser_classes = [MultiPartParser, FormParser, JSONParser]
+    parser_classes = [MultiPartParser, FormParser, FastJSONParser]
 
     # ▼▼▼ MÉTODO CORREGIDO ▼▼▼
     def get_queryset(self):
@@ -150,8 +296,65 @@ class ModerationReviewViewSet(ActivityLoggingMixin, viewsets.ModelViewSet):
         # Por defecto, la lista solo muestra las pendientes
         return Review.objects.filter(is_approved=False).order_by("-created_at")
 
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        POST /api/moderation/reviews/bulk/ {"ids": [1, 2, 3], "action": "approve"|"unapprove"|"delete"}
+
+        Antes el panel aprobaba o borraba de a una reseña (un PATCH/DELETE y
+        una entrada de bitácora por request). Ahora es un solo UPDATE o
+        DELETE en una transacción, una tanda de entradas de bitácora y un
+        único recálculo de PlaceRatingStats para los lugares afectados.
+        Responde el resultado de cada id: approved / unapproved / deleted,
+        unchanged (ya estaba así) o not_found.
+        """
+        serializer = ReviewBulkActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data["ids"]))
+        bulk_action = serializer.validated_data["action"]
+
+        with transaction.atomic(), ratings.deferred() as places:
+            reviews = list(
+                Review.objects.select_for_update(of=("self",))
+                .select_related("place").only("id", "is_approved", "place__name")
+                .filter(pk__in=ids)
+            )
+            if bulk_action == "delete":
+                changed, outcome = reviews, "deleted"
+                log_action = ActivityLog.ACTION_DELETE
+            else:
+                approve = bulk_action == "approve"
+                changed = [review for review in reviews if review.is_approved != approve]
+                outcome = "approved" if approve else "unapproved"
+                log_action = ActivityLog.ACTION_UPDATE
+
+            if changed:
+                ActivityLog.log_many(actor=request.user, action=log_action, instances=changed)
+                changed_ids = [review.pk for review in changed]
+                if bulk_action == "delete":
+                    Review.objects.filter(pk__in=changed_ids).delete()
+                else:
+                    Review.objects.filter(pk__in=changed_ids).update(is_approved=approve)
+                # update() no dispara señales; delete() sí, pero deferred()
+                # junta los lugares y los recalcula una vez al salir.
+                places.update(review.place_id for review in changed)
+                bump_version("Review")
+
+        found = {review.pk for review in reviews}
+        changed_ids = {review.pk for review in changed}
+        results = [
+            {
+                "id": pk,
+                "status": outcome if pk in changed_ids else "unchanged" if pk in found else "not_found",
+            }
+            for pk in ids
+        ]
+        return Response({"action": bulk_action, "changed": len(changed_ids), "results": results})
+
+
+class ContactInfoViewSet(CachedResponseMixin, SparseFieldsViewMixin, ActivityLoggingMixin, viewsets.ModelViewSet):
+    cache_models = ("ContactInfo",)
 
-class ContactInfoViewSet(ActivityLoggingMixin, viewsets.ModelViewSet):
     # Los turistas solo ven los contactos activos
     def get_queryset(self):
         if self.request.user.is_staff:
@@ -175,10 +378,18 @@ import logging
 
 log = logging.getLogger(__name__)
 
-class GalleryItemViewSet(ActivityLoggingMixin, viewsets.ModelViewSet):
+class GalleryItemViewSet(ConditionalGetMixin, CachedResponseMixin, SparseFieldsViewMixin, ActivityLoggingMixin, viewsets.ModelViewSet):
     serializer_class = GalleryItemSerializer
+    cache_models = ("GalleryItem",)
+    pagination_ordering = ("order", "-id")
     queryset = GalleryItem.objects.all().order_by("order", "-id")
-    parser_classes = [MultiPartParser, FormParser, JSONParser]
+    parser_classes = [MultiPartParser, FormParser, FastJSONParser]
+
+    def get_queryset(self):
+        # El panel ve los items con la subida en curso; los visitantes no.
+        if self.request.method in permissions.SAFE_METHODS and not self.request.user.is_authenticated:
+            return GalleryItem.with_file().order_by("order", "-id")
+        return super().get_queryset()
 
     # Antes exigía IsAdmin exclusivamente: un editor no podía subir fotos ni
     # videos a la galería principal, aunque sí podía editar lugares/eventos/
@@ -199,75 +410,75 @@ class GalleryItemViewSet(ActivityLoggingMixin, viewsets.ModelViewSet):
             return "Solo se permiten imágenes o videos."
         return None
 
+    def _chunked_file(self, request):
+        """Archivo de una subida por partes (`upload_id`, ver tourism/chunked.py)."""
+        def validate(file_obj):
+            error = self._validate_file(file_obj)
+            if error:
+                raise ValidationError({"upload_id": error})
+        return chunked.take(request.data["upload_id"], validate=validate)
+
+    # Atómicos por la subida por partes: ver chunked.take().
+    @transaction.atomic
     def create(self, request, *args, **kwargs):
         file_obj = request.FILES.get("media_file")
-        if not file_obj:
+        if file_obj:
+            error = self._validate_file(file_obj)
+            if error:
+                return Response({"detail": error}, status=400)
+        elif request.data.get("upload_id"):
+            file_obj = self._chunked_file(request)
+        else:
             return Response({"detail": "No se envió ningún archivo."}, status=400)
 
-        error = self._validate_file(file_obj)
-        if error:
-            return Response({"detail": error}, status=400)
-
         # datos base
         title = (request.data.get("title") or "").strip()
-        order = int(request.data.get("order") or 0)
+        # Sin `order`, el item va al final (GalleryItem.next_order()).
+        order = int(request.data["order"]) if request.data.get("order") not in (None, "") else None
         is_active = str(request.data.get("is_active")).lower() in ("true", "1", "yes")
 
         # detectar mime
         mime, _ = mimetypes.guess_type(file_obj.name)
         is_video = bool(mime and mime.startswith("video/"))
 
-        try:
-            # ⬇️ Subida directa a Cloudinary; acepta imagen o video
-            up = cloudinary.uploader.upload(
-                file_obj,
-                folder="gallery",
-                resource_type="auto",
-            )
-
-            item = GalleryItem.objects.create(
-                title=title,
-                media_type="VIDEO" if is_video else "IMAGE",
-                media_file_url=up.get("secure_url", ""),
-                # para imágenes puedes seguir usando FileField si quieres,
-                # pero con este flujo ya no es necesario.
-                is_active=is_active,
-                order=order,
-            )
-            ActivityLog.log(actor=request.user, action=ActivityLog.ACTION_CREATE, instance=item)
-            return Response(GalleryItemSerializer(item, context={"request": request}).data, status=201)
-
-        except Exception as e:
-            return Response({"detail": str(e)}, status=400)
-
+        # La subida a Cloudinary ya no bloquea la request: el item se crea
+        # sin URL (el home lo omite hasta que la tenga) y tourism/uploads.py
+        # la llena en segundo plano.
+        item = GalleryItem.objects.create(
+            title=title,
+            media_type="VIDEO" if is_video else "IMAGE",
+            is_active=is_active,
+            order=order,
+        )
+        job = queue_upload(file_obj, item, "media_file_url", user=request.user, folder="gallery")
+        file_obj.close()
+        ActivityLog.log(actor=request.user, action=ActivityLog.ACTION_CREATE, instance=item)
+        bump_version("GalleryItem")
+        return self._accepted(item, job)
+
+    @transaction.atomic
     def update(self, request, *args, **kwargs):
         """
-        El create() de arriba sube el archivo a mano y llena media_type/
-        media_file_url; el update() por defecto de DRF no sabía hacer eso,
+        El create() de arriba encola la subida del archivo, que después llena
+        media_type/media_file_url; el update() por defecto de DRF no sabía hacer eso,
         así que reemplazar el archivo de un item existente dejaba
         media_type/media_file_url desactualizados. Si viene un archivo nuevo,
         se reprocesa igual que en create(); si no, se delega al flujo normal
         (así siguen funcionando los PATCH simples de is_active/order).
         """
         file_obj = request.FILES.get("media_file")
-        if not file_obj:
+        if not file_obj and not request.data.get("upload_id"):
             return super().update(request, *args, **kwargs)
 
-        error = self._validate_file(file_obj)
-        if error:
-            return Response({"detail": error}, status=400)
-
         instance = self.get_object()
-        mime, _ = mimetypes.guess_type(file_obj.name)
-        is_video = bool(mime and mime.startswith("video/"))
-
-        try:
-            up = cloudinary.uploader.upload(file_obj, folder="gallery", resource_type="auto")
-        except Exception as e:
-            return Response({"detail": str(e)}, status=400)
-
-        instance.media_type = "VIDEO" if is_video else "IMAGE"
-        instance.media_file_url = up.get("secure_url", "")
+        if file_obj:
+            error = self._validate_file(file_obj)
+            if error:
+                return Response({"detail": error}, status=400)
+        else:
+            file_obj = self._chunked_file(request)
+        # media_type y media_file_url se actualizan juntos cuando termina la
+        # subida; mientras tanto el item sigue mostrando el archivo anterior.
         if "title" in request.data:
             instance.title = (request.data.get("title") or "").strip()
         if "order" in request.data:
@@ -275,24 +486,154 @@ class GalleryItemViewSet(ActivityLoggingMixin, viewsets.ModelViewSet):
         if "is_active" in request.data:
             instance.is_active = str(request.data.get("is_active")).lower() in ("true", "1", "yes")
         instance.save()
+        job = queue_upload(file_obj, instance, "media_file_url", user=request.user, folder="gallery")
+        file_obj.close()
         ActivityLog.log(actor=request.user, action=ActivityLog.ACTION_UPDATE, instance=instance)
-        return Response(GalleryItemSerializer(instance, context={"request": request}).data)
-class MediaViewSet(ActivityLoggingMixin, viewsets.ModelViewSet):
+        bump_version("GalleryItem")
+        return self._accepted(instance, job)
+
+    def _accepted(self, item, job):
+        data = GalleryItemSerializer(item, context={"request": self.request}).data
+        data["upload_job"] = UploadJobSerializer(job).data
+        return Response(data, status=202)
+
+    @action(detail=True, methods=["post"])
+    def move(self, request, pk=None):
+        """
+        POST /api/gallery/<id>/move/ {"before": <id>} o {"after": <id>}
+
+        Reordenar escribe solo la fila movida (ver GalleryItem.move()); antes
+        el panel mandaba un PATCH con el nuevo `order` de cada item.
+        """
+        item = self.get_object()
+        position = {key: request.data.get(key) for key in ("before", "after") if request.data.get(key) not in (None, "")}
+        if len(position) != 1:
+            raise ValidationError({"detail": "Indica `before` o `after` (el id de otro item)."})
+        (key, neighbor_id), = position.items()
+        try:
+            neighbor = GalleryItem.objects.get(pk=int(neighbor_id))
+        except (ValueError, TypeError, GalleryItem.DoesNotExist):
+            raise ValidationError({key: "No existe ese item."})
+        if neighbor.pk == item.pk:
+            raise ValidationError({key: "Un item no puede moverse respecto de sí mismo."})
+
+        # move() bloquea la galería y relee el `order` del vecino.
+        rebalanced = item.move(**{key: neighbor})
+        ActivityLog.log(actor=request.user, action=ActivityLog.ACTION_UPDATE, instance=item)
+        bump_version("GalleryItem")
+        return Response({"id": item.pk, "order": item.order, "rebalanced": rebalanced})
+
+
+class UploadJobView(generics.RetrieveAPIView):
+    """
+    Estado de una subida en segundo plano (ver tourism/uploads.py). El panel
+    la consulta cada pocos segundos después de un 202. El id es un UUID que
+    solo conoce quien hizo la subida, así que no exige login (las reseñas
+    con foto las mandan visitantes anónimos).
+    """
+    queryset = UploadJob.objects.all()
+    serializer_class = UploadJobSerializer
+    permission_classes = [AllowAny]
+
+
+class ImportView(generics.GenericAPIView):
+    """
+    POST /api/import/<places|contacts|events>/  (multipart, campo `file`)
+    Importación masiva desde CSV / JSON / JSON Lines (ver tourism/importer.py).
+    Con ?dry_run=1 solo valida y cuenta. Responde el resumen y los errores
+    por fila; 400 si ninguna fila pudo importarse.
+    """
+    permission_classes = [IsEditorOrAdmin]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request, kind):
+        if kind not in importer.IMPORTERS:
+            raise NotFound("Se puede importar places, contacts o events.")
+        file_obj = request.FILES.get("file")
+        if file_obj is None:
+            raise ValidationError({"file": "No se envió ningún archivo."})
+        if file_obj.size > settings.IMPORT_MAX_SIZE:
+            raise ValidationError({
+                "file": f"El archivo supera el máximo permitido ({settings.IMPORT_MAX_SIZE // (1024 * 1024)}MB)."
+            })
+        dry_run = request.query_params.get("dry_run", "").lower() in ("1", "true", "yes")
+        try:
+            result = importer.run_import(
+                kind, importer.read_rows(file_obj, file_obj.name),
+                user=request.user, dry_run=dry_run, source=file_obj.name,
+            )
+        except importer.ImportFormatError as exc:
+            raise ValidationError({"file": str(exc)})
+        failed = result.error_count and not (result.created or result.updated)
+        return Response(result.as_dict(), status=400 if failed else 200)
+
+
+class ChunkedUploadViewSet(mixins.CreateModelMixin,
+                           mixins.RetrieveModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    Subidas reanudables por partes (protocolo en tourism/chunked.py):
+
+    POST /api/chunked-uploads/                 {filename, total_size}
+    GET  /api/chunked-uploads/<id>/            estado y offset para reanudar
+    PUT  /api/chunked-uploads/<id>/?offset=N   bytes crudos de una parte
+    POST /api/chunked-uploads/<id>/complete/   {sha256}
+
+    Abierto a anónimos como PublicReviewViewSet (las reseñas con video las
+    suben visitantes); el id es un UUID que solo conoce quien subió.
+    """
+    queryset = ChunkedUpload.objects.all()
+    serializer_class = ChunkedUploadSerializer
+    permission_classes = [AllowAny]
+    parser_classes = [FastJSONParser, FormParser]
+
+    def perform_create(self, serializer):
+        serializer.instance = chunked.start(
+            serializer.validated_data["filename"],
+            serializer.validated_data["total_size"],
+            user=self.request.user,
+        )
+
+    def update(self, request, *args, **kwargs):
+        upload = self.get_object()
+        try:
+            offset = int(request.query_params.get("offset", ""))
+            length = int(request.META.get("CONTENT_LENGTH") or "")
+        except ValueError:
+            raise ValidationError({"detail": "Se requieren ?offset= y el header Content-Length."})
+        # El cuerpo se lee directo de la request de Django, sin pasar por
+        # los parsers de DRF: nunca se carga la parte entera en memoria.
+        upload = chunked.append(upload, offset, request._request, length)
+        return Response(self.get_serializer(upload).data)
+
+    @action(detail=True, methods=["post"])
+    def complete(self, request, pk=None):
+        upload = chunked.complete(self.get_object(), request.data.get("sha256"))
+        return Response(self.get_serializer(upload).data)
+class MediaViewSet(SparseFieldsViewMixin, DeferredUploadMixin, ActivityLoggingMixin, viewsets.ModelViewSet):
     """
     Fotos de un lugar (`Place`). Antes solo existía `MediaCreateView`, nunca
     registrada en urls.py y sin endpoint de borrado, así que era imposible
     subir o quitar fotos de un lugar salvo por Django Admin.
     """
     serializer_class = MediaSerializer
-    parser_classes = [MultiPartParser, FormParser, JSONParser]
+    upload_field = "image"
+    pagination_ordering = ("-id",)
+    parser_classes = [MultiPartParser, FormParser, FastJSONParser]
 
     def get_permissions(self):
         if self.request.method in permissions.SAFE_METHODS:
             return [permissions.AllowAny()]
         return [IsEditorOrAdmin()]
 
+    # `place` en la bitácora usa el nombre del lugar (Media.__str__)
+    sparse_related = {"place": ("select", "place")}
+
     def get_queryset(self):
-        qs = Media.objects.select_related("place").order_by("-id")
+        qs = Media.objects.order_by("-id")
+        # Sin la foto todavía (subida en cola), solo la ve el panel.
+        if self.request.method in permissions.SAFE_METHODS and not self.request.user.is_authenticated:
+            qs = qs.exclude(image="")
         place_slug = self.request.query_params.get("place")
         if place_slug:
             qs = qs.filter(place__slug=place_slug)
@@ -303,15 +644,20 @@ class MediaViewSet(ActivityLoggingMixin, viewsets.ModelViewSet):
         ctx["request"] = self.request
         return ctx
 
-class SiteSettingsView(ActivityLoggingMixin, generics.RetrieveUpdateAPIView):
+class SiteSettingsView(ConditionalGetMixin, ActivityLoggingMixin, generics.RetrieveUpdateAPIView):
     """
     Horarios, tarifas, reglas del parque, actividades, etc. Antes este
     contenido vivía como texto fijo duplicado en Home/Información/Cómo
     Llegar (y ya desincronizado entre sí); ahora es un único registro
     editable desde el panel de admin. Lectura pública, escritura solo
     editor/admin.
+
+    La lectura sale de la copia en memoria del worker
+    (tourism/site_settings.py): sin consultas ni serializer salvo justo
+    después de un cambio.
     """
     serializer_class = SiteSettingsSerializer
+    cache_models = ("SiteSettings",)
 
     def get_permissions(self):
         if self.request.method in permissions.SAFE_METHODS:
@@ -321,6 +667,319 @@ class SiteSettingsView(ActivityLoggingMixin, generics.RetrieveUpdateAPIView):
     def get_object(self):
         return SiteSettings.load()
 
+    def retrieve(self, request, *args, **kwargs):
+        snapshot = site_settings_snapshot()
+        return self.conditional_response(
+            lambda *a, **kw: Response(snapshot.data), request, *args, **kwargs
+        )
+
+
+class HomeView(generics.GenericAPIView):
+    """
+    Todo lo que pinta la portada en un solo round trip. Antes Home.jsx
+    pedía reviews/, gallery/, places/ y events/ completos en paralelo y los
+    filtraba en el navegador; en hosts gratuitos cada round trip en frío
+    cuesta caro. Cada sección tiene su propia consulta acotada y su propio
+    fragmento cacheado (ver tourism/caching.py), así editar un evento no
+    invalida la galería. Solo trae lo que Home.jsx muestra.
+    """
+    permission_classes = [AllowAny]
+
+    EVENTS_LIMIT = 3
+    REVIEWS_LIMIT = 6
+    GALLERY_LIMIT = 12
+    PLACES_LIMIT = 3
+
+    # Los próximos eventos dependen de la hora actual, no solo de las
+    # escrituras: se recalculan al menos cada minuto.
+    EVENTS_TIMEOUT = 60
+
+    def get(self, request, *args, **kwargs):
+        ctx = self.get_serializer_context()
+        return Response({
+            "upcoming_events": cached_fragment(
+                "home:upcoming_events", ("Event",),
+                lambda: EventSerializer(
+                    self._upcoming_events()[:self.EVENTS_LIMIT], many=True, context=ctx
+                ).data,
+                timeout=self.EVENTS_TIMEOUT,
+            ),
+            "reviews": cached_fragment(
+                "home:reviews", ("Review",),
+                lambda: ReviewSerializer(
+                    Review.objects.filter(is_approved=True).order_by("-created_at")[:self.REVIEWS_LIMIT],
+                    many=True, context=ctx,
+                ).data,
+            ),
+            "gallery": cached_fragment(
+                "home:gallery", ("GalleryItem",),
+                lambda: GalleryItemSerializer(
+                    GalleryItem.with_file().filter(is_active=True).order_by("order", "-id")[:self.GALLERY_LIMIT],
+                    many=True, context=ctx,
+                ).data,
+            ),
+            "places": cached_fragment(
+                "home:places", ("Place", "Media", "Review"),
+                lambda: PlaceListSerializer(
+                    place_cards(Place.objects.filter(is_active=True))
+                    .select_related("rating_stats")
+                    .order_by("-created_at")[:self.PLACES_LIMIT],
+                    many=True, context=ctx,
+                ).data,
+            ),
+        })
+
+    def _upcoming_events(self):
+        return Event.objects.filter(is_active=True, start_date__gte=timezone.now()).order_by("start_date")
+
+
+class SnapshotManifestView(generics.GenericAPIView):
+    """
+    Versión vigente de los snapshots estáticos del contenido público (ver
+    tourism/snapshots.py): el cliente lee esto y baja cada sección del
+    archivo inmutable que indica, sin pasar por Django. Responde 304 con
+    If-None-Match y 404 si todavía no se publicó nada (en ese caso manda a
+    publicar; mientras tanto el cliente usa la API normal).
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, *args, **kwargs):
+        manifest = read_manifest() if settings.SNAPSHOTS_ENABLED else None
+        if manifest is None:
+            schedule_publish()
+            raise NotFound("Todavía no hay snapshots publicados.")
+        etag = quote_etag(manifest["version"])
+        response = get_conditional_response(request._request, etag=etag) or Response(manifest)
+        response["ETag"] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
+
+class StatsView(generics.GenericAPIView):
+    """
+    Contadores del panel de control en una sola respuesta. Antes
+    AdminDashboard.jsx descargaba cada listado completo (serializando todos
+    los lugares, reseñas, eventos, posts y usuarios) solo para mostrar
+    `data.length`. Aquí cada modelo se resuelve con una sola consulta
+    (aggregate() con COUNT filtrados; las reseñas, agrupadas por día) y el
+    resultado se cachea unos segundos. Solo para administradores.
+    """
+    permission_classes = [IsAdmin]
+
+    CACHE_TIMEOUT = 60
+    REVIEWS_DAYS = 30
+
+    def get(self, request, *args, **kwargs):
+        data = cache.get("stats")
+        if data is None:
+            data = self._build()
+            cache.set("stats", data, timeout=self.CACHE_TIMEOUT)
+        return Response(data)
+
+    def _build(self):
+        now = timezone.now()
+        active = Q(is_active=True)
+        data = {
+            "places": Place.objects.aggregate(
+                total=Count("pk"), active=Count("pk", filter=active), inactive=Count("pk", filter=~active),
+            ),
+            "events": Event.objects.aggregate(
+                total=Count("pk"), active=Count("pk", filter=active), inactive=Count("pk", filter=~active),
+                upcoming=Count("pk", filter=active & Q(start_date__gte=now)),
+            ),
+            "posts": Post.objects.aggregate(
+                total=Count("pk"),
+                published=Count("pk", filter=Q(is_published=True)),
+                unpublished=Count("pk", filter=Q(is_published=False)),
+                featured=Count("pk", filter=Q(is_featured=True)),
+            ),
+            "gallery": GalleryItem.objects.aggregate(
+                total=Count("pk"), active=Count("pk", filter=active), inactive=Count("pk", filter=~active),
+            ),
+            "contacts": ContactInfo.objects.aggregate(
+                total=Count("pk"), active=Count("pk", filter=active), inactive=Count("pk", filter=~active),
+            ),
+            "activity": ActivityLog.objects.filter(created_at__gte=now - timedelta(days=7)).aggregate(
+                last_24h=Count("pk", filter=Q(created_at__gte=now - timedelta(days=1))),
+                last_7d=Count("pk"),
+                creates_7d=Count("pk", filter=Q(action=ActivityLog.ACTION_CREATE)),
+                updates_7d=Count("pk", filter=Q(action=ActivityLog.ACTION_UPDATE)),
+                deletes_7d=Count("pk", filter=Q(action=ActivityLog.ACTION_DELETE)),
+            ),
+            "users": User.objects.aggregate(
+                total=Count("pk"),
+                admins=Count("pk", filter=Q(profile__role="admin")),
+                editors=Count("pk", filter=Q(profile__role="editor")),
+            ),
+        }
+        data["reviews"], data["reviews_per_day"] = self._reviews(now)
+        # Aciertos/fallos de CachedResponseMixin desde que arrancó el caché.
+        counts = response_cache_stats()
+        lookups = counts["hits"] + counts["misses"]
+        data["response_cache"] = dict(counts, hit_rate=round(counts["hits"] / lookups, 3) if lookups else None)
+        return data
+
+    def _reviews(self, now):
+        """
+        Totales y reseñas por día de los últimos REVIEWS_DAYS en una sola
+        consulta: COUNT agrupados por día (una fila por día con reseñas) que
+        se suman acá.
+        """
+        today = timezone.localdate(now)
+        first_day = today - timedelta(days=self.REVIEWS_DAYS - 1)
+        rows = (
+            Review.objects.annotate(day=TruncDate("created_at"))
+            .order_by()
+            .values("day")
+            .annotate(count=Count("pk"), approved=Count("pk", filter=Q(is_approved=True)))
+            .values_list("day", "count", "approved")
+        )
+        totals = {"total": 0, "approved": 0, "pending": 0}
+        per_day = {}
+        for day, count, approved in rows:
+            totals["total"] += count
+            totals["approved"] += approved
+            totals["pending"] += count - approved
+            per_day[day] = count
+        return totals, [
+            {"date": day.isoformat(), "count": per_day.get(day, 0)}
+            for day in (first_day + timedelta(days=i) for i in range(self.REVIEWS_DAYS))
+        ]
+
+
+class _Echo:
+    """Pseudo-buffer para csv.writer: devuelve la línea en vez de guardarla."""
+
+    def write(self, value):
+        return value
+
+
+class ActivityLogViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Bitácora del staff para el panel (solo admin). Antes ActivityLog se
+    escribía pero ningún endpoint la servía.
+
+    GET /api/activity/?actor=<id>&model_name=Place&action=update&since=2025-01-01&until=2025-02-01
+        Siempre paginado por cursor sobre (created_at, id). Cada filtro
+        usa uno de los índices de la tabla (actor, model_name,
+        -created_at para el rango y el orden); `action` tiene solo tres
+        valores y se resuelve sobre lo que dejan los demás.
+    GET /api/activity/export/?output=csv|ndjson  (mismos filtros)
+        Exportación completa como stream: se lee con iterator() en bloques
+        de EXPORT_CHUNK_SIZE filas y se escribe a medida que sale, así un
+        año de historial no se carga entero en memoria. (Es `output` y no
+        `format` porque DRF reserva ?format= para sus renderers.)
+    GET /api/activity/archives/
+        Meses ya archivados (tourism/retention.py) con su resumen.
+    GET /api/activity/archives/2025-01/?output=csv|ndjson|gz
+        Un mes archivado como stream: descomprimido en CSV/NDJSON, o el
+        .jsonl.gz tal cual.
+    """
+    serializer_class = ActivityLogSerializer
+    permission_classes = [IsAdmin]
+    pagination_ordering = ("-created_at", "-id")
+    pagination_required = True
+
+    EXPORT_CHUNK_SIZE = 2000
+    EXPORT_FIELDS = ("created_at", "action", "model_name", "object_id", "object_repr", "actor_id", "actor__username")
+    EXPORT_KEYS = ("created_at", "action", "model_name", "object_id", "object_repr", "actor_id", "actor")
+
+    def get_queryset(self):
+        qs = ActivityLog.objects.select_related("actor").order_by("-created_at", "-id")
+        params = self.request.query_params
+        if params.get("actor"):
+            try:
+                qs = qs.filter(actor_id=int(params["actor"]))
+            except ValueError:
+                raise ValidationError({"actor": "Debe ser el id de un usuario."})
+        if params.get("model_name"):
+            qs = qs.filter(model_name=params["model_name"])
+        if params.get("action"):
+            if params["action"] not in dict(ActivityLog.ACTION_CHOICES):
+                raise ValidationError({"action": "Acción inválida."})
+            qs = qs.filter(action=params["action"])
+        if params.get("since"):
+            qs = qs.filter(created_at__gte=self._parse_moment(params["since"], "since"))
+        if params.get("until"):
+            qs = qs.filter(created_at__lt=self._parse_moment(params["until"], "until", end=True))
+        return qs
+
+    def _parse_moment(self, raw, name, end=False):
+        """Fecha (2025-01-31) o fecha y hora ISO. Una fecha sola como `until` incluye ese día."""
+        try:
+            day = parse_date(raw) if len(raw) == 10 else None
+            moment = None if day else parse_datetime(raw)
+        except ValueError:
+            day = moment = None
+        if day is not None:
+            moment = datetime.combine(day + timedelta(days=1) if end else day, datetime.min.time())
+        if moment is None:
+            raise ValidationError({name: "Fecha inválida; usa AAAA-MM-DD o ISO 8601."})
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        output = self._output(("csv", "ndjson"))
+        rows = self._export_rows(self.get_queryset().values_list(*self.EXPORT_FIELDS))
+        return self._stream(rows, output, f"bitacora-{timezone.localdate().isoformat()}")
+
+    @action(detail=False, methods=["get"])
+    def archives(self, request):
+        return Response(ActivityArchiveSerializer(ActivityArchive.objects.all(), many=True).data)
+
+    @action(detail=False, methods=["get"], url_path=r"archives/(?P<month>\d{4}-\d{2})")
+    def archive(self, request, month):
+        output = self._output(("csv", "ndjson", "gz"))
+        entry = ActivityArchive.objects.filter(month=f"{month}-01").first()
+        if entry is None:
+            raise NotFound("Ese mes no está archivado.")
+        filename = f"bitacora-{month}"
+        if output == "gz":
+            response = StreamingHttpResponse(retention.read_archive_raw(entry), content_type="application/gzip")
+            response["Content-Disposition"] = f'attachment; filename="{filename}.jsonl.gz"'
+            return response
+        rows = (
+            (datetime.fromisoformat(row["created_at"]), *(row[key] for key in self.EXPORT_KEYS[1:]))
+            for row in retention.read_archive(entry)
+        )
+        return self._stream(rows, output, filename)
+
+    def _output(self, choices):
+        output = self.request.query_params.get("output", "csv")
+        if output not in choices:
+            raise ValidationError({"output": f"Usa {', '.join(choices)}."})
+        return output
+
+    def _stream(self, rows, output, filename):
+        if output == "csv":
+            content, content_type = self._csv_lines(rows), "text/csv; charset=utf-8"
+        else:
+            content, content_type = self._ndjson_lines(rows), "application/x-ndjson"
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}.{output}"'
+        return response
+
+    def _export_rows(self, queryset):
+        # En PostgreSQL, iterator() usa un cursor del lado del servidor, que
+        # con el pooler de Supabase en modo transacción solo vive dentro de
+        # una transacción: se abre una mientras dura el stream.
+        with transaction.atomic():
+            yield from queryset.iterator(chunk_size=self.EXPORT_CHUNK_SIZE)
+
+    def _csv_lines(self, rows):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(self.EXPORT_KEYS)
+        for created_at, *rest in rows:
+            yield writer.writerow([created_at.isoformat(), *("" if value is None else value for value in rest)])
+
+    def _ndjson_lines(self, rows):
+        for row in rows:
+            record = dict(zip(self.EXPORT_KEYS, row))
+            record["created_at"] = record["created_at"].isoformat()
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+
 
 @api_view(['GET'])
 @permission_classes([AllowAny]) # Importante: Permite acceso sin token
@@ -0,0 +1,116 @@
+"""
+Autenticación por token con caché.
+
+Antes cada request autenticada pasaba por TokenAuthentication de DRF (una
+consulta a authtoken_token + auth_user) y después user_role() hacía otra
+por user.profile en cada escritura, a veces dos veces (IsEditorOrAdmin,
+IsAdmin). Ahora token -> usuario -> perfil sale de una sola consulta con
+select_related y se guarda en memoria del proceso unos segundos
+(AUTH_TOKEN_CACHE_TTL): el tráfico del panel no consulta la base para
+autenticarse en el caso normal.
+
+Invalidación: users/signals.py llama a invalidate_user() al guardar o
+borrar un usuario o su perfil y al borrar un token. Eso limpia la memoria
+del proceso actual y sube una versión por usuario en el caché compartido,
+que los demás workers comparan en cada request (una lectura de caché, no
+de la base); el TTL es la última red si el caché compartido se vacía.
+
+En memoria se guardan solo los valores de las columnas (token, usuario,
+perfil) y cada request recibe instancias nuevas armadas con from_db(): lo
+que una request le haga a request.user no lo ve ninguna otra, sin el costo
+de un deepcopy por request.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+VERSION_KEY = "auth-version:{}"
+MAX_ENTRIES = 1000
+
+_entries = OrderedDict()  # token key -> (user_id, rows, version, expires)
+_lock = threading.Lock()
+
+
+def _row(instance):
+    """Valores de las columnas de `instance`, en el orden de sus campos."""
+    return tuple(getattr(instance, f.attname) for f in instance._meta.concrete_fields)
+
+
+def _build(model, row):
+    return model.from_db("default", [f.attname for f in model._meta.concrete_fields], row)
+
+
+def _freeze(token):
+    # Sin perfil, el acceso lanza RelatedObjectDoesNotExist (un AttributeError).
+    profile = getattr(token.user, "profile", None)
+    return _row(token), _row(token.user), profile and _row(profile)
+
+
+def _thaw(token_model, rows):
+    """Token, usuario y perfil nuevos, relacionados como los deja select_related."""
+    token_row, user_row, profile_row = rows
+    token = _build(token_model, token_row)
+    user = _build(token_model.user.field.related_model, user_row)
+    profile_descriptor = type(user).profile
+    profile = profile_row and _build(profile_descriptor.related.related_model, profile_row)
+    profile_descriptor.related.set_cached_value(user, profile)
+    if profile is not None:
+        type(profile).user.field.set_cached_value(profile, user)
+    token_model.user.field.set_cached_value(token, user)
+    return user, token
+
+
+def _version(user_id):
+    return cache.get(VERSION_KEY.format(user_id), 0)
+
+
+def invalidate_user(user_id):
+    """Olvida los tokens cacheados de este usuario, en todos los procesos."""
+    with _lock:
+        for key in [key for key, entry in _entries.items() if entry[0] == user_id]:
+            del _entries[key]
+
+    def bump():
+        key = VERSION_KEY.format(user_id)
+        cache.set(key, max(cache.get(key, 0) + 1, int(time.time() * 1000)), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        now = time.monotonic()
+        with _lock:
+            entry = _entries.get(key)
+        if entry is not None:
+            user_id, rows, version, expires = entry
+            if expires > now and version == _version(user_id):
+                return _thaw(self.get_model(), rows)
+
+        try:
+            token = self.get_model().objects.select_related("user__profile").get(key=key)
+        except self.get_model().DoesNotExist:
+            raise AuthenticationFailed("Invalid token.")
+        if not token.user.is_active:
+            raise AuthenticationFailed("User inactive or deleted.")
+
+        user = token.user
+        entry = (user.pk, _freeze(token), _version(user.pk), now + settings.AUTH_TOKEN_CACHE_TTL)
+        with _lock:
+            _entries[key] = entry
+            _entries.move_to_end(key)
+            while len(_entries) > MAX_ENTRIES:
+                _entries.popitem(last=False)
+        return user, token
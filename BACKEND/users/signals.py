@@ -1,7 +1,8 @@
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from rest_framework.authtoken.models import Token
+from .authentication import invalidate_user
 from .models import UserProfile
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
@@ -16,4 +17,19 @@ def ensure_user_setup(sender, instance=None, created=False, **kwargs):
     
     # Esto asegura que el perfil exista incluso para superusers creados por consola
     # Ojo: Usamos get_or_create para no duplicar si ya lo creó el serializer
-    UserProfile.objects.get_or_create(user=instance)
\ No newline at end of file
+    UserProfile.objects.get_or_create(user=instance)
+
+
+# El caché de users/authentication.py guarda usuario + perfil (rol) por
+# token; cualquier cambio en ellos debe verse en la próxima request.
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_delete, sender=Token)
+def invalidate_cached_owner(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
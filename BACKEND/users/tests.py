@@ -1,3 +1,49 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
 
-# Create your tests here.
+from . import authentication
+from .authentication import CachedTokenAuthentication
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        authentication.clear()
+        self.addCleanup(authentication.clear)
+        self.user = User.objects.create_user("editora")
+        self.key = Token.objects.get(user=self.user).key
+        self.auth = CachedTokenAuthentication()
+
+    def test_cached_hit_builds_fresh_instances(self):
+        first_user, first_token = self.auth.authenticate_credentials(self.key)
+        with self.assertNumQueries(0):
+            user, token = self.auth.authenticate_credentials(self.key)
+            self.assertEqual(user.profile.role, "editor")
+            self.assertIs(token.user, user)
+        self.assertEqual((user.pk, token.key), (self.user.pk, self.key))
+        self.assertIsNot(user, first_user)
+        self.assertIsNot(token, first_token)
+
+        # Lo que una request le hace a su usuario no lo ve la siguiente.
+        user.first_name = "cambiado"
+        user.profile.role = "admin"
+        again, _ = self.auth.authenticate_credentials(self.key)
+        self.assertEqual((again.first_name, again.profile.role), ("", "editor"))
+
+    def test_user_without_profile(self):
+        self.user.profile.delete()
+        self.auth.authenticate_credentials(self.key)
+        with self.assertNumQueries(0):
+            user, _ = self.auth.authenticate_credentials(self.key)
+            self.assertFalse(hasattr(user, "profile"))
+
+    def test_profile_change_invalidates(self):
+        self.auth.authenticate_credentials(self.key)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.profile.role = "admin"
+            self.user.profile.save()
+        user, _ = self.auth.authenticate_credentials(self.key)
+        self.assertEqual(user.profile.role, "admin")
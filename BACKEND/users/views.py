@@ -25,6 +25,8 @@ class UserListView(generics.ListAPIView):
     queryset = User.objects.select_related("profile").order_by("username")
     serializer_class = UserSerializer
     permission_classes = [IsAdmin]
+    # Paginación por cursor opt-in (?page_size=/?cursor=), ver tourism/pagination.py
+    pagination_ordering = ("username",)
 
 class UserDetailView(generics.GenericAPIView):
     """Editar (usuario, correo, contraseña, rol) o eliminar un usuario.
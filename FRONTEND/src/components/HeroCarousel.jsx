@@ -65,6 +65,8 @@ const SlideContent = ({ item, isActive, index, total }) => {
         <img
           className="slide-media-image h-full w-full object-cover"
           src={item.src}
+          srcSet={item.srcset}
+          sizes="100vw"
           alt={item.title || "Slide"}
           loading="lazy"
         />
@@ -190,7 +192,7 @@ export function HeroCarousel({ items = [] }) {
                   className={clsx("thumbnail-slide", { "is-active": index === activeIndex })}
                 >
                   <img
-                    src={item.src}
+                    src={item.thumb || item.src}
                     alt={`Miniatura de ${item.title}`}
                     className="thumbnail-img"
                   />
@@ -27,7 +27,9 @@ export default function PlaceCard({ place, onMapClick }) {
   const favorite = isFavorite(place.id);
   const categoryKey = (place.category || "otro").toLowerCase();
   const CategoryIcon = CATEGORY_ICONS[categoryKey] || HelpCircle;
-  const photo = place.media?.[0]?.image;
+  // El listado trae `cover` (tarjeta); el detalle, la lista `media` completa.
+  const photo = place.cover ?? place.media?.[0]?.image;
+  const photoSrcSet = (place.cover_variants ?? place.media?.[0]?.image_variants)?.srcset || undefined;
 
   // Manejador de click para el botón del mapa
   const handleMapClick = (e) => {
@@ -65,6 +67,8 @@ export default function PlaceCard({ place, onMapClick }) {
         {photo ? (
           <img
             src={photo}
+            srcSet={photoSrcSet}
+            sizes="(min-width: 1024px) 33vw, (min-width: 640px) 50vw, 100vw"
             alt={place.name}
             loading="lazy"
             className="h-full w-full object-cover transition-transform duration-500 ease-in-out group-hover:scale-105"
@@ -99,7 +103,7 @@ export default function PlaceCard({ place, onMapClick }) {
         )}
 
         <p className="mb-4 flex-grow text-sm text-gray-600 line-clamp-2">
-          {place.description || t('places.default_description')}
+          {place.excerpt || place.description || t('places.default_description')}
         </p>
 
         {/* --- Footer con Acciones --- */}
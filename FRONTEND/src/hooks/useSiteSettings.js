@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import api from "../lib/api";
+import { getPublic } from "../lib/snapshots";
 
 // Cache a nivel de módulo: Navbar, Home, Información y Cómo Llegar usan esta
 // misma info y no tiene sentido que cada uno dispare su propio GET.
@@ -9,7 +9,7 @@ let inFlight = null;
 function loadSiteSettings() {
   if (cache) return Promise.resolve(cache);
   if (!inFlight) {
-    inFlight = api.get("/site-settings/")
+    inFlight = getPublic("site-settings", "/site-settings/")
       .then(({ data }) => { cache = data; return data; })
       .finally(() => { inFlight = null; });
   }
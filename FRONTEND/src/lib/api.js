@@ -17,7 +17,8 @@ api.interceptors.request.use((cfg) => {
   const method = (cfg.method || "").toLowerCase();
   const needsBody = ["post", "put", "patch"].includes(method);
 
-  if (needsBody && !(cfg.data instanceof FormData)) {
+  // FormData y Blob (partes de lib/uploads.js) traen su propio Content-Type.
+  if (needsBody && !(cfg.data instanceof FormData) && !(cfg.data instanceof Blob)) {
     cfg.headers["Content-Type"] = "application/json";
   }
 
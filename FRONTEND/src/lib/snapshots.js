@@ -0,0 +1,41 @@
+// @/lib/snapshots.js
+import axios from "axios";
+import api from "./api";
+
+// Snapshots JSON del contenido público (ver BACKEND/tourism/snapshots.py):
+// /api/snapshots/ dice qué archivo inmutable tiene hoy cada sección y esos
+// archivos los sirve WhiteNoise (o la CDN) sin pasar por Django. Solo para
+// visitantes anónimos: el staff ve también contenido inactivo. Ante
+// cualquier error se usa la API normal.
+const MANIFEST_TTL_MS = 60 * 1000;
+
+let manifest = null;
+let loadedAt = 0;
+
+function loadManifest() {
+  if (!manifest || Date.now() - loadedAt > MANIFEST_TTL_MS) {
+    loadedAt = Date.now();
+    manifest = api.get("/snapshots/").then(({ data }) => data);
+    manifest.catch(() => { manifest = null; });
+  }
+  return manifest;
+}
+
+// Mismo resultado que api.get(path) ({ data }) para la sección `name` del
+// manifiesto (places, events, posts, gallery, contact, site-settings).
+export async function getPublic(name, path) {
+  const anonymous = typeof window === "undefined" || !localStorage.getItem("token");
+  if (anonymous) {
+    try {
+      const { files } = await loadManifest();
+      if (files?.[name]) {
+        const url = new URL(files[name], api.defaults.baseURL).href;
+        const { data } = await axios.get(url, { headers: { Accept: "application/json" } });
+        return { data };
+      }
+    } catch {
+      // Sin snapshots todavía (404) o archivo inaccesible: API normal.
+    }
+  }
+  return api.get(path);
+}
@@ -0,0 +1,93 @@
+import api from "@/lib/api";
+
+// El backend responde 202 a las subidas y las termina en segundo plano
+// (ver BACKEND/tourism/uploads.py). Esto consulta /api/uploads/<id>/
+// hasta que el trabajo termine: resuelve con el trabajo completado o
+// rechaza con un Error si falló o tardó demasiado.
+export async function waitForUpload(job, { interval = 1500, timeout = 10 * 60 * 1000 } = {}) {
+  const deadline = Date.now() + timeout;
+  let current = job;
+  while (current.status !== "done") {
+    if (current.status === "failed") {
+      throw new Error(current.error || "La subida falló.");
+    }
+    if (Date.now() > deadline) {
+      throw new Error("La subida está tardando demasiado; revisa la galería más tarde.");
+    }
+    await new Promise((resolve) => setTimeout(resolve, interval));
+    ({ data: current } = await api.get(`uploads/${job.id}/`));
+  }
+  return current;
+}
+
+const RESUME_KEY = "chunked-upload:";
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+async function sha256Hex(file) {
+  const digest = await crypto.subtle.digest("SHA-256", await file.arrayBuffer());
+  return [...new Uint8Array(digest)].map((b) => b.toString(16).padStart(2, "0")).join("");
+}
+
+// crypto.subtle solo existe en contextos seguros (https o localhost); sin
+// él no se puede calcular el checksum y se usa la subida multipart de siempre.
+export const canUploadInChunks = () => typeof window !== "undefined" && !!window.crypto?.subtle;
+
+// Sube `file` por partes (ver BACKEND/tourism/chunked.py) y devuelve el id
+// para mandar como `upload_id`. Si la conexión se corta, reintenta desde el
+// offset que el servidor confirma; si se recarga la página, retoma la misma
+// subida (el id queda guardado en localStorage).
+export async function uploadInChunks(file, { onProgress, retries = 5 } = {}) {
+  const key = `${RESUME_KEY}${file.name}:${file.size}:${file.lastModified}`;
+  let upload = null;
+
+  const savedId = localStorage.getItem(key);
+  if (savedId) {
+    try {
+      ({ data: upload } = await api.get(`chunked-uploads/${savedId}/`));
+      if (upload.status === "attached") upload = null;
+    } catch {
+      upload = null;
+    }
+  }
+  if (!upload) {
+    ({ data: upload } = await api.post("chunked-uploads/", { filename: file.name, total_size: file.size }));
+    localStorage.setItem(key, upload.id);
+  }
+
+  let offset = upload.offset;
+  let failures = 0;
+  while (upload.status === "uploading" && offset < file.size) {
+    try {
+      const { data } = await api.put(`chunked-uploads/${upload.id}/`, file.slice(offset, offset + upload.chunk_size), {
+        params: { offset },
+        headers: { "Content-Type": "application/octet-stream" },
+      });
+      offset = data.offset;
+      failures = 0;
+      onProgress?.(Math.round((offset / file.size) * 100));
+    } catch (err) {
+      const status = err.response?.status;
+      if (status === 409 && typeof err.response.data?.offset === "number") {
+        offset = err.response.data.offset;
+        continue;
+      }
+      if (status && status < 500) throw err; // error del cliente: reintentar no sirve
+      if (++failures > retries) throw err;
+      await sleep(Math.min(1000 * 2 ** failures, 15000));
+      // El servidor pudo haber guardado parte de la última parte.
+      try {
+        ({ data: { offset } } = await api.get(`chunked-uploads/${upload.id}/`));
+      } catch {
+        // sin conexión todavía: se reintenta con el offset conocido
+      }
+    }
+  }
+
+  if (upload.status === "uploading") {
+    ({ data: upload } = await api.post(`chunked-uploads/${upload.id}/complete/`, {
+      sha256: await sha256Hex(file),
+    }));
+  }
+  localStorage.removeItem(key);
+  return upload.id;
+}
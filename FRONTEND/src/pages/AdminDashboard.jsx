@@ -55,32 +55,33 @@ export default function AdminDashboard() {
 
   useEffect(() => {
     let cancelled = false;
-    const endpoints = { posts: "posts/", places: "places/", events: "events/", reviews: "moderation/reviews/" };
+    // /stats/ es solo para administradores; los editores no ven el resumen.
+    if (!isAdmin) return undefined;
 
+    // Un solo GET a /stats/ (conteos calculados con COUNT en el backend) en
+    // vez de descargar cada listado completo para usar data.length.
     const loadStats = async () => {
       setStatsLoading(true);
-      const results = await Promise.allSettled(
-        Object.values(endpoints).map((path) => api.get(path))
-      );
-      if (cancelled) return;
-
-      const counts = {};
-      Object.keys(endpoints).forEach((key, i) => {
-        const result = results[i];
-        if (result.status === "fulfilled") {
-          const data = result.value.data;
-          counts[key] = Array.isArray(data) ? data.length : (data?.count ?? null);
-        } else {
-          counts[key] = null;
-        }
-      });
-      setStats(counts);
-      setStatsLoading(false);
+      try {
+        const { data } = await api.get("stats/");
+        if (cancelled) return;
+        setStats({
+          posts: data.posts?.total ?? null,
+          places: data.places?.total ?? null,
+          events: data.events?.total ?? null,
+          // La tarjeta siempre mostró las reseñas pendientes de moderar
+          reviews: data.reviews?.pending ?? null,
+        });
+      } catch {
+        if (!cancelled) setStats({ posts: null, places: null, events: null, reviews: null });
+      } finally {
+        if (!cancelled) setStatsLoading(false);
+      }
     };
 
     loadStats();
     return () => { cancelled = true; };
-  }, []);
+  }, [isAdmin]);
 
   const statValue = (key) => {
     if (statsLoading) return "…";
@@ -141,19 +142,21 @@ export default function AdminDashboard() {
           </div>
         </header>
 
-        {/* --- SECCIÓN DE ESTADÍSTICAS (KPIs) --- */}
-        <section className="mb-10">
-          <div className="flex items-center gap-2 mb-4 text-slate-100 font-bold text-lg">
-            <Activity className="h-5 w-5 text-indigo-400" />
-            <h2>Resumen de Actividad</h2>
-          </div>
-          <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-4 gap-4">
-            <DashboardStat label="Publicaciones" value={statValue("posts")} hint="Artículos activos" />
-            <DashboardStat label="Lugares" value={statValue("places")} hint="Destinos registrados" />
-            <DashboardStat label="Eventos" value={statValue("events")} hint="En calendario" />
-            <DashboardStat label="Reviews" value={statValue("reviews")} hint="Pendientes de revisión" />
-          </div>
-        </section>
+        {/* --- SECCIÓN DE ESTADÍSTICAS (KPIs, solo admin) --- */}
+        {isAdmin && (
+          <section className="mb-10">
+            <div className="flex items-center gap-2 mb-4 text-slate-100 font-bold text-lg">
+              <Activity className="h-5 w-5 text-indigo-400" />
+              <h2>Resumen de Actividad</h2>
+            </div>
+            <div className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-4 gap-4">
+              <DashboardStat label="Publicaciones" value={statValue("posts")} hint="Artículos activos" />
+              <DashboardStat label="Lugares" value={statValue("places")} hint="Destinos registrados" />
+              <DashboardStat label="Eventos" value={statValue("events")} hint="En calendario" />
+              <DashboardStat label="Reviews" value={statValue("reviews")} hint="Pendientes de revisión" />
+            </div>
+          </section>
+        )}
 
         {/* --- GRID DE GESTIÓN (El Core) --- */}
         <section>
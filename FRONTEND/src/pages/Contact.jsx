@@ -1,6 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import { useTranslation } from "react-i18next";
-import api from "../lib/api";
+import { getPublic } from "../lib/snapshots";
 import Seo from "../components/Seo";
 import {
   Phone, Mail, MapPin, Facebook, Instagram,
@@ -125,8 +125,7 @@ export default function Contact() {
 
   useEffect(() => {
     window.scrollTo(0, 0);
-    api
-      .get("/contact/")
+    getPublic("contact", "/contact/")
       .then(({ data }) => {
         const items = Array.isArray(data?.results) ? data.results : Array.isArray(data) ? data : [];
         const grouped = items.reduce((acc, c) => {
@@ -57,7 +57,8 @@ export default function CreateEvent() {
     const fetchData = async () => {
       try {
         const [placesRes, eventsRes] = await Promise.all([
-          api.get("/places/"),
+          // Solo para el selector de lugar: sin fotos ni descripciones.
+          api.get("/places/", { params: { fields: "id,name" } }),
           api.get("/events/")
         ]);
         
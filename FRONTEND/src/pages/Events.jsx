@@ -5,7 +5,7 @@ import es from 'date-fns/locale/es';
 import Modal from 'react-modal';
 import { X, Calendar as CalendarIcon, Clock, AlignLeft, MessageCircle } from 'lucide-react'; // Usamos Lucide para iconos
 import { useTranslation } from 'react-i18next';
-import api from '../lib/api';
+import { getPublic } from '../lib/snapshots';
 import Seo from '../components/Seo';
 
 // Estilos base de la librería
@@ -95,7 +95,7 @@ export default function Events() {
     const fetchEvents = async () => {
       try {
         // 1. Cargar eventos del backend
-        const { data } = await api.get("/events/");
+        const { data } = await getPublic("events", "/events/");
         const apiEvents = (data.results || data).map(event => ({
           ...event,
           start: new Date(event.start_date),
@@ -2,6 +2,7 @@ import React, { useEffect, useRef, useState } from "react";
 import { Link } from "react-router-dom";
 import api from "@/lib/api";
 import { getErrorMessage } from "@/lib/errorMessage";
+import { canUploadInChunks, uploadInChunks, waitForUpload } from "@/lib/uploads";
 import {
   Image as ImageIcon,
   Trash2,
@@ -118,30 +119,54 @@ export default function GalleryAdmin() {
 
     const fd = new FormData();
     fd.append("title", title);
-    fd.append("order", items.length); // siempre se agrega al final
     fd.append("is_active", isActive);
-    fd.append("media_file", file);
 
     try {
-      await api.post("gallery/", fd, {
+      // Por partes cuando se puede: un corte de conexión no obliga a
+      // empezar de cero (ver lib/uploads.js).
+      if (canUploadInChunks()) {
+        fd.append("upload_id", await uploadInChunks(file, { onProgress: setUploadProgress }));
+      } else {
+        fd.append("media_file", file);
+      }
+      const { data } = await api.post("gallery/", fd, {
         headers: { "Content-Type": "multipart/form-data" },
         onUploadProgress: (evt) => {
-          if (evt.total) setUploadProgress(Math.round((evt.loaded / evt.total) * 100));
+          if (evt.total && !fd.has("upload_id")) setUploadProgress(Math.round((evt.loaded / evt.total) * 100));
         },
       });
       setFile(null);
       setPreview(null);
       setTitle("");
       fetchGallery();
-      showToast("success", "Contenido subido correctamente.");
+      setIsUploading(false);
+      setUploadProgress(0);
+      if (data?.upload_job) {
+        showToast("success", "Archivo recibido; se está procesando…");
+        trackUpload(data.upload_job, "Contenido subido correctamente.");
+      } else {
+        showToast("success", "Contenido subido correctamente.");
+      }
     } catch (err) {
       setUploadError(getErrorMessage(err));
-    } finally {
       setIsUploading(false);
       setUploadProgress(0);
     }
   };
 
+  // La subida real al almacenamiento termina después de la respuesta (202):
+  // se espera en segundo plano y se recarga la galería al terminar.
+  const trackUpload = async (job, successMessage) => {
+    try {
+      await waitForUpload(job);
+      fetchGallery();
+      showToast("success", successMessage);
+    } catch (err) {
+      fetchGallery();
+      showToast("error", err.message);
+    }
+  };
+
   // --- Visibilidad ---
   const toggleVisibility = async (id, currentStatus) => {
     setItems(prev => prev.map(i => i.id === id ? { ...i, is_active: !currentStatus } : i));
@@ -203,18 +228,27 @@ export default function GalleryAdmin() {
     setReplaceProgress(0);
 
     const fd = new FormData();
-    fd.append("media_file", newFile);
 
     try {
+      if (canUploadInChunks()) {
+        fd.append("upload_id", await uploadInChunks(newFile, { onProgress: setReplaceProgress }));
+      } else {
+        fd.append("media_file", newFile);
+      }
       const { data } = await api.patch(`gallery/${item.id}/`, fd, {
         headers: { "Content-Type": "multipart/form-data" },
         onUploadProgress: (evt) => {
-          if (evt.total) setReplaceProgress(Math.round((evt.loaded / evt.total) * 100));
+          if (evt.total && !fd.has("upload_id")) setReplaceProgress(Math.round((evt.loaded / evt.total) * 100));
         },
       });
       setItems(prev => prev.map(i => i.id === item.id ? data : i));
       setReplaceCandidate(null);
-      showToast("success", "Archivo reemplazado correctamente.");
+      if (data?.upload_job) {
+        showToast("success", "Archivo recibido; se está procesando…");
+        trackUpload(data.upload_job, "Archivo reemplazado correctamente.");
+      } else {
+        showToast("success", "Archivo reemplazado correctamente.");
+      }
     } catch (err) {
       showToast("error", getErrorMessage(err));
     } finally {
@@ -224,17 +258,23 @@ export default function GalleryAdmin() {
   };
 
   // --- Persistir un nuevo orden (usado por drag & drop y por las flechas) ---
-  const persistReorder = async (reorderedItems) => {
-    const withNewOrder = reorderedItems.map((item, idx) => ({ ...item, order: idx }));
-    const changed = withNewOrder.filter((item) => {
-      const before = items.find(i => i.id === item.id);
-      return before && before.order !== item.order;
-    });
+  // Un solo request por movimiento: el backend ubica el item antes o después
+  // de su nuevo vecino y no toca los demás (GalleryItem.move()).
+  const persistReorder = async (reorderedItems, movedId) => {
+    setItems(reorderedItems);
 
-    setItems(withNewOrder);
+    const index = reorderedItems.findIndex(i => i.id === movedId);
+    const next = reorderedItems[index + 1];
+    const position = next ? { before: next.id } : index > 0 ? { after: reorderedItems[index - 1].id } : null;
+    if (!position) return;
 
     try {
-      await Promise.all(changed.map(item => api.patch(`gallery/${item.id}/`, { order: item.order })));
+      const { data } = await api.post(`gallery/${movedId}/move/`, position);
+      if (data.rebalanced) {
+        fetchGallery();
+      } else {
+        setItems(prev => prev.map(i => (i.id === movedId ? { ...i, order: data.order } : i)));
+      }
     } catch {
       fetchGallery();
     }
@@ -252,7 +292,7 @@ export default function GalleryAdmin() {
     const reordered = [...items];
     const [moved] = reordered.splice(fromIndex, 1);
     reordered.splice(toIndex, 0, moved);
-    persistReorder(reordered);
+    persistReorder(reordered, moved.id);
   };
 
   // Alternativa que funciona en cualquier dispositivo (celular, teclado, mouse):
@@ -264,7 +304,7 @@ export default function GalleryAdmin() {
 
     const reordered = [...items];
     [reordered[index], reordered[targetIndex]] = [reordered[targetIndex], reordered[index]];
-    persistReorder(reordered);
+    persistReorder(reordered, id);
   };
 
   return (
@@ -450,14 +490,14 @@ export default function GalleryAdmin() {
                     <div className="aspect-video w-full bg-black relative">
                       {item.media_type === "VIDEO" ? (
                         <video
-                          src={item.media_file}
+                          src={item.media_file_url || item.media_file}
                           className="w-full h-full object-cover"
                           controls
                           preload="metadata"
                         />
                       ) : (
                         <img
-                          src={item.media_file}
+                          src={item.media_file_url || item.media_file}
                           alt={item.title}
                           className="w-full h-full object-cover transition-transform duration-500 group-hover:scale-105"
                         />
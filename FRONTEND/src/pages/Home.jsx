@@ -116,8 +116,12 @@ function normalizeGalleryItem(raw, idx) {
   const src = candidates.find(Boolean) ?? "";
   const mt = raw?.media_type ?? (src?.match(/\.(mp4|webm|ogg)(\?|$)/i) ? "VIDEO" : "IMAGE");
   const media_type = String(mt).toUpperCase();
+  // Variantes de la API: srcset para el slide y miniatura chica (en videos,
+  // un fotograma) para la tira de abajo.
+  const srcset = raw?.media_variants?.srcset || undefined;
+  const thumb = raw?.media_variants?.thumb || null;
   
-  return { id, title, media_type, src };
+  return { id, title, media_type, src, srcset, thumb };
 }
 
 export default function Home() {
@@ -136,34 +140,17 @@ export default function Home() {
       setLoading(true);
       setError(null);
       try {
-        const results = await Promise.allSettled([
-          api.get("reviews/"),
-          api.get("gallery/"),
-          api.get("places/"),
-          api.get("events/"),
-        ]);
-
-        if (results[0].status === "fulfilled") {
-          setReviews(unwrapResults(results[0].value.data).slice(0, 6));
-        }
-
-        if (results[1].status === "fulfilled") {
-          const rawItems = unwrapResults(results[1].value.data);
-          const normalizedItems = rawItems.map(normalizeGalleryItem).filter(item => item.src);
-          setGalleryItems(normalizedItems);
-        }
-
-        if (results[2].status === "fulfilled") {
-          setPlaces(unwrapResults(results[2].value.data).slice(0, 3));
-        }
-
-        if (results[3].status === "fulfilled") {
-          const now = new Date();
-          const upcoming = unwrapResults(results[3].value.data)
-            .filter((ev) => ev.start_date && new Date(ev.start_date) >= now)
-            .sort((a, b) => new Date(a.start_date) - new Date(b.start_date));
-          setNextEvent(upcoming[0] || null);
-        }
+        // Un solo round trip: /home/ ya trae cada sección filtrada y acotada
+        // (próximos eventos, últimas reseñas aprobadas, galería activa,
+        // lugares destacados) en vez de 4 listados completos.
+        const { data } = await api.get("home/");
+
+        setReviews(unwrapResults(data.reviews));
+        setGalleryItems(
+          unwrapResults(data.gallery).map(normalizeGalleryItem).filter(item => item.src)
+        );
+        setPlaces(unwrapResults(data.places));
+        setNextEvent(unwrapResults(data.upcoming_events)[0] || null);
       } catch (e) {
         console.error("Error crítico:", e);
         setError("No pudimos cargar toda la información. Por favor revisa tu conexión.");
@@ -2,6 +2,7 @@ import React, { useEffect, useState } from 'react';
 import { useParams, Link } from 'react-router-dom';
 import { useTranslation } from 'react-i18next';
 import api from '@/lib/api';
+import { canUploadInChunks, uploadInChunks } from '@/lib/uploads';
 import Seo from '@/components/Seo';
 import PageLoader from '@/components/PageLoader';
 import MapView from '@/components/MapView';
@@ -168,11 +169,16 @@ const ReviewForm = ({ placeId, onReviewSubmitted }) => {
     formData.append('rating', rating);
     formData.append('author_name', authorName);
     formData.append('comment', comment);
-    if (attachment) {
-      formData.append('attachment', attachment);
-    }
 
     try {
+      if (attachment) {
+        // Por partes cuando se puede (videos grandes desde datos móviles).
+        if (canUploadInChunks()) {
+          formData.append('upload_id', await uploadInChunks(attachment));
+        } else {
+          formData.append('attachment', attachment);
+        }
+      }
       const response = await api.post('/reviews/', formData);
       setSuccess(t('placeDetail.thanks_sub'));
       setRating(5);
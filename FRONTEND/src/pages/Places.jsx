@@ -3,6 +3,7 @@ import { useSearchParams } from "react-router-dom";
 import { useTranslation } from "react-i18next";
 import { MapPin, AlertCircle } from "lucide-react";
 import api from "../lib/api";
+import { getPublic } from "../lib/snapshots";
 import MapView from "../components/MapView";
 import PlaceCard from "../components/PlaceCard";
 import PageLoader from "../components/PageLoader";
@@ -24,7 +25,8 @@ export default function Places() {
   useEffect(() => {
     let cancel = false;
     setLoading(true);
-    api.get("/places/", { params: q ? { search: q } : {} })
+    // La búsqueda va a la API; el listado completo sale del snapshot.
+    (q ? api.get("/places/", { params: { search: q } }) : getPublic("places", "/places/"))
       .then(({ data }) => { if (!cancel) setData(Array.isArray(data) ? data : (data?.results || [])); })
       .catch((e) => !cancel && setErr(e?.message || "Error al cargar lugares"))
       .finally(() => !cancel && setLoading(false));
@@ -44,17 +46,12 @@ export default function Places() {
     }));
   }, [data, t]);
 
+  // El texto ya lo filtra la API (?search=, sin acentos y con tolerancia a
+  // errores de tipeo); volver a filtrar acá descartaría esas coincidencias.
   const filtered = useMemo(() => {
-    let result = data;
-    if (q) {
-      const term = q.toLowerCase();
-      result = result.filter((p) => [p.name, p.category, p.description].filter(Boolean).some((v) => String(v).toLowerCase().includes(term)));
-    }
-    if (activeCategory) {
-      result = result.filter((p) => p.category?.toLowerCase() === activeCategory);
-    }
-    return result;
-  }, [data, q, activeCategory]);
+    if (!activeCategory) return data;
+    return data.filter((p) => p.category?.toLowerCase() === activeCategory);
+  }, [data, activeCategory]);
 
   const points = useMemo(() => filtered.filter((p) => p.lat && p.lng).map((p) => ({
         id: p.id, name: p.name, lat: Number(p.lat), lng: Number(p.lng), slug: p.slug, category: p.category
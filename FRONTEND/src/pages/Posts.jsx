@@ -1,7 +1,7 @@
 import React, { useEffect, useState } from "react";
 import { Link } from "react-router-dom";
 import { useTranslation } from "react-i18next";
-import api from "@/lib/api";
+import { getPublic } from "@/lib/snapshots";
 import Seo from "@/components/Seo";
 import PageLoader from "@/components/PageLoader";
 import {
@@ -20,7 +20,7 @@ export default function Posts() {
 
   useEffect(() => {
     setLoading(true);
-    api.get("/posts/")
+    getPublic("posts", "/posts/")
       .then(({ data }) => {
         const arr = Array.isArray(data) ? data : (data?.results || []);
         // Filtramos solo los publicados por seguridad visual
@@ -102,6 +102,8 @@ export default function Posts() {
                   {post.cover ? (
                     <img 
                       src={post.cover} 
+                      srcSet={post.cover_variants?.srcset || undefined}
+                      sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
                       alt={post.title} 
                       className="w-full h-full object-cover transition-transform duration-700 group-hover:scale-110" 
                       loading="lazy"
@@ -138,7 +140,7 @@ export default function Posts() {
 
                   {/* Extracto (Truncado a 3 líneas) */}
                   <p className="text-slate-400 text-sm line-clamp-3 mb-6 flex-1 leading-relaxed">
-                    {post.body}
+                    {post.excerpt ?? post.body}
                   </p>
 
                   {/* Footer Tarjeta */}
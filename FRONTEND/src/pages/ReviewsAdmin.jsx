@@ -14,7 +14,9 @@ import {
   MessageSquare,
   ImageIcon,
   Loader2,
-  RefreshCw
+  RefreshCw,
+  CheckSquare,
+  Square
 } from 'lucide-react';
 
 export default function ReviewsAdmin() {
@@ -25,6 +27,9 @@ export default function ReviewsAdmin() {
   const [actionState, setActionState] = useState({ type: null, id: null });
   const [view, setView] = useState('pending'); // 'pending' | 'approved'
   const [searchTerm, setSearchTerm] = useState('');
+  // Selección para acciones masivas (POST /moderation/reviews/bulk/)
+  const [selected, setSelected] = useState(() => new Set());
+  const [bulkAction, setBulkAction] = useState(null);
 
   // --- API ---
   const fetchReviews = async () => {
@@ -42,6 +47,7 @@ export default function ReviewsAdmin() {
   };
 
   useEffect(() => {
+    setSelected(new Set());
     fetchReviews();
   }, [view]);
 
@@ -85,6 +91,40 @@ export default function ReviewsAdmin() {
     }
   };
 
+  // --- Acciones masivas ---
+  const toggleSelected = (reviewId) => {
+    setSelected(prev => {
+      const next = new Set(prev);
+      if (next.has(reviewId)) next.delete(reviewId);
+      else next.add(reviewId);
+      return next;
+    });
+  };
+
+  const allVisibleSelected = filteredReviews.length > 0 && filteredReviews.every(r => selected.has(r.id));
+
+  const toggleAllVisible = () => {
+    setSelected(allVisibleSelected ? new Set() : new Set(filteredReviews.map(r => r.id)));
+  };
+
+  const runBulk = async (action) => {
+    const ids = [...selected];
+    if (ids.length === 0) return;
+    if (action === 'delete' && !window.confirm(`¿Eliminar ${ids.length} opiniones permanentemente?`)) return;
+    setBulkAction(action);
+    try {
+      // Un solo request para todas: el backend responde el estado de cada id.
+      await api.post('/moderation/reviews/bulk/', { ids, action });
+      // Aprobadas, ocultadas, borradas o ya inexistentes: ninguna sigue en esta vista.
+      setReviews(prev => prev.filter(r => !selected.has(r.id)));
+      setSelected(new Set());
+    } catch (err) {
+      alert("Error al aplicar la acción a las opiniones seleccionadas.");
+    } finally {
+      setBulkAction(null);
+    }
+  };
+
   // --- Helpers UI ---
   const renderStars = (count) => {
     return [...Array(5)].map((_, i) => (
@@ -173,6 +213,42 @@ export default function ReviewsAdmin() {
           </div>
         </div>
 
+        {/* --- ACCIONES MASIVAS --- */}
+        {!loading && filteredReviews.length > 0 && (
+          <div className="flex flex-wrap items-center gap-3 mb-6">
+            <button
+              onClick={toggleAllVisible}
+              className="flex items-center gap-2 px-4 py-2 rounded-xl bg-slate-900 border border-slate-800 text-sm text-slate-300 hover:text-white hover:border-slate-600 transition-all"
+            >
+              {allVisibleSelected ? <CheckSquare className="h-4 w-4" /> : <Square className="h-4 w-4" />}
+              {allVisibleSelected ? 'Quitar selección' : 'Seleccionar todas'}
+            </button>
+            {selected.size > 0 && (
+              <>
+                <span className="text-sm text-slate-400">{selected.size} seleccionadas</span>
+                <button
+                  onClick={() => runBulk(view === 'pending' ? 'approve' : 'unapprove')}
+                  disabled={!!bulkAction}
+                  className={`flex items-center gap-2 px-4 py-2 rounded-xl text-sm font-bold transition-all disabled:opacity-50 ${view === 'pending' ? 'bg-emerald-600 hover:bg-emerald-500 text-white' : 'bg-slate-800 hover:bg-slate-700 text-slate-200'}`}
+                >
+                  {bulkAction && bulkAction !== 'delete'
+                    ? <Loader2 className="h-4 w-4 animate-spin" />
+                    : view === 'pending' ? <CheckCircle className="h-4 w-4" /> : <XCircle className="h-4 w-4" />}
+                  {view === 'pending' ? 'Aprobar' : 'Ocultar'}
+                </button>
+                <button
+                  onClick={() => runBulk('delete')}
+                  disabled={!!bulkAction}
+                  className="flex items-center gap-2 px-4 py-2 rounded-xl text-sm font-bold bg-red-500/10 hover:bg-red-500 text-red-500 hover:text-white border border-red-500/20 transition-all disabled:opacity-50"
+                >
+                  {bulkAction === 'delete' ? <Loader2 className="h-4 w-4 animate-spin" /> : <Trash2 className="h-4 w-4" />}
+                  Eliminar
+                </button>
+              </>
+            )}
+          </div>
+        )}
+
         {/* --- CONTENIDO --- */}
         {error && (
           <div className="bg-red-500/10 border border-red-500/20 text-red-400 p-4 rounded-xl mb-6 text-center">
@@ -213,9 +289,14 @@ export default function ReviewsAdmin() {
                       </div>
                     </div>
                   </div>
-                  <span className="text-xs text-slate-500 bg-slate-950 px-2 py-1 rounded-lg border border-slate-800">
+                  <button
+                    onClick={() => toggleSelected(review.id)}
+                    className={`flex items-center gap-1.5 text-xs px-2 py-1 rounded-lg border transition-colors ${selected.has(review.id) ? 'bg-indigo-600/20 border-indigo-500 text-indigo-300' : 'bg-slate-950 border-slate-800 text-slate-500 hover:text-slate-300'}`}
+                    title="Seleccionar"
+                  >
+                    {selected.has(review.id) ? <CheckSquare className="h-3.5 w-3.5" /> : <Square className="h-3.5 w-3.5" />}
                     #{review.id}
-                  </span>
+                  </button>
                 </div>
 
                 {/* Contenido */}